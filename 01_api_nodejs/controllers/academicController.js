@@ -473,12 +473,21 @@ exports.assignDisciplinasToTurma = async (req, res) => {
     }
 };
 
+// Listas que quase não mudam durante uma sessão (turmas, disciplinas): o
+// navegador pode reaproveitá-las por 60 s e, depois disso, revalida com
+// If-None-Match; o Express compara com o ETag do corpo e responde 304 sem
+// corpo quando nada mudou. 'private': a resposta depende do token do usuário.
+// O painel admin não busca mais essas listas pelo navegador (o Flask as envia
+// prontas na página): o cabeçalho vale para outros clientes da API.
+const LISTA_CACHE_CONTROL = 'private, max-age=60';
+
 // Funcao para listar todas as turmas
 const getAllTurmas = async (req, res) => {
     try {
         const sql = 'SELECT * FROM turmas ORDER BY ano DESC, nome_turma ASC';
         const resultado = await db.query(sql);
 
+        res.set('Cache-Control', LISTA_CACHE_CONTROL);
         res.status(200).json({
             message: 'Lista de turmas',
             turmas: resultado.rows
@@ -678,6 +687,56 @@ const removeDisciplinaFromTurma = async (req, res) => {
     }
 };
 
+// Remove uma disciplina de várias turmas de uma vez (assistente de exclusão):
+// um único DELETE com ANY($2), em vez de uma requisição por turma
+const removeDisciplinaFromTurmasBulk = async (req, res) => {
+    // Permissão: Apenas Administradores
+    if (req.user.tipo_usuario !== 'admin') {
+        return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
+    }
+
+    const { disciplina_id, turma_ids } = req.body;
+
+    if (!disciplina_id || !Array.isArray(turma_ids)) {
+        return res.status(400).json({ message: 'ID da Disciplina e a lista turma_ids são obrigatórios.' });
+    }
+
+    const ids = turma_ids.map(id => parseInt(id, 10));
+    if (ids.some(Number.isNaN)) {
+        return res.status(400).json({ message: 'turma_ids deve conter apenas IDs numéricos.' });
+    }
+
+    try {
+        // Um único comando: ou remove de todas as turmas, ou de nenhuma
+        const sql = `
+            DELETE FROM turma_disciplinas
+            WHERE disciplina_id = $1 AND turma_id = ANY($2::int[])
+            RETURNING turma_id;
+        `;
+        const params = [disciplina_id, ids];
+
+        const result = await db.query(sql, params);
+
+        res.status(200).json({
+            message: 'Disciplina removida das turmas com sucesso!',
+            disciplina_id: Number(disciplina_id),
+            turmas_removidas: result.rows.map(row => row.turma_id),
+            total: ids.length
+        });
+
+    } catch (error) {
+        // Erro 23503: matrículas ainda dependem da associação em alguma turma
+        if (error.code === '23503') {
+            return res.status(409).json({
+                message: 'Erro: Não é possível remover esta disciplina das turmas pois existem matrículas de alunos ativas nelas.',
+                detail: error.detail
+            });
+        }
+        console.error('Erro ao remover disciplina das turmas:', error);
+        res.status(500).json({ message: 'Erro no servidor.', error: error.message });
+    }
+};
+
 const deleteDisciplina = async (req, res) => {
     // Permissão: Apenas Administradores
     if (req.user.tipo_usuario !== 'admin') {
@@ -723,6 +782,89 @@ const deleteDisciplina = async (req, res) => {
     }
 };
 
+// Exclusão completa de uma disciplina em UMA transação (assistente do painel admin):
+// 1. exclui as notas  2. verifica (ou, com force, exclui) as matrículas
+// 3. desassocia de todas as turmas  4. exclui a disciplina
+// Responde com o resultado de cada etapa em "steps"; se alguma etapa falhar,
+// nada é gravado (ROLLBACK) e a resposta indica em qual etapa parou.
+const deleteDisciplinaCascade = async (req, res) => {
+    // Permissão: Apenas Administradores
+    if (req.user.tipo_usuario !== 'admin') {
+        return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
+    }
+
+    const { disciplina_id } = req.params; // ID vem da URL
+    const force = Boolean(req.body && req.body.force); // Exclui também as matrículas
+
+    const steps = [];
+    const client = await db.getClient();
+
+    try {
+        await client.query('BEGIN'); // Inicia a transação
+
+        // Etapa 1: notas
+        const notas = await client.query('DELETE FROM notas WHERE disciplina_id = $1', [disciplina_id]);
+        steps.push({ n: 1, ok: true, removidos: notas.rowCount });
+
+        // Etapa 2: matrículas (bloqueiam a exclusão, a menos que force seja enviado)
+        if (force) {
+            const matriculas = await client.query('DELETE FROM matriculas WHERE disciplina_id = $1', [disciplina_id]);
+            steps.push({ n: 2, ok: true, removidos: matriculas.rowCount });
+        } else {
+            const contagem = await client.query(
+                'SELECT COUNT(*)::int AS total FROM matriculas WHERE disciplina_id = $1',
+                [disciplina_id]
+            );
+            const totalMatriculas = contagem.rows[0].total;
+            if (totalMatriculas > 0) {
+                await client.query('ROLLBACK'); // Desfaz a etapa 1
+                steps.push({ n: 2, ok: false, total_matriculas: totalMatriculas });
+                return res.status(409).json({
+                    message: `A disciplina possui ${totalMatriculas} matrícula(s). Remova-as antes de excluir (nenhuma alteração foi feita).`,
+                    steps
+                });
+            }
+            steps.push({ n: 2, ok: true, removidos: 0 });
+        }
+
+        // Etapa 3: associações com turmas
+        const associacoes = await client.query('DELETE FROM turma_disciplinas WHERE disciplina_id = $1', [disciplina_id]);
+        steps.push({ n: 3, ok: true, removidos: associacoes.rowCount });
+
+        // Etapa 4: a disciplina
+        const disciplina = await client.query('DELETE FROM disciplinas WHERE disciplina_id = $1 RETURNING *', [disciplina_id]);
+        if (disciplina.rowCount === 0) {
+            await client.query('ROLLBACK');
+            steps.push({ n: 4, ok: false });
+            return res.status(404).json({ message: 'Disciplina não encontrada para exclusão.', steps });
+        }
+        steps.push({ n: 4, ok: true, removidos: 1 });
+
+        await client.query('COMMIT'); // Confirma a transação
+
+        res.status(200).json({
+            message: 'Disciplina excluída permanentemente com sucesso!',
+            disciplina_excluida: disciplina.rows[0],
+            steps
+        });
+
+    } catch (error) {
+        await client.query('ROLLBACK'); // Desfaz a transação em caso de erro
+        // Erro 23503: outra tabela (ex.: presença) ainda depende das matrículas/disciplina
+        if (error.code === '23503') {
+            return res.status(409).json({
+                message: 'Erro: Não é possível excluir esta disciplina pois ainda existem registros associados (nenhuma alteração foi feita).',
+                detail: error.detail,
+                steps
+            });
+        }
+        console.error('Erro ao excluir disciplina (cascata):', error);
+        res.status(500).json({ message: 'Erro no servidor.', error: error.message, steps });
+    } finally {
+        client.release(); // Libera o cliente de volta para o pool
+    }
+};
+
 const deleteTurma = async (req, res) => {
     // Permissão: Apenas Administradores
     if (req.user.tipo_usuario !== 'admin') {
@@ -768,12 +910,82 @@ const deleteTurma = async (req, res) => {
     }
 };
 
+// Situação de uma disciplina antes da exclusão (assistente do painel admin):
+// se há notas, quantas matrículas e em quantas turmas ela está associada.
+// Tudo em UMA consulta, em vez de uma requisição por turma no navegador.
+const getDisciplinaStatus = async (req, res) => {
+    // Permissão: Apenas Administradores
+    if (req.user.tipo_usuario !== 'admin') {
+        return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
+    }
+
+    const { disciplina_id } = req.params; // ID vem da URL
+
+    try {
+        const sql = `
+            SELECT
+                EXISTS (SELECT 1 FROM notas WHERE disciplina_id = $1) AS tem_notas,
+                (SELECT COUNT(*) FROM matriculas WHERE disciplina_id = $1)::int AS total_matriculas,
+                (SELECT COUNT(*) FROM turma_disciplinas WHERE disciplina_id = $1)::int AS turmas_associadas;
+        `;
+        const params = [disciplina_id];
+
+        const result = await db.query(sql, params);
+        const status = result.rows[0];
+
+        res.status(200).json({
+            message: 'Status da disciplina carregado com sucesso!',
+            disciplina_id: Number(disciplina_id),
+            tem_notas: status.tem_notas,
+            total_matriculas: status.total_matriculas,
+            turmas_associadas: status.turmas_associadas
+        });
+    } catch (error) {
+        console.error('Erro ao buscar status da disciplina:', error);
+        res.status(500).json({ message: 'Erro no servidor.', error: error.message });
+    }
+};
+
+// Turmas em que uma disciplina está associada (via turma_disciplinas).
+// O assistente de exclusão desassocia só dessas, e não de todas as turmas.
+const getTurmasByDisciplina = async (req, res) => {
+    // Permissão: Apenas Administradores
+    if (req.user.tipo_usuario !== 'admin') {
+        return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
+    }
+
+    const { disciplina_id } = req.params; // ID vem da URL
+
+    try {
+        const sql = `
+            SELECT t.turma_id, t.nome_turma, t.ano
+            FROM turma_disciplinas td
+            JOIN turmas t ON t.turma_id = td.turma_id
+            WHERE td.disciplina_id = $1
+            ORDER BY t.ano DESC, t.nome_turma ASC;
+        `;
+        const params = [disciplina_id];
+
+        const result = await db.query(sql, params);
+
+        res.status(200).json({
+            message: 'Turmas da disciplina carregadas com sucesso!',
+            disciplina_id: Number(disciplina_id),
+            turmas: result.rows
+        });
+    } catch (error) {
+        console.error('Erro ao listar turmas da disciplina:', error);
+        res.status(500).json({ message: 'Erro no servidor.', error: error.message });
+    }
+};
+
 // Funcao para listar todas as disciplinas
 const getAllDisciplinas = async (req, res) => {
     try {
         const sql = 'SELECT * FROM disciplinas ORDER BY nome_disciplina ASC';
         const resultado = await db.query(sql);
 
+        res.set('Cache-Control', LISTA_CACHE_CONTROL);
         res.status(200).json({
             message: 'Lista de disciplinas',
             disciplinas: resultado.rows
@@ -968,6 +1180,50 @@ const deleteMatricula = async (req, res) => {
     }
 };
 
+// Busca UMA matrícula pelo trio (aluno, turma, disciplina)
+// Evita que o painel do admin baixe todos os alunos da disciplina só para
+// encontrar um: a consulta usa a restrição única (aluno_id, turma_id, disciplina_id)
+const getMatricula = async (req, res) => {
+    // Permissão: Apenas Administradores
+    if (req.user.tipo_usuario !== 'admin') {
+        return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
+    }
+
+    const { aluno_id, turma_id, disciplina_id } = req.query; // Ex: ?aluno_id=1&turma_id=2&disciplina_id=3
+
+    if (!aluno_id || !turma_id || !disciplina_id) {
+        return res.status(400).json({ message: 'Aluno, turma e disciplina são obrigatórios' });
+    }
+
+    try {
+        const sql = `
+            -- Nome já montado no banco (CONCAT_WS ignora sobrenome nulo)
+            SELECT m.matricula_id, m.aluno_id, CONCAT_WS(' ', a.nome, a.sobrenome) AS nome_completo
+            FROM matriculas m
+            JOIN alunos a ON a.aluno_id = m.aluno_id
+            WHERE m.aluno_id = $1 AND m.turma_id = $2 AND m.disciplina_id = $3
+            LIMIT 1;
+        `;
+        const params = [aluno_id, turma_id, disciplina_id];
+
+        const result = await db.query(sql, params);
+
+        if (result.rows.length === 0) {
+            return res.status(404).json({ message: 'Matrícula não encontrada.' });
+        }
+
+        const matricula = result.rows[0];
+        res.status(200).json({
+            message: 'Matrícula encontrada!',
+            matricula_id: matricula.matricula_id,
+            matricula
+        });
+    } catch (error) {
+        console.error('Erro ao buscar matrícula:', error);
+        res.status(500).json({ message: 'Erro no servidor.', error: error.message });
+    }
+};
+
 const getAlunoBoletim = async (req, res) => {
     const usuario_id = req.user.id; 
 
@@ -1530,13 +1786,30 @@ const getAllProfessores = async (req, res) => {
 };
 
 // Função para listar todos os usuários do tipo 'aluno' (com dados do perfil)
+// Query opcional: ?q=<prefixo do nome>&limit=<n> (busca incremental do painel admin)
 const getAllAlunos = async (req, res) => {
     // Permissão: Apenas Admin pode ver a lista completa
     if (req.user.tipo_usuario !== 'admin') {
         return res.status(403).json({ message: 'Acesso negado. Apenas administradores.' });
     }
 
+    const { q, limit } = req.query;
+
     try {
+        const params = [];
+        let filtro = '';
+        if (q) {
+            // Prefixo do nome ou do sobrenome; escapa os curingas do LIKE
+            params.push(String(q).replace(/[\\%_]/g, '\\$&') + '%');
+            filtro = `AND (a.nome ILIKE $1 OR a.sobrenome ILIKE $1 OR (a.nome || ' ' || a.sobrenome) ILIKE $1)`;
+        }
+        let limite = '';
+        if (limit !== undefined) {
+            const n = parseInt(limit, 10);
+            params.push(Number.isNaN(n) ? 20 : Math.min(Math.max(n, 1), 100));
+            limite = `LIMIT $${params.length}`;
+        }
+
         // Faz JOIN com a tabela 'alunos' para pegar nome, etc.
         const sql = `
             SELECT 
@@ -1552,11 +1825,13 @@ const getAllAlunos = async (req, res) => {
                 alunos a ON u.id_usuario = a.usuario_id
             WHERE 
                 u.tipo_usuario = 'aluno'
+                ${filtro}
             ORDER BY 
-                a.nome, a.sobrenome;
+                a.nome, a.sobrenome
+            ${limite};
         `;
         
-        const result = await db.query(sql);
+        const result = await db.query(sql, params);
 
         res.status(200).json({
             message: 'Lista de alunos carregada.',
@@ -1579,12 +1854,17 @@ module.exports = {
     getProfessorTurmas,
     createDisciplina,
     removeDisciplinaFromTurma,
+    removeDisciplinaFromTurmasBulk,
     deleteDisciplina,
+    deleteDisciplinaCascade,
     deleteTurma,
     getAllDisciplinas,
+    getDisciplinaStatus,
+    getTurmasByDisciplina,
     getDisciplinasByTurma,
     createAlunoProfile,
     deleteMatricula,
+    getMatricula,
     matricularAluno,
     getAlunoBoletim,
     lancarNota,
@@ -82,6 +82,22 @@ router.get(
     academicController.getAllDisciplinas
 );
 
+// Rota para o status de exclusão de uma disciplina: notas, matrículas e turmas (Admin)
+router.get(
+    '/disciplinas/:disciplina_id/status', // Ex: GET /api/academico/disciplinas/5/status
+    academicMiddleware.isAuthenticated,
+    academicMiddleware.isAdmin,
+    academicController.getDisciplinaStatus
+);
+
+// Rota para listar as turmas em que uma disciplina está associada (Admin)
+router.get(
+    '/disciplinas/:disciplina_id/turmas', // Ex: GET /api/academico/disciplinas/5/turmas
+    academicMiddleware.isAuthenticated,
+    academicMiddleware.isAdmin,
+    academicController.getTurmasByDisciplina
+);
+
 // Rota para listar disciplinas de uma turma específica
 router.get(
     '/turmas/:turma_id/disciplinas',
@@ -97,6 +113,14 @@ router.post(
     academicController.removeDisciplinaFromTurma
 );
 
+// Rota para remover uma disciplina de várias turmas em uma única chamada (Admin)
+router.post(
+    '/turmas/remover-disciplina-bulk', // Body: { disciplina_id, turma_ids: [...] }
+    academicMiddleware.isAuthenticated,
+    academicMiddleware.isAdmin,
+    academicController.removeDisciplinaFromTurmasBulk
+);
+
 // Rota para EXCLUIR uma disciplina (Admin)
 router.delete(
     '/disciplinas/:disciplina_id', // Ex: DELETE /api/academico/disciplinas/5
@@ -105,6 +129,14 @@ router.delete(
     academicController.deleteDisciplina
 );
 
+// Rota para EXCLUIR uma disciplina com todas as dependências, em uma transação (Admin)
+router.post(
+    '/disciplinas/:disciplina_id/delete-cascade', // Ex: POST /api/academico/disciplinas/5/delete-cascade
+    academicMiddleware.isAuthenticated,
+    academicMiddleware.isAdmin,
+    academicController.deleteDisciplinaCascade
+);
+
 // Rota para EXCLUIR uma turma (Admin)
 router.delete(
     '/turmas/:turma_id', // Ex: DELETE /api/academico/turmas/3
@@ -176,6 +208,14 @@ router.get(
     academicController.getAllAlunos
 );
 
+// Rota para buscar uma matrícula pelo trio aluno/turma/disciplina (Admin)
+router.get(
+    '/matriculas', // Ex: GET /api/academico/matriculas?aluno_id=1&turma_id=2&disciplina_id=3
+    academicMiddleware.isAuthenticated,
+    academicMiddleware.isAdmin,
+    academicController.getMatricula
+);
+
 //Rota para matricular um aluno
 router.post(
     '/matriculas',
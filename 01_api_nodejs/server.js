@@ -6,6 +6,10 @@ const db = require('./models/db');
 
 const app = express();
 
+// ETag forte (hash do corpo) nas respostas; com If-None-Match igual o
+// Express responde 304 sem corpo
+app.set('etag', 'strong');
+
 app.use(express.json());
 app.use(cors());
 
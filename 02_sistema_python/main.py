@@ -66,16 +66,34 @@ VERSÃO: 1.0.0
 import ctypes          # Interface para bibliotecas C compiladas (DLL/SO)
 import platform        # Detecção do sistema operacional
 import os              # Operações do sistema de arquivos e variáveis de ambiente
+import functools       # lru_cache para inicializações preguiçosas
+import hashlib         # Hash do HTML para geração de ETags
+import threading       # Lock para objetos compartilhados entre threads
+import collections     # OrderedDict para o cache LRU de respostas
+import time            # Relógio monotônico para a validade do cache do painel admin
+import gzip            # Compressão das páginas HTML (estáticas e dinâmicas)
+import zlib            # Compressão gzip incremental das respostas em streaming
+import json            # Serialização de dados embutidos nos <script> das páginas
+import logging         # Mensagens de depuração (sem custo quando o nível está desligado)
+from concurrent.futures import ThreadPoolExecutor  # Chamadas à API em paralelo (painel admin)
 from decimal import Decimal, ROUND_HALF_UP  # Precisão decimal para cálculos de notas
+from types import MappingProxyType  # Dicionários somente leitura (configurações fixas)
 
 # Framework Flask e componentes
-from flask import Flask, render_template_string, request, redirect, url_for, session
+from flask import Flask, Blueprint, Response, request, redirect, url_for, session, send_from_directory, jsonify, stream_with_context
 # Flask: Framework web principal
-# render_template_string: Renderização de templates HTML inline
+# Blueprint: Agrupamento das rotas por perfil (auth, admin, aluno, professor)
+# Response: Respostas HTTP montadas manualmente (cabeçalhos de cache, ETag)
 # request: Acesso a dados de requisições HTTP
 # redirect: Redirecionamento de rotas
 # url_for: Geração de URLs para rotas
 # session: Gerenciamento de sessões do usuário
+# send_from_directory: Envio de arquivos estáticos escolhidos pela rota
+# jsonify: Respostas JSON das ações do painel enviadas via fetch
+from werkzeug.datastructures import MultiDict  # Corpo JSON com a mesma interface de request.form
+
+# Cache de bytecode dos templates Jinja2 (dependência do próprio Flask)
+from jinja2 import ChoiceLoader, DictLoader, FileSystemBytecodeCache, select_autoescape
 
 # Segurança e proteção
 from markupsafe import escape, Markup
@@ -84,6 +102,8 @@ from markupsafe import escape, Markup
 
 # Comunicação HTTP
 import requests  # Cliente HTTP para comunicação com a API Node.js backend
+from requests.adapters import HTTPAdapter  # Pool de conexões da sessão HTTP
+from urllib3.util.retry import Retry  # Novas tentativas em falhas transitórias da API
 
 # Configuração e ambiente
 from dotenv import load_dotenv  # Carregamento de variáveis de ambiente do arquivo .env
@@ -94,6 +114,32 @@ import google.generativeai as genai  # SDK do Google para integração com Gemin
 # Processamento de texto
 import markdown  # Conversão de Markdown para HTML
 
+# Computação numérica (opcional)
+# Usado para montar em bloco o array passado à biblioteca C no relatório de
+# desempenho. Sem NumPy, o array ctypes é montado aluno a aluno.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Compressão Brotli (opcional)
+# Com o pacote brotli instalado, as páginas HTML dinâmicas vão em 'br' para
+# navegadores que aceitam (menores que o gzip). Sem ele, só gzip.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Sessões no servidor (opcional)
+# Com Flask-Session + redis instalados e REDIS_URL definido no .env, os dados
+# da sessão (inclusive o token JWT) ficam no Redis e o cookie leva só o id.
+# Sem eles, a sessão continua no cookie assinado padrão do Flask.
+try:
+    import redis
+    from flask_session import Session as SessaoServidor
+except ImportError:
+    redis = None
+
 
 # ============================================================================
 # CONFIGURAÇÕES INICIAIS E VARIÁVEIS DE  AMBIENTE
@@ -101,32 +147,338 @@ import markdown  # Conversão de Markdown para HTML
 
 # Carrega variáveis de ambiente do arquivo .env na raiz do projeto
 # O arquivo .env deve conter: API_URL, FLASK_SECRET_KEY, GEMINI_API_KEY
+# (e, opcionalmente, REDIS_URL para sessões no servidor)
 load_dotenv()
 
+# Logger do módulo: mensagens de depuração só são formatadas quando o nível
+# DEBUG está habilitado (ao contrário de print, que sempre escreve no stdout)
+logger = logging.getLogger(__name__)
+
 # URL base da API Node.js backend
 # Fallback para localhost:3000 se não estiver configurado no .env
 API_BASE_URL = os.getenv("API_URL", "http://127.0.0.1:3000/api") 
 
+# Sessão HTTP compartilhada para todas as chamadas à API Node.js
+# Reaproveita conexões TCP (pool) entre requisições em vez de abrir uma
+# conexão nova a cada chamada. Toda chamada sem timeout explícito usa
+# API_TIMEOUT (conexão, leitura) para não prender o worker indefinidamente.
+API_TIMEOUT = (3, 10)
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que aplica API_TIMEOUT quando a chamada não define timeout."""
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = API_TIMEOUT
+        return super().send(request, timeout=timeout, **kwargs)
+
+# Novas tentativas só para falhas transitórias (conexão recusada, 502/503/504
+# de um proxy/reinício da API), com backoff curto. Métodos não idempotentes
+# (POST) ficam de fora por padrão: uma ação do admin nunca é repetida.
+# raise_on_status=False devolve a última resposta de erro ao chamador, que
+# já trata status >= 400, em vez de lançar RetryError.
+_API_RETRY = Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504), raise_on_status=False)
+
+_API = requests.Session()
+_API.mount('http://', _TimeoutHTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_API_RETRY))
+_API.mount('https://', _TimeoutHTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_API_RETRY))
+_API.headers.update({'User-Agent': 'PIM-Flask/1.0'})
+
+def _auth_headers(token):
+    """
+    Cabeçalho Authorization (Bearer) das chamadas à API para `token`.
+    
+    Montado a cada chamada, sem cache: o JWT não fica guardado no processo
+    depois da requisição (como em TTLCache, que guarda só um hash). O
+    Content-Type das chamadas com json= é definido pelo próprio requests.
+    """
+    return {"Authorization": f"Bearer {token}"}
+
+# Threads para as chamadas independentes à API do painel admin (listas de
+# recursos, disciplinas de cada turma, alunos de cada turma/disciplina): a
+# latência passa a ser a da chamada mais lenta, e não a soma de todas.
+# Menor que o pool de conexões de _API (32), para que cada thread tenha uma
+# conexão reaproveitável. As tarefas nunca esperam por outras tarefas do pool.
+_ADMIN_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='admin-api')
+
+
+class TTLCache:
+    """
+    Cache em memória, com validade (TTL), dos dados do painel administrativo.
+    
+    Guarda o resultado de cada busca (ex.: 'recursos', 'estrutura') por
+    usuário durante `ttl` segundos: recarregar /painel/admin nesse intervalo
+    não faz nenhuma chamada à API. A chave usa um hash blake2b do token, e
+    não o JWT em si. Qualquer ação do administrador chama invalidar(token).
+    
+    Só resultados completos são guardados: uma busca que falhou (API fora do
+    ar, erro em alguma chamada) é exibida, mas a próxima requisição tenta de
+    novo em vez de repetir a página vazia durante o TTL.
+    
+    Args:
+        ttl (float): Validade de cada entrada, em segundos
+        maxsize (int): Acima desse número de entradas, as vencidas são descartadas
+    """
+    def __init__(self, ttl, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.dados = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _hash(token):
+        return hashlib.blake2b((token or '').encode(), digest_size=16).hexdigest()
+
+    def obter(self, token, nome, gerar):
+        """
+        Retorna o valor em cache para (token, nome) ou gera um novo.
+        
+        gerar() devolve (valor, completo); o valor só é guardado quando
+        completo é verdadeiro.
+        """
+        chave = (self._hash(token), nome)
+        agora = time.monotonic()
+        with self.lock:
+            entrada = self.dados.get(chave)
+        if entrada is not None and entrada[0] > agora:
+            return entrada[1]
+
+        # Gerado fora do lock: as chamadas à API não bloqueiam outros usuários
+        valor, completo = gerar()
+        if not completo:
+            return valor
+        with self.lock:
+            self.dados[chave] = (agora + self.ttl, valor)
+            if len(self.dados) > self.maxsize:
+                self.dados = {k: v for k, v in self.dados.items() if v[0] > agora}
+        return valor
+
+    def contem(self, token, nome):
+        """Indica se há uma entrada ainda válida para (token, nome)."""
+        with self.lock:
+            entrada = self.dados.get((self._hash(token), nome))
+        return entrada is not None and entrada[0] > time.monotonic()
+
+    def invalidar(self, token):
+        """Descarta todas as entradas do usuário dono do token."""
+        token_hash = self._hash(token)
+        with self.lock:
+            for chave in [k for k in self.dados if k[0] == token_hash]:
+                del self.dados[chave]
+
+
+# Dados do painel admin: válidos por 10 s (recargas seguidas, redirecionamentos)
+_ADMIN_CACHE = TTLCache(ttl=10)
+
 # Configuração da API do Google Gemini para assistente de IA
 # A chave deve ser obtida em: https://aistudio.google.com/app/apikey
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
+def _criar_modelo_gemini():
+    """
+    Cria o modelo Gemini com fallback para compatibilidade.
+    
+    Tenta usar o modelo mais recente disponível primeiro; se falhar,
+    tenta modelos alternativos em ordem de preferência.
+    """
+    try:
+        return genai.GenerativeModel('models/gemini-2.5-flash')
+    except:
+        # Fallback 1: Tenta gemini-1.5-pro (mais poderoso)
+        try:
+            return genai.GenerativeModel('gemini-1.5-pro')
+        except:
+            # Fallback 2: Usa gemini-1.5-flash (mais rápido e compatível)
+            return genai.GenerativeModel('gemini-1.5-flash')
+
+# Modelo criado uma única vez na importação e reutilizado por todas as
+# requisições do chat (em vez de um GenerativeModel novo a cada mensagem)
+_GEMINI_MODEL = _criar_modelo_gemini() if GEMINI_API_KEY else None
+
 # Inicialização da aplicação Flask
 # __name__ permite que Flask encontre templates e arquivos estáticos
 app = Flask(__name__)
 
+# Modo debug controlado por variável de ambiente (FLASK_DEBUG=1)
+# Fora do debug, o Jinja não verifica a data de modificação dos templates
+# a cada renderização (auto_reload), eliminando um stat() por requisição.
+FLASK_DEBUG = os.getenv("FLASK_DEBUG", "0") == "1"
+app.config['TEMPLATES_AUTO_RELOAD'] = FLASK_DEBUG
+
+# Cache de bytecode do Jinja2 em disco
+# Os templates compilados são persistidos entre reinicializações do processo,
+# evitando que cada worker novo precise analisar e compilar tudo de novo.
+# O diretório é privado (0700) - nunca use /tmp, que é compartilhado.
+JINJA_CACHE_DIR = os.getenv(
+    "JINJA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jinja_cache")
+)
+os.makedirs(JINJA_CACHE_DIR, mode=0o700, exist_ok=True)
+
+# As opções precisam ser definidas antes do primeiro acesso a app.jinja_env
+# cache_size: quantidade de templates compilados mantidos em memória (explícito
+# para não depender do padrão da versão do Jinja instalada)
+# autoescape: ligado para todo template (inclusive os de DictLoader e
+# from_string), qualquer que seja a extensão do nome - o escape das variáveis
+# fica a cargo do acelerador em C do MarkupSafe, sem escape() manual no Python
+app.jinja_options = {
+    **app.jinja_options,
+    "autoescape": select_autoescape(default=True, default_for_string=True),
+    "bytecode_cache": FileSystemBytecodeCache(JINJA_CACHE_DIR, "%s.cache"),
+    "cache_size": 400,
+    "auto_reload": FLASK_DEBUG,
+}
+
+# Arquivos estáticos: o Werkzeug já envia ETag/Last-Modified. Só as URLs
+# versionadas (?v=) recebem cache de longa duração, em
+# cache_estaticos_versionados; as demais mantêm o max-age padrão do Flask
+# (revalidação), para que um arquivo substituído chegue aos navegadores.
+
+@app.after_request
+def cache_estaticos_versionados(response):
+    """
+    Marca como imutáveis os arquivos de /static/ pedidos com versão (?v=).
+    
+    Os links para as folhas de estilo, os scripts e a imagem de fundo do login
+    sempre levam a versão, que muda junto com o arquivo; o conteúdo de uma URL
+    versionada nunca muda, então o navegador pode reutilizar a cópia local por
+    um ano sem sequer revalidar (Cache-Control: public, max-age=31536000,
+    immutable). Sem ?v=, vale o cache padrão (com revalidação).
+    """
+    if request.path.startswith('/static/') and 'v' in request.args and response.status_code == 200:
+        # send_file marca no-cache quando não há max-age padrão; aqui não vale
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    return response
+
+# Páginas menores que isso não compensam o custo da compressão
+_GZIP_MIN_BYTES = 500
+
+def _gzip_em_partes(partes):
+    """
+    Comprime em gzip uma resposta em streaming, parte a parte.
+    
+    Cada parte é enviada logo depois de comprimida (Z_SYNC_FLUSH): o
+    navegador já consegue descomprimir e exibir o que chegou, sem esperar o
+    fim da resposta.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: cabeçalho gzip
+    for parte in partes:
+        if isinstance(parte, str):
+            parte = parte.encode('utf-8')
+        dados = compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+@app.after_request
+def comprimir_html(response):
+    """
+    Comprime com Brotli ou gzip as páginas HTML dinâmicas (painéis, boletim etc.).
+
+    O HTML dos painéis (em especial /painel/admin, com as tabelas e o
+    assistente de exclusão) repete muita marcação e cai para uma fração do
+    tamanho. Só comprime respostas 200 em text/html acima de _GZIP_MIN_BYTES,
+    quando o navegador aceita gzip; respostas já codificadas (as páginas
+    estáticas de _pagina_estatica já saem em gzip) passam direto. Nível 6:
+    bom equilíbrio entre tamanho e CPU por requisição.
+    
+    Respostas em streaming (painel admin sem cache) são comprimidas em gzip
+    parte a parte, sem juntar o corpo: ver _gzip_em_partes.
+    
+    Brotli (quando o pacote está instalado e o navegador envia 'br') tem
+    preferência: qualidade 5 comprime mais que o gzip nível 6 em tempo
+    parecido. As respostas 304 do painel admin não têm corpo e passam direto.
+    """
+    if (response.status_code != 200
+            or response.mimetype != 'text/html'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    aceitas = request.accept_encodings
+    if response.is_streamed:
+        if 'gzip' in aceitas:
+            response.response = _gzip_em_partes(response.response)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+        return response
+
+    if brotli is not None and 'br' in aceitas:
+        codificacao = 'br'
+    elif 'gzip' in aceitas:
+        codificacao = 'gzip'
+    else:
+        return response
+
+    html = response.get_data()
+    if len(html) < _GZIP_MIN_BYTES:
+        return response
+
+    if codificacao == 'br':
+        response.set_data(brotli.compress(html, quality=5))
+    else:
+        response.set_data(gzip.compress(html, compresslevel=6))
+    response.headers['Content-Encoding'] = codificacao
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/static/tech-bg')
+def imagem_fundo_login():
+    """
+    Imagem de fundo da tela de login, em WebP quando o navegador aceita.
+    
+    O WebP tem cerca de 1/5 do tamanho do JPEG original. Navegadores que não
+    anunciam image/webp explicitamente no Accept (um */* genérico não conta)
+    recebem o tech-bg.jpg. 'Vary: Accept' impede que um cache intermediário
+    entregue a versão errada; o cache de longa duração vem da versão na URL
+    (/static/tech-bg?v=1, em login.css) e de cache_estaticos_versionados.
+    """
+    aceita_webp = any(
+        tipo == 'image/webp' and qualidade > 0
+        for tipo, qualidade in request.accept_mimetypes
+    )
+    nome = 'tech-bg.webp' if aceita_webp else 'tech-bg.jpg'
+    response = send_from_directory(app.static_folder, nome)
+    response.vary.add('Accept')
+    return response
+
 # Configuração da chave secreta para sessões
 # IMPORTANTE: Em produção, use uma chave secreta forte e única
 # A chave secreta é usada para assinar cookies de sessão
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "chave_de_dev_insegura_use_o_env") 
 
+# Sessão no Redis quando configurada: o JWT deixa de viajar no cookie (centenas
+# de bytes em toda requisição, inclusive as de /static/) e o cookie
+# passa a ter só o id da sessão. O uso de session[...] nas rotas não muda.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL and redis is not None:
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis.Redis.from_url(REDIS_URL)
+    # Como o cookie padrão: expira ao fechar o navegador
+    app.config['SESSION_PERMANENT'] = False
+    SessaoServidor(app)
+elif REDIS_URL:
+    logger.warning("REDIS_URL definido, mas Flask-Session/redis não estão instalados: usando sessão em cookie.")
+
 # Constantes para chaves de sessão
 # Essas constantes definem as chaves usadas no dicionário de sessão
 SESSION_KEY_TOKEN = 'user_token'  # Armazena o token JWT retornado pela API
 SESSION_KEY_TYPE = 'user_type'    # Armazena o tipo de usuário (aluno/professor/admin)
 
+# Blueprints: as rotas são agrupadas por perfil, mas todas pertencem à mesma
+# aplicação Flask (um único ambiente Jinja, um único processo).
+# Os endpoints ficam com prefixo do blueprint: url_for('auth.login'),
+# url_for('aluno.boletim'), url_for('professor.gerenciar_turma', ...).
+# O registro na aplicação é feito no final do módulo, depois das rotas.
+auth_bp = Blueprint('auth', __name__)            # Login, cadastro, logout e redirecionamentos
+admin_bp = Blueprint('admin', __name__)          # Painel do administrador
+aluno_bp = Blueprint('aluno', __name__)          # Painel, boletim e assistente de IA do aluno
+professor_bp = Blueprint('professor', __name__)  # Gestão de turmas, notas, presença e relatórios
+
 
 
 # ============================================================================
@@ -143,56 +495,83 @@ SESSION_KEY_TYPE = 'user_type'    # Armazena o tipo de usuário (aluno/professor
 # A biblioteca é opcional - se não for encontrada, o sistema continua
 # funcionando normalmente, mas sem os algoritmos otimizados.
 
-lib_c = None  # Variável global que armazenará a referência à biblioteca
+# O carregamento é preguiçoso: só acontece na primeira chamada de
+# _load_algorithms() (relatório de desempenho). Workers que nunca geram
+# relatórios não pagam o custo do ctypes.CDLL na inicialização.
 
-try:
-    # Detecta o sistema operacional para carregar a biblioteca correta
-    # Windows usa .dll, Linux/Mac usam .so
-    lib_name = "algorithms.dll" if platform.system() == "Windows" else "algorithms.so"
-    
-    # Constrói o caminho relativo para a biblioteca
-    # O caminho é: ../03_algorithms_c/algorithms.dll (ou .so)
-    lib_path = os.path.join(os.path.dirname(__file__), "..", "03_algorithms_c", lib_name)
-
-    # Carrega a biblioteca dinâmica usando ctypes
-    lib_c = ctypes.CDLL(lib_path)
-
-    # Define a estrutura C em Python usando ctypes.Structure
-    # Esta estrutura corresponde ao struct DesempenhoAluno em C:
-    # struct DesempenhoAluno {
-    #     int id_aluno;
-    #     float media_final;
-    # }
-    class DesempenhoAluno(ctypes.Structure):
-        _fields_ = [
-            ("id_aluno", ctypes.c_int),      # ID do aluno (inteiro)
-            ("media_final", ctypes.c_float)   # Média final (ponto flutuante)
+@functools.lru_cache(maxsize=1)
+def _load_algorithms():
+    """
+    Carrega a biblioteca C uma única vez e configura a assinatura das funções.
+    
+    Returns:
+        tuple: (lib, DesempenhoAluno) - a biblioteca carregada e a estrutura
+        ctypes correspondente; (None, None) se a biblioteca não puder ser
+        carregada. O resultado (sucesso ou falha) fica em cache.
+    """
+    try:
+        # Detecta o sistema operacional para carregar a biblioteca correta
+        # Windows usa .dll, Linux/Mac usam .so
+        lib_name = "algorithms.dll" if platform.system() == "Windows" else "algorithms.so"
+        
+        # Constrói o caminho relativo para a biblioteca
+        # O caminho é: ../03_algorithms_c/algorithms.dll (ou .so)
+        lib_path = os.path.join(os.path.dirname(__file__), "..", "03_algorithms_c", lib_name)
+
+        # Carrega a biblioteca dinâmica usando ctypes
+        lib = ctypes.CDLL(lib_path)
+
+        # Define a estrutura C em Python usando ctypes.Structure
+        # Esta estrutura corresponde ao struct DesempenhoAluno em C:
+        # struct DesempenhoAluno {
+        #     int id_aluno;
+        #     float media_final;
+        # }
+        class DesempenhoAluno(ctypes.Structure):
+            _fields_ = [
+                ("id_aluno", ctypes.c_int),      # ID do aluno (inteiro)
+                ("media_final", ctypes.c_float)   # Média final (ponto flutuante)
+            ]
+
+        # Define a assinatura da função C para o Python
+        # void ordenar_por_desempenho(DesempenhoAluno* array, int tamanho)
+        lib.ordenar_por_desempenho.argtypes = [
+            ctypes.POINTER(DesempenhoAluno),  # Ponteiro para array de estruturas
+            ctypes.c_int                       # Tamanho do array
         ]
+        lib.ordenar_por_desempenho.restype = None  # Função void (sem retorno)
 
-    # Define a assinatura da função C para o Python
-    # void ordenar_por_desempenho(DesempenhoAluno* array, int tamanho)
-    lib_c.ordenar_por_desempenho.argtypes = [
-        ctypes.POINTER(DesempenhoAluno),  # Ponteiro para array de estruturas
-        ctypes.c_int                       # Tamanho do array
-    ]
-    lib_c.ordenar_por_desempenho.restype = None  # Função void (sem retorno)
+        print("(Flask) Biblioteca C 'algorithms' carregada com sucesso.")
+        return lib, DesempenhoAluno
 
-    print("(Flask) Biblioteca C 'algorithms' carregada com sucesso.")
+    except Exception as e:
+        # Se houver erro ao carregar a biblioteca, registra o erro mas continua
+        # Isso permite que o sistema funcione mesmo sem a biblioteca C
+        print(f"(Flask) ERRO AO CARREGAR BIBLIOTECA C: {e}")
+        print("   As funcionalidades de relatório C (ordenação) estarão desativadas.")
+        return None, None  # Garante que o app rode mesmo se o C falhar
 
-except Exception as e:
-    # Se houver erro ao carregar a biblioteca, registra o erro mas continua
-    # Isso permite que o sistema funcione mesmo sem a biblioteca C
-    print(f"(Flask) ERRO AO CARREGAR BIBLIOTECA C: {e}")
-    print("   As funcionalidades de relatório C (ordenação) estarão desativadas.")
-    lib_c = None  # Garante que o app rode mesmo se o C falhar
+# dtype NumPy equivalente à struct DesempenhoAluno (int32 + float32)
+_DESEMPENHO_DTYPE = np.dtype([('id_aluno', '<i4'), ('media_final', '<f4')]) if np is not None else None
 
 # ============================================================================
 # FUNÇÕES DE RENDERIZAÇÃO E BASE HTML
 # ============================================================================
 # 
 # Estas funções são responsáveis por gerar o HTML das páginas do sistema.
-# Utilizam render_template_string do Flask para criar templates dinâmicos
-# com conteúdo específico para cada tipo de usuário.
+# Os layouts base são strings preparadas para str.format (uma única
+# passagem de formatação), preenchidas com o conteúdo de cada página.
+
+@functools.lru_cache(maxsize=32)
+def _url(endpoint):
+    """
+    url_for memoizado para endpoints sem parâmetros.
+    
+    O mapa de URLs não muda depois que a aplicação sobe, então a URL de
+    cada endpoint é resolvida uma única vez. Use apenas para endpoints sem
+    argumentos (ex.: 'auth.login', 'aluno.boletim').
+    """
+    return url_for(endpoint)
 
 def gerar_sidebar(user_type=None):
     """
@@ -201,8 +580,7 @@ def gerar_sidebar(user_type=None):
     Esta função cria uma barra lateral de navegação com links específicos
     para cada perfil de usuário, incluindo cores e ícones personalizados.
     
-    Nota: Esta função está atualmente não utilizada (sidebar foi removida),
-    mas é mantida para possível uso futuro.
+    Usada pelo layout com sidebar (render_app_base).
     
     Args:
         user_type (str, optional): Tipo de usuário ('aluno', 'professor', 'admin').
@@ -218,50 +596,76 @@ def gerar_sidebar(user_type=None):
     """
     if not user_type:
         user_type = session.get(SESSION_KEY_TYPE, 'aluno')
+    return _gerar_sidebar_cached(user_type)
+
+# Template de um link da sidebar (campos: url, icon, texto)
+_LINK_TPL = '''
+            <a href="{url}" class="sidebar-link">
+                <span class="sidebar-icon">{icon}</span>
+                <span class="sidebar-text">{texto}</span>
+            </a>
+        '''
+
+@functools.cache
+def _sidebar_configs():
+    """
+    Configurações da sidebar por tipo de usuário (montadas uma única vez).
     
-    # Configurações por tipo de usuário
+    Criadas na primeira chamada - e não na importação - porque as URLs vêm do
+    url_for, que precisa de um contexto de aplicação. O resultado é congelado
+    (MappingProxyType e tuplas) para que ninguém altere o objeto compartilhado.
+    """
+    _link = MappingProxyType
     configs = {
         'aluno': {
             'titulo': 'Aluno',
             'cor': '#667eea',
             'gradiente': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-            'links': [
-                {'url': url_for('painel_aluno'), 'texto': '📊 Dashboard', 'icon': '📊'},
-                {'url': url_for('boletim'), 'texto': '📋 Boletim', 'icon': '📋'},
-                {'url': url_for('chat_ia'), 'texto': '🤖 Assistente IA', 'icon': '🤖'},
-            ]
+            'links': (
+                _link({'url': _url('aluno.painel_aluno'), 'texto': '📊 Dashboard', 'icon': '📊'}),
+                _link({'url': _url('aluno.boletim'), 'texto': '📋 Boletim', 'icon': '📋'}),
+                _link({'url': _url('aluno.chat_ia'), 'texto': '🤖 Assistente IA', 'icon': '🤖'}),
+            )
         },
         'professor': {
             'titulo': 'Professor',
             'cor': '#4CAF50',
             'gradiente': 'linear-gradient(135deg, #4CAF50 0%, #45a049 100%)',
-            'links': [
-                {'url': url_for('painel_professor'), 'texto': '📊 Painel', 'icon': '📊'},
-                {'url': url_for('dashboard'), 'texto': '👥 Minhas Turmas', 'icon': '👥'},
-                {'url': url_for('dashboard'), 'texto': '📝 Lançar Notas', 'icon': '📝'},
-            ]
+            'links': (
+                _link({'url': _url('professor.painel_professor'), 'texto': '📊 Painel', 'icon': '📊'}),
+                _link({'url': _url('auth.dashboard'), 'texto': '👥 Minhas Turmas', 'icon': '👥'}),
+                _link({'url': _url('auth.dashboard'), 'texto': '📝 Lançar Notas', 'icon': '📝'}),
+            )
         },
         'admin': {
             'titulo': 'Administrador',
             'cor': '#ff9800',
             'gradiente': 'linear-gradient(135deg, #ff9800 0%, #f57c00 100%)',
-            'links': [
-                {'url': url_for('painel_admin'), 'texto': '⚙️ Painel Admin', 'icon': '⚙️'},
-                {'url': url_for('dashboard'), 'texto': '📊 Dashboard', 'icon': '📊'},
-            ]
+            'links': (
+                _link({'url': _url('admin.painel_admin'), 'texto': '⚙️ Painel Admin', 'icon': '⚙️'}),
+                _link({'url': _url('auth.dashboard'), 'texto': '📊 Dashboard', 'icon': '📊'}),
+            )
         }
     }
+    return MappingProxyType({
+        tipo: MappingProxyType(config) for tipo, config in configs.items()
+    })
+
+@functools.lru_cache(maxsize=4)
+def _gerar_sidebar_cached(user_type):
+    """
+    Monta o HTML da sidebar para um tipo de usuário (resultado em cache).
     
+    A sidebar não tem dados da requisição: só existem três variações
+    (aluno, professor, admin), então cada uma é montada uma vez por processo.
+    A leitura da sessão fica em gerar_sidebar, fora do cache.
+    """
+    configs = _sidebar_configs()
     config = configs.get(user_type, configs['aluno'])
     
-    links_html = ''
-    for link in config['links']:
-        links_html += f'''
-            <a href="{link['url']}" class="sidebar-link">
-                <span class="sidebar-icon">{link['icon']}</span>
-                <span class="sidebar-text">{link['texto']}</span>
-            </a>
-        '''
+    # Junta todos os links de uma vez (sem concatenações sucessivas),
+    # preenchendo o template pronto direto com o dicionário de cada link
+    links_html = ''.join(_LINK_TPL.format_map(link) for link in config['links'])
     
     sidebar_html = f'''
     <div class="sidebar" style="background: {config['gradiente']};">
@@ -272,9 +676,9 @@ def gerar_sidebar(user_type=None):
             {links_html}
         </nav>
         <div class="sidebar-footer">
-            <a href="{url_for('logout')}" class="sidebar-link sidebar-logout">
+            <a href="{_url('auth.logout')}" class="sidebar-link sidebar-logout">
                 <span class="sidebar-icon">🚪</span>
-                <span class="sidebar-text">Sair</span>
+                <span class="sidebar-text">🚪 Sair</span>
             </a>
         </div>
     </div>
@@ -282,6 +686,67 @@ def gerar_sidebar(user_type=None):
     
     return sidebar_html
 
+# Templates base preparados uma única vez na importação do módulo.
+# O HTML base só tem dois "buracos" (page_title e content_html), sem laços,
+# condicionais ou filtros - por isso não passa pelo Jinja: é preenchido
+# com str.format, que é muito mais barato por requisição.
+# O CSS fica em /static/css/ (base.css e login.css; os painéis têm os seus),
+# cacheado por um ano pelo navegador: ao alterar um arquivo, incremente o ?v=
+# do link correspondente.
+#
+# Como o CSS não está mais no HTML, as únicas chaves são os campos do
+# str.format: os layouts montados abaixo já são os templates finais, sem
+# nenhuma etapa de preparo (escape de chaves) nem string.Template.
+#
+# Os layouts (páginas internas, login/cadastro e app com sidebar) compartilham
+# o mesmo esqueleto _LAYOUT_HTML; só a folha de estilo e o invólucro do
+# conteúdo mudam. A composição é feita aqui, uma vez, e não com {% extends %} em
+# arquivos de template: o resultado é o mesmo HTML, sem custo de Jinja por
+# requisição.
+_LAYOUT_HTML = '''
+    <!DOCTYPE html>
+    <html lang="pt-br">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{page_title}</title>
+        <link rel="stylesheet" href="[css_href]">
+    </head>
+    <body>
+        [corpo]
+    </body>
+    </html>
+    '''
+
+def _montar_layout(css_href, corpo):
+    """Preenche o esqueleto comum com a folha de estilo e o corpo do layout."""
+    return _LAYOUT_HTML.replace('[css_href]', css_href).replace('[corpo]', corpo)
+
+_BASE = _montar_layout(
+    '/static/css/base.css?v=2',
+    '''<div class="main-content">
+            {content_html}
+        </div>'''
+)
+
+_LOGIN_BASE = _montar_layout('/static/css/login.css?v=3', '{content_html}')
+
+# _BASE partido no ponto do conteúdo, para as respostas em streaming: o topo
+# (head com as folhas de estilo) pode ser enviado antes do conteúdo existir
+_BASE_TOPO, _BASE_RODAPE = _BASE.split('{content_html}')
+_BASE_RODAPE = _BASE_RODAPE.format()
+
+# Layout do aplicativo: mesmo esqueleto, com a sidebar ao lado do conteúdo
+_APP_BASE = _montar_layout(
+    '/static/css/base.css?v=2',
+    '''<div class="app-layout">
+            {sidebar_html}
+            <div class="main-content">
+                {content_html}
+            </div>
+        </div>'''
+)
+
 def render_base(content_html, page_title="Sistema Acadêmico PIM"):
     """
     Função principal de renderização que fornece o template base do sistema.
@@ -293,190 +758,68 @@ def render_base(content_html, page_title="Sistema Acadêmico PIM"):
     - Suporte para botões de navegação
     
     Args:
-        content_html (str): Conteúdo HTML específico da página a ser renderizada
+        content_html (str | Markup): Conteúdo HTML específico da página a ser
+            renderizada. É inserido como está: qualquer dado vindo do usuário
+            ou da API deve ser escapado (escape) por quem monta o conteúdo.
         page_title (str): Título da página exibido na aba do navegador
+            (escapado aqui com markupsafe.escape)
     
     Returns:
-        str: HTML completo renderizado usando render_template_string do Flask
+        Response: resposta text/html com o HTML completo, montado a partir do
+            template base (_BASE) via str.format. Todas as rotas devolvem o
+            resultado direto, então a resposta já sai pronta, sem passar pelo
+            Jinja nem pela conversão de str em Response do Flask.
     
     Características do layout:
         - Design responsivo (mobile-friendly)
-        - Estilos CSS inline para evitar dependências externas
+        - Estilos CSS compartilhados em /static/css/base.css (cacheados pelo navegador)
         - Suporte para botões de voltar e sair
         - Background moderno e cores consistentes
     """
-    base_html = f'''
-    <!DOCTYPE html>
-    <html lang="pt-br">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{page_title}</title>
-        <style>
-            :root {{
-                --accent: #1b55f8;
-                --error: #d32f2f;
-            }}
-            
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                padding: 20px;
-                background: #f5f7fa;
-                min-height: 100vh;
-            }}
-            
-            .main-content {{
-                max-width: 1400px;
-                margin: 0 auto;
-            }}
-            
-            .btn-voltar {{
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                padding: 12px 24px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                text-decoration: none;
-                border-radius: 8px;
-                font-weight: 600;
-                font-size: 1rem;
-                transition: all 0.3s ease;
-                box-shadow: 0 2px 6px rgba(102, 126, 234, 0.3);
-                margin-bottom: 20px;
-            }}
-            
-            .btn-voltar:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-            }}
-            
-            .btn-sair {{
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                padding: 12px 24px;
-                background: linear-gradient(135deg, #dc3545 0%, #c82333 100%);
-                color: white;
-                text-decoration: none;
-                border-radius: 8px;
-                font-weight: 600;
-                font-size: 1rem;
-                transition: all 0.3s ease;
-                box-shadow: 0 2px 6px rgba(220, 53, 69, 0.3);
-                margin-bottom: 20px;
-                margin-left: 15px;
-            }}
-            
-            .btn-sair:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 4px 12px rgba(220, 53, 69, 0.4);
-            }}
-            
-            .nav-buttons-container {{
-                display: flex;
-                align-items: center;
-                flex-wrap: wrap;
-                margin-bottom: 20px;
-            }}
-            
-            @media (max-width: 768px) {{
-                .nav-buttons-container {{
-                    flex-direction: column;
-                }}
-                
-                .btn-sair {{
-                    margin-left: 0;
-                    margin-top: 10px;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="main-content">
-            {content_html}
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(base_html, page_title=page_title)
+    return Response(
+        _BASE.format(page_title=escape(page_title), content_html=content_html),
+        mimetype='text/html',
+    )
 
 def render_login_base(content_html, page_title="Login"):
     # (Este é o CSS/HTML que você usou para a tela de login)
-    base_html = f'''
-    <!DOCTYPE html>
-    <html lang="pt-br">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <title>{page_title}</title>
-        <style>
-            :root {{ --accent: #1b55f8; --accent-hover: #133fe0; --muted: #6b7280; --error: #d32f2f; }}
-            * {{ box-sizing: border-box; }}
-            body {{
-                margin: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto;
-                background-image: linear-gradient(rgba(12,18,32,0.45), rgba(12,18,32,0.45)), url('/static/tech-bg.jpg');
-                background-size: cover; background-position: center center; background-attachment: fixed;
-                min-height: 100vh; display: flex; align-items: center; justify-content: center; padding: 24px;
-            }}
-            .login-card {{
-                width: 100%; max-width: 420px; background: #ffffff; border-radius: 12px;
-                box-shadow: 0 10px 30px rgba(16,24,40,0.08); padding: 28px;
-            }}
-            .brand {{ text-align: center; margin-bottom: 18px; }}
-            .brand h2 {{ margin: 0; color: var(--accent); }}
-            label {{ display:block; font-size:0.9rem; color:var(--muted); margin-bottom:6px; }}
-            input[type="text"], input[type="password"], input[type="email"], input[type="date"] {{
-                width: 100%; padding: 10px 12px; border-radius: 8px; border: 1px solid #e6e9ef;
-                margin-bottom: 14px; font-size: 1rem;
-            }}
-            button[type="submit"] {{
-                width: 100%; padding: 12px 14px; border-radius: 8px; border: none;
-                background: var(--accent); color: #fff; font-weight: 600; cursor: pointer; font-size: 1rem;
-            }}
-            button[type="submit"]:hover {{ background: var(--accent-hover); }}
-            .help {{ text-align:center; margin-top:12px; color:var(--muted); font-size:0.9rem; }}
-            .error-message {{ color: var(--error); text-align: center; margin-bottom: 15px; font-size: 0.9rem; }}
-        </style>
-    </head>
-    <body>
-        {content_html}
-    </body>
-    </html>
-    '''
-    return render_template_string(base_html, page_title=page_title)
+    # Mesmo contrato de render_base: content_html já vem escapado de quem
+    # chama (ex.: formulários renderizados pelo Jinja); page_title é escapado aqui.
+    # O CSS da tela de login fica em /static/css/login.css.
+    # Devolve str (e não Response): _pagina_estatica guarda os bytes do HTML.
+    return _LOGIN_BASE.format(page_title=escape(page_title), content_html=content_html)
 
 
-# FUNÇÃO 2: Layout para o Aplicativo (COM Sidebar) - Renomeie sua função antiga
+# FUNÇÃO 2: Layout para o Aplicativo (COM Sidebar)
 def render_app_base(content_html, page_title="Sistema Acadêmico"):
-    # Certifique-se de que esta é a sua função com o código da SIDEBAR
-    app_base_html = f'''
-    <!DOCTYPE html>
-    <a href="{url_for('dashboard')}">Home</a>
-    
-    
-    '''
-    return render_template_string(app_base_html, page_title=page_title)
+    # Página completa (head, CSS base e body) com a sidebar do perfil logado.
+    # Mesmo contrato de render_base para content_html e page_title; a sidebar
+    # vem pronta do cache de gerar_sidebar, então a montagem é um único
+    # str.format, sem Jinja. Assim como render_base, devolve a Response pronta.
+    return Response(
+        _APP_BASE.format(
+            page_title=escape(page_title),
+            sidebar_html=gerar_sidebar(),
+            content_html=content_html,
+        ),
+        mimetype='text/html',
+    )
 
 # 02_sistema_python/main.py
 
-# ... (após def render_base(...) e suas funções auxiliares, mas antes de @app.route('/login'))
+# ... (após def render_base(...) e suas funções auxiliares, mas antes de @auth_bp.route('/login'))
 
-def render_register_form(error_message=None):
-    error_html = f'<p class="error-message">{escape(error_message)}</p>' if error_message else ''
-    form_html = f'''
+# Templates Jinja dos formulários de cadastro e login
+# Carregados uma única vez na importação (_REGISTER_FORM_TPL/_LOGIN_FORM_TPL).
+# A única variação é a mensagem de erro opcional, escapada pelo autoescape
+# do Jinja; as URLs chegam prontas (via _url).
+_REGISTER_FORM_HTML = '''
     <div class="login-card"> 
         <div class="brand">
             <h2>Cadastro</h2>
         </div>
-        {error_html}
-        <form method="POST" action="{url_for('registrar')}">
+        {% if error_message %}<p class="error-message">{{ error_message }}</p>{% endif %}
+        <form method="POST" action="{{ registrar_url }}">
             <label for="nome">Nome:</label>
             <input type="text" name="nome" id="nome" required>
             <label for="sobrenome">Sobrenome:</label>
@@ -491,24 +834,18 @@ def render_register_form(error_message=None):
             <button type="submit">Registrar Aluno</button>
         </form>
         <div class="help">
-            <p>Já tem conta? <a href="{url_for('login')}" style="color: var(--accent); text-decoration: none;">Faça Login</a></p>
+            <p>Já tem conta? <a href="{{ login_url }}" style="color: var(--accent); text-decoration: none;">Faça Login</a></p>
         </div>
     </div>
     '''
-    # Use o render_login_base (sem sidebar)
-    return render_login_base(form_html, "Registrar Aluno")
 
-def render_login_form(error_message=None):
-    # Conteúdo do seu formulário de login (sem a sidebar)
-    error_html = f'<p class="error-message" style="color:#d32f2f;text-align:center;font-size:0.9rem;">{escape(error_message)}</p>' if error_message else ''
-    
-    form_html = f'''
+_LOGIN_FORM_HTML = '''
     <div class="login-card">
         <div class="brand">
             <h2>Login</h2>
         </div>
-        {error_html}
-        <form method="POST" action="{url_for('login')}">
+        {% if error_message %}<p class="error-message" style="color:#d32f2f;text-align:center;font-size:0.9rem;">{{ error_message }}</p>{% endif %}
+        <form method="POST" action="{{ login_url }}">
             <label for="usuario">E-mail:</label>
             <input id="usuario" type="text" name="usuario" required>
             <label for="senha">Senha:</label>
@@ -518,11 +855,113 @@ def render_login_form(error_message=None):
         
         <div class="help">
             <p>Não tem uma conta? 
-               <a href="{url_for('registrar')}" style="color: var(--accent); text-decoration: none;">Registre-se aqui</a>
+               <a href="{{ registrar_url }}" style="color: var(--accent); text-decoration: none;">Registre-se aqui</a>
             </p>
         </div>
     </div>
     '''
+
+# Registrados com nome em um DictLoader (em vez de from_string) para que o
+# bytecode cache configurado em app.jinja_options também valha para eles:
+# só templates obtidos por um loader passam pelo cache em disco.
+# Outros templates internos são adicionados a _TEMPLATES_INTERNOS junto das
+# funções que os usam (sempre antes do primeiro get_template).
+_TEMPLATES_INTERNOS = {
+    'register_form.html': _REGISTER_FORM_HTML,
+    'login_form.html': _LOGIN_FORM_HTML,
+}
+app.jinja_env.loader = ChoiceLoader([
+    app.jinja_env.loader,
+    DictLoader(_TEMPLATES_INTERNOS),
+])
+_REGISTER_FORM_TPL = app.jinja_env.get_template('register_form.html')
+_LOGIN_FORM_TPL = app.jinja_env.get_template('login_form.html')
+
+# Cache das páginas estáticas já renderizadas
+# (chave -> (HTML completo, HTML comprimido com gzip, ETag))
+# Login e cadastro sem mensagem de erro não dependem de sessão, banco ou
+# dados da requisição: o HTML é montado uma vez e servido direto do dicionário.
+# A montagem acontece na primeira requisição (e não na importação) porque
+# url_for precisa de um contexto de requisição.
+_PAGINAS_ESTATICAS = {}
+
+def _pagina_estatica(chave, gerar_html):
+    """
+    Retorna a página em cache para `chave`, gerando-a na primeira chamada.
+    
+    A resposta leva um ETag (hash do HTML, calculado uma única vez) e é
+    condicional: se o navegador enviar If-None-Match com o mesmo ETag,
+    recebe 304 Not Modified sem corpo. 'no-cache' obriga a revalidação a
+    cada acesso - /login redireciona quem já está logado, então o navegador
+    não pode reaproveitar a página sem perguntar ao servidor.
+    
+    O HTML também é comprimido com gzip uma única vez; clientes que aceitam
+    gzip recebem os bytes prontos, sem custo de compressão por requisição.
+    """
+    pagina = _PAGINAS_ESTATICAS.get(chave)
+    if pagina is None:
+        html = gerar_html().encode('utf-8')
+        etag = hashlib.md5(html).hexdigest()
+        pagina = _PAGINAS_ESTATICAS[chave] = (html, gzip.compress(html, compresslevel=9), etag)
+
+    html, html_gz, etag = pagina
+    if 'gzip' in request.accept_encodings:
+        # ETag distinto por codificação: as duas versões não são idênticas byte a byte
+        response = Response(html_gz, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag + '-gz')
+    else:
+        response = Response(html, mimetype='text/html')
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
+
+# Botões da barra de navegação no topo das páginas: (endpoint, classe CSS, rótulo)
+# As barras são montadas a partir destes dados uma única vez (na primeira
+# requisição, por causa do url_for) e reaproveitadas em todas as páginas.
+_BOTAO_SAIR = ('auth.logout', 'btn-sair', 'Sair')
+_BOTAO_VOLTAR_ALUNO = ('aluno.painel_aluno', 'btn-voltar', '← Voltar para o Dashboard')
+_BTN_NAV_TMPL = '<a href="{url}" class="{classe}">{rotulo}</a>'
+_BARRAS_NAV = {}
+
+def _barra_navegacao(*botoes):
+    """Retorna o HTML da barra de navegação com os botões informados (em cache)."""
+    barra = _BARRAS_NAV.get(botoes)
+    if barra is None:
+        links = ''.join(
+            _BTN_NAV_TMPL.format(url=url_for(endpoint), classe=classe, rotulo=rotulo)
+            for endpoint, classe, rotulo in botoes
+        )
+        barra = _BARRAS_NAV[botoes] = f'<div class="nav-buttons-container">{links}</div>'
+    return barra
+
+def render_register_form(error_message=None):
+    if not error_message:
+        return _pagina_estatica('registrar', lambda: _montar_register_form(None))
+    return _montar_register_form(error_message)
+
+def _montar_register_form(error_message):
+    form_html = _REGISTER_FORM_TPL.render(
+        error_message=error_message,
+        registrar_url=_url('auth.registrar'),
+        login_url=_url('auth.login'),
+    )
+    # Use o render_login_base (sem sidebar)
+    return render_login_base(form_html, "Registrar Aluno")
+
+def render_login_form(error_message=None):
+    if not error_message:
+        return _pagina_estatica('login', lambda: _montar_login_form(None))
+    return _montar_login_form(error_message)
+
+def _montar_login_form(error_message):
+    # Conteúdo do seu formulário de login (sem a sidebar)
+    form_html = _LOGIN_FORM_TPL.render(
+        error_message=error_message,
+        login_url=_url('auth.login'),
+        registrar_url=_url('auth.registrar'),
+    )
     # Usa render_login_base que já tem o CSS com a imagem de fundo
     return render_login_base(form_html, "Login")
 
@@ -544,7 +983,7 @@ def require_login(view_func):
     3. Se existir, permite o acesso à rota original
     
     Uso:
-        @app.route('/rota-protegida')
+        @aluno_bp.route('/rota-protegida')
         @require_login
         def minha_rota():
             return "Conteúdo protegido"
@@ -555,172 +994,105 @@ def require_login(view_func):
     Returns:
         Função wrapper que verifica autenticação antes de executar a rota
     """
+    # Referências resolvidas uma vez, na decoração: dentro do wrapper viram
+    # variáveis de closure em vez de buscas no escopo global a cada acesso
+    _session = session
+    _chave = SESSION_KEY_TOKEN
+    _redirect = redirect
+    # URL de login memoizada (_url): o redirecionamento de quem não está
+    # autenticado não passa mais pelo roteamento do url_for a cada vez
+    _url_login = _url
+    
+    # functools.wraps copia __name__ (usado pelo Flask como nome do endpoint),
+    # __doc__, __module__ e __wrapped__ da função original
+    @functools.wraps(view_func)
     def wrapper(*args, **kwargs):
         # Verifica se o token de sessão existe
-        if SESSION_KEY_TOKEN not in session:
-            return redirect(url_for('login'))
+        if _chave not in _session:
+            return _redirect(_url_login('auth.login'))
         return view_func(*args, **kwargs)
-    # Garante que o Flask registra a função com o nome correto
-    wrapper.__name__ = view_func.__name__ 
     return wrapper
 
 
+# CSS e estado vazio do painel do professor (constantes do módulo: o texto
+# não muda entre requisições, então não é recriado a cada renderização).
+# Os estilos dos painéis ficam em /static/css/ como os do layout: ao alterar
+# o arquivo, incremente o ?v= do link.
+_PROFESSOR_CSS = '<link rel="stylesheet" href="/static/css/professor.css?v=1">'
+
+# O estado vazio é Markup (HTML já seguro): criado na importação e só
+# referenciado nas renderizações sem turmas
+_PROFESSOR_EMPTY_HTML = Markup("""
+        <div class="empty-state">
+            <h2 style="color: #666; margin-bottom: 10px;">Nenhuma turma atribuída</h2>
+            <p>Você ainda não possui turmas ou disciplinas atribuídas.</p>
+            <p style="margin-top: 10px; font-size: 0.9rem;">Entre em contato com o administrador do sistema.</p>
+        </div>
+        """)
+
+# Templates (formatação %) dos cards do painel do professor; os valores
+# chegam já escapados
+# _DISCIPLINA_TPL: (nome da disciplina, disciplina_id, URL de gestão)
+_DISCIPLINA_TPL = """
+                <div class="disciplina-item">
+                    <div class="disciplina-nome">%s</div>
+                    <div class="disciplina-id">ID: %s</div>
+                    <a href='%s' class="btn-gerenciar">
+                        Gerenciar Alunos e Notas
+                    </a>
+                </div>
+                """
+
+# _TURMA_CARD_TPL: (nome da turma, ano, turma_id, HTML das disciplinas)
+_TURMA_CARD_TPL = """
+            <div class="turma-card">
+                <div class="turma-card-header">
+                    <h3>%s</h3>
+                    <div class="ano">Ano: %s • ID: %s</div>
+                </div>
+                %s
+            </div>
+            """
+
 def render_professor_content(user_type, turmas, message, message_class):
     """Gera o HTML do painel do professor, incluindo cards visuais."""
     
-    # CSS adicional para melhor apresentação
-    professor_css = """
-    <style>
-        .professor-header {
-            background: linear-gradient(135deg, #1b55f8 0%, #133fe0 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 12px;
-            margin-bottom: 30px;
-            box-shadow: 0 4px 12px rgba(27, 85, 248, 0.2);
-        }
-        .professor-header h1 {
-            margin: 0 0 10px 0;
-            font-size: 2rem;
-        }
-        .professor-stats {
-            display: flex;
-            gap: 20px;
-            margin-top: 15px;
-            flex-wrap: wrap;
-        }
-        .stat-card {
-            background: rgba(255, 255, 255, 0.15);
-            padding: 15px 20px;
-            border-radius: 8px;
-            backdrop-filter: blur(10px);
-        }
-        .stat-card strong {
-            display: block;
-            font-size: 1.8rem;
-            margin-bottom: 5px;
-        }
-        .stat-card span {
-            font-size: 0.9rem;
-            opacity: 0.9;
-        }
-        .turmas-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-            gap: 20px;
-            margin-top: 20px;
-        }
-        .turma-card {
-            background: #fff;
-            border-radius: 12px;
-            padding: 20px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            border-left: 4px solid #1b55f8;
-            transition: transform 0.2s, box-shadow 0.2s;
-        }
-        .turma-card:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }
-        .turma-card-header {
-            margin-bottom: 15px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eee;
-        }
-        .turma-card-header h3 {
-            margin: 0 0 5px 0;
-            color: #1b55f8;
-            font-size: 1.3rem;
-        }
-        .turma-card-header .ano {
-            color: #666;
-            font-size: 0.9rem;
-        }
-        .disciplina-item {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 15px;
-        }
-        .disciplina-item:last-child {
-            margin-bottom: 0;
-        }
-        .disciplina-nome {
-            font-weight: 600;
-            color: #333;
-            margin-bottom: 8px;
-            font-size: 1.1rem;
-        }
-        .disciplina-id {
-            color: #666;
-            font-size: 0.85rem;
-            margin-bottom: 12px;
-        }
-        .btn-gerenciar {
-            display: inline-block;
-            background: #4CAF50;
-            color: white;
-            padding: 10px 20px;
-            border-radius: 6px;
-            text-decoration: none;
-            font-weight: 600;
-            transition: background 0.2s;
-            width: 100%;
-            text-align: center;
-            box-sizing: border-box;
-        }
-        .btn-gerenciar:hover {
-            background: #45a049;
-        }
-        .empty-state {
-            text-align: center;
-            padding: 60px 20px;
-            background: #f8f9fa;
-            border-radius: 12px;
-            color: #666;
-        }
-        .empty-state-icon {
-            font-size: 4rem;
-            margin-bottom: 20px;
-        }
-        .feedback-box {
-            padding: 12px 20px;
-            margin-bottom: 20px;
-            border-radius: 8px;
-            border-left: 4px solid;
-        }
-        .feedback-box.success {
-            background: #d4edda;
-            border-color: #28a745;
-            color: #155724;
-        }
-        .feedback-box.error {
-            background: #f8d7da;
-            border-color: #dc3545;
-            color: #721c24;
-        }
-    </style>
-    """
-    
     # Mensagens de Feedback melhoradas
     feedback_html = ''
     if message:
         box_class = 'success' if message_class == 'success' else 'error'
         feedback_html = f'<div class="feedback-box {box_class}">{escape(message)}</div>'
     
-    # Contagem de estatísticas (calcula após agrupamento para evitar duplicatas)
-    turmas_agrupadas_temp = {}
-    if turmas:
-        for t in turmas:
-            turma_id = t.get('turma_id')
-            disciplina_id = t.get('disciplina_id')
-            if turma_id not in turmas_agrupadas_temp:
-                turmas_agrupadas_temp[turma_id] = set()
-            if disciplina_id:
-                turmas_agrupadas_temp[turma_id].add(disciplina_id)
+    # Agrupa disciplinas por turma, removendo duplicatas, em uma única passada;
+    # as estatísticas saem do próprio agrupamento
+    turmas_agrupadas = {}
+    vistos = set()  # Pares (turma_id, disciplina_id) já processados
+    for t in turmas or ():
+        turma_id = t.get('turma_id')
+        disciplina_id = t.get('disciplina_id')
+        
+        # Linha repetida (mesma turma e disciplina): descarta com uma única
+        # consulta ao set, antes de qualquer trabalho de agrupamento
+        chave = (turma_id, disciplina_id)
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+        
+        turma = turmas_agrupadas.setdefault(turma_id, {
+            'nome': t.get('nome_turma'), 
+            'ano': t.get('ano'), 
+            'disciplinas': {}  # Chave: disciplina_id
+        })
+        
+        # O par é inédito, então a disciplina ainda não existe nesta turma
+        if disciplina_id:
+            turma['disciplinas'][disciplina_id] = {
+                'disciplina_id': disciplina_id,
+                'nome_disciplina': t.get('nome_disciplina', 'N/A')
+            }
     
-    total_turmas = len(turmas_agrupadas_temp) if turmas else 0
-    total_disciplinas = sum(len(discs) for discs in turmas_agrupadas_temp.values()) if turmas else 0
+    total_turmas = len(turmas_agrupadas)
+    total_disciplinas = sum(len(info['disciplinas']) for info in turmas_agrupadas.values())
     
     # Header com estatísticas
     header_html = f"""
@@ -742,297 +1114,89 @@ def render_professor_content(user_type, turmas, message, message_class):
     
     # Cards de Turmas e Disciplinas
     if turmas:
-        # Agrupa disciplinas por turma, removendo duplicatas
-        turmas_agrupadas = {}
-        for t in turmas:
-            turma_id = t.get('turma_id')
-            disciplina_id = t.get('disciplina_id')
-            
-            if turma_id not in turmas_agrupadas:
-                 turmas_agrupadas[turma_id] = {
-                     'nome': t.get('nome_turma'), 
-                     'ano': t.get('ano'), 
-                     'disciplinas': {}  # Usa dict para evitar duplicatas (chave: disciplina_id)
-                 }
-            
-            # Só adiciona a disciplina se ela ainda não existir nesta turma
-            if disciplina_id and disciplina_id not in turmas_agrupadas[turma_id]['disciplinas']:
-                turmas_agrupadas[turma_id]['disciplinas'][disciplina_id] = {
-                    'disciplina_id': disciplina_id,
-                    'nome_disciplina': t.get('nome_disciplina', 'N/A')
-                }
+        # Fragmentos acumulados em lista e unidos uma única vez no final
+        # (evita recopiar o HTML inteiro a cada concatenação)
+        cards = ['<div class="turmas-grid">']
         
-        turmas_cards_html = '<div class="turmas-grid">'
+        # Prefixo da rota de gestão (/gerenciar/turma) resolvido uma única vez
+        # pelo url_for; no laço só os IDs são acrescentados
+        gerenciar_base = url_for('professor.gerenciar_turma', turma_id=0, disciplina_id=0)[:-len('/0/0')]
         
-        for turma_id, info in turmas_agrupadas.items():
-            nome_turma = escape(info['nome'])
-            ano = info['ano']
-            
-            disciplinas_html = ''
-            # Converte o dict de disciplinas para lista e renderiza
-            for disciplina_id, disc_info in info['disciplinas'].items():
-                disciplina_nome = escape(disc_info['nome_disciplina'])
-                gerenciar_url = url_for('gerenciar_turma', turma_id=turma_id, disciplina_id=disciplina_id) if disciplina_id else '#'
+        # Nomes escapados de uma vez, antes da formatação: o laço abaixo só
+        # monta o HTML a partir de tuplas prontas
+        # (turma_id, nome_turma, ano, [(disciplina_id, nome_disciplina), ...])
+        _esc = escape
+        turmas_dados = [
+            (
+                turma_id,
+                _esc(info['nome']),
+                info['ano'],
+                [(disciplina_id, _esc(disc_info['nome_disciplina']))
+                 for disciplina_id, disc_info in info['disciplinas'].items()],
+            )
+            for turma_id, info in turmas_agrupadas.items()
+        ]
+        
+        for turma_id, nome_turma, ano, disciplinas in turmas_dados:
+            disciplinas_partes = []
+            for disciplina_id, disciplina_nome in disciplinas:
+                gerenciar_url = f'{gerenciar_base}/{turma_id}/{disciplina_id}' if disciplina_id else '#'
                 
-                disciplinas_html += f"""
-                <div class="disciplina-item">
-                    <div class="disciplina-nome">{disciplina_nome}</div>
-                    <div class="disciplina-id">ID: {disciplina_id}</div>
-                    <a href='{gerenciar_url}' class="btn-gerenciar">
-                        Gerenciar Alunos e Notas
-                    </a>
-                </div>
-                """
+                disciplinas_partes.append(_DISCIPLINA_TPL % (disciplina_nome, disciplina_id, gerenciar_url))
             
-            turmas_cards_html += f"""
-            <div class="turma-card">
-                <div class="turma-card-header">
-                    <h3>{nome_turma}</h3>
-                    <div class="ano">Ano: {ano} • ID: {turma_id}</div>
-                </div>
-                {disciplinas_html}
-            </div>
-            """
+            cards.append(_TURMA_CARD_TPL % (nome_turma, ano, turma_id, ''.join(disciplinas_partes)))
         
-        turmas_cards_html += '</div>'
+        cards.append('</div>')
+        turmas_cards_html = ''.join(cards)
     else:
-        turmas_cards_html = """
-        <div class="empty-state">
-            <h2 style="color: #666; margin-bottom: 10px;">Nenhuma turma atribuída</h2>
-            <p>Você ainda não possui turmas ou disciplinas atribuídas.</p>
-            <p style="margin-top: 10px; font-size: 0.9rem;">Entre em contato com o administrador do sistema.</p>
-        </div>
-        """
+        turmas_cards_html = _PROFESSOR_EMPTY_HTML
     
     # Conteúdo final
     return f"""
-    {professor_css}
+    {_PROFESSOR_CSS}
     {header_html}
     {feedback_html}
     <h2 style="color: #333; margin-top: 30px; margin-bottom: 20px;">Minhas Turmas e Disciplinas</h2>
     {turmas_cards_html}
     """
 
-def build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback):
-    """Constrói a tabela de alunos com formulários de ação (Nota/Presença)."""
-    from flask import url_for # Garante que url_for funciona dentro desta função
-    
-    html = f'<h1>Gestão de Turma/Disciplina</h1>'
-    html += f'<h2>Turma: {turma_id} | Disciplina: {disciplina_id}</h2>'
-    html += f'<p style="color:red;">{feedback}</p>'
-    
-    if not alunos:
-        html += '<p>Nenhum aluno matriculado ou erro de busca.</p>'
-        return html
-    
-    # Tabela de Gestão
-    html += '''
-    <table class="boletim">
-        <tr>
-            <th>ID</th>
-            <th>Nome do Aluno</th>
-            <th>Nota Atual</th>
-            <th>Ação: Lançar Nota</th>
-            <th>Ação: Presença</th>
-        </tr>
-    '''
-    for aluno in alunos:
-        aluno_id = aluno.get('aluno_id')
-        nome_completo = f"{escape(aluno.get('nome', ''))} {escape(aluno.get('sobrenome', ''))}"
-        nota_atual = aluno.get('nota_atual', 'N/D') if aluno.get('nota_atual') is not None else 'Lançar'
-
-        # Formulário para Nota (action deve apontar para uma rota POST que processa a nota)
-        html += f'''
-        <tr>
-            <td>{aluno_id}</td>
-            <td>{nome_completo}</td>
-            <td>{nota_atual}</td>
-            <td>
-                <form action="{url_for('lancar_nota_form')}" method="POST" style="display:inline-flex; gap: 5px;">
-                    <input type="hidden" name="aluno_id" value="{aluno_id}">
-                    <input type="hidden" name="disciplina_id" value="{disciplina_id}">
-                    <input type="number" step="0.1" name="valor_nota" placeholder="Nota" style="width: 70px; border-radius: 4px;">
-                    <button type="submit">Lançar</button>
-                </form>
-            </td>
-            <td>
-                <button onclick="alert('Presença para {nome_completo} marcada!')" style="background: green; color: white; border: none; padding: 5px; border-radius: 4px;">Marcar Presença</button>
-            </td>
-        </tr>
-        '''
-    html += '</table>'
-    return html
-def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=None):
-    print(f"\n--- [render_admin_content] Iniciando Renderização ---")
-    print(f"[render_admin_content] Número de Professores Recebidos: {len(recursos.get('professores', []))}")
-    print(f"[render_admin_content] Número de Alunos Recebidos: {len(recursos.get('alunos', []))}\n")
-    
-    # CSS adicional para melhor organização
-    admin_css = """
-    <style>
-        .admin-section { margin-bottom: 40px; }
-        .admin-section-title { 
-            font-size: 1.5rem; 
-            color: #333; 
-            margin-bottom: 20px; 
-            padding-bottom: 10px; 
-            border-bottom: 2px solid #1b55f8; 
-        }
-        .admin-grid { 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); 
-            gap: 20px; 
-            margin-bottom: 30px; 
-        }
-        .admin-card { 
-            background: #fff; 
-            padding: 20px; 
-            border-radius: 8px; 
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1); 
-            border-left: 4px solid #1b55f8;
-        }
-        .admin-card.danger { border-left-color: #d32f2f; }
-        .admin-card.warning { border-left-color: #ff9800; }
-        .admin-card h3 { 
-            margin-top: 0; 
-            color: #1b55f8; 
-            font-size: 1.2rem; 
-        }
-        .admin-card.danger h3 { color: #d32f2f; }
-        .admin-card.warning h3 { color: #ff9800; }
-        .admin-card label { 
-            display: block; 
-            margin-top: 10px; 
-            margin-bottom: 5px; 
-            font-weight: 500; 
-            color: #555; 
-        }
-        .admin-card input, .admin-card select, .admin-card textarea { 
-            width: 100%; 
-            padding: 8px 12px; 
-            border: 1px solid #ddd; 
-            border-radius: 4px; 
-            font-size: 0.95rem; 
-            box-sizing: border-box;
-        }
-        .admin-card button { 
-            margin-top: 15px; 
-            padding: 10px 20px; 
-            border: none; 
-            border-radius: 4px; 
-            cursor: pointer; 
-            font-weight: 600; 
-            font-size: 0.95rem;
-        }
-        .admin-card button.primary { 
-            background: #1b55f8; 
-            color: white; 
-        }
-        .admin-card button.primary:hover { background: #133fe0; }
-        .admin-card button.danger { 
-            background: #d32f2f; 
-            color: white; 
-        }
-        .admin-card button.danger:hover { background: #b71c1c; }
-        .admin-card button.warning { 
-            background: #ff9800; 
-            color: white; 
-        }
-        .admin-card button.warning:hover { background: #f57c00; }
-        .info-box { 
-            background: #e3f2fd; 
-            padding: 12px; 
-            border-radius: 4px; 
-            margin-top: 10px; 
-            font-size: 0.9rem; 
-            color: #1976d2; 
-        }
-        .admin-table-section { 
-            background: #fff; 
-            padding: 25px; 
-            border-radius: 8px; 
-            margin-top: 30px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        .admin-table-section h2 {
-            margin-top: 0;
-            margin-bottom: 20px;
-            color: #333;
-            font-size: 1.4rem;
-        }
-        .admin-table-section table {
-            width: 100%;
-            border-collapse: collapse;
-            background: #fff;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-        }
-        .admin-table-section table thead {
-            background: linear-gradient(135deg, #1b55f8 0%, #133fe0 100%);
-            color: white;
-        }
-        .admin-table-section table th {
-            padding: 15px 12px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 0.95rem;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .admin-table-section table tbody tr {
-            border-bottom: 1px solid #e0e0e0;
-            transition: background-color 0.2s;
-        }
-        .admin-table-section table tbody tr:hover {
-            background-color: #f5f5f5;
-        }
-        .admin-table-section table tbody tr:last-child {
-            border-bottom: none;
-        }
-        .admin-table-section table tbody tr:nth-child(even) {
-            background-color: #fafafa;
-        }
-        .admin-table-section table tbody tr:nth-child(even):hover {
-            background-color: #f0f0f0;
-        }
-        .admin-table-section table td {
-            padding: 12px;
-            color: #333;
-            font-size: 0.95rem;
-        }
-        .admin-table-section table tbody tr td:first-child {
-            font-weight: 600;
-            color: #1b55f8;
-        }
-    </style>
-    """
-    
-    # HTML de feedback (permite <br> tags para quebras de linha)
-    if feedback_msg:
-        # Se a mensagem contém <br>, permite renderizar como HTML; caso contrário, escapa
-        if '<br>' in feedback_msg:
-            # Separa por <br>, escapa cada parte, e junta com <br>
-            partes = feedback_msg.split('<br>')
-            partes_seguras = [escape(p) for p in partes]
-            safe_msg = Markup('<br>'.join(partes_seguras))
-        else:
-            # Mensagem sem <br>, escapa normalmente
-            safe_msg = escape(feedback_msg)
-        
-        feedback_html = f'<div class="{feedback_cls}" style="padding: 12px; margin-bottom: 20px; border-radius: 4px; background: {"#d4edda" if feedback_cls == "success" else "#f8d7da"}; color: {"#155724" if feedback_cls == "success" else "#721c24"};">{safe_msg}</div>'
-    else:
-        feedback_html = ''
+# CSS do painel administrativo (link para /static/css/admin.css)
+_ADMIN_CSS = '<link rel="stylesheet" href="/static/css/admin.css?v=4">'
 
-    # Cria as opções para selects (turmas e disciplinas)
-    turma_options = ''.join(f'<option value="{t["turma_id"]}">{escape(t["nome_turma"])} ({t["ano"]})</option>' for t in recursos['turmas'])
-    disciplina_options = ''.join(f'<option value="{d["disciplina_id"]}">{escape(d["nome_disciplina"])}</option>' for d in recursos['disciplinas'])
-    
-    # Cria lista de professores para select melhorado
-    professor_options = ''.join(f'<option value="{p.get("id_usuario")}">{escape(p.get("email", "N/A"))} (ID: {p.get("id_usuario")})</option>' for p in recursos.get('professores', []))
+# Templates das <option> dos selects do painel administrativo (formatação %)
+_TURMA_OPT = '<option value="%s">%s (%s)</option>'
+_DISCIPLINA_OPT = '<option value="%s">%s</option>'
+_PROFESSOR_OPT = '<option value="%s">%s (ID: %s)</option>'
 
-    # === SEÇÃO 1: CRIAÇÃO DE RECURSOS ===
-    secao_criacao = f"""
+# Opção exibida quando a lista correspondente está vazia (Markup criado uma
+# vez na importação; o autoescape dos templates o repassa sem escapar)
+_NO_TURMA_OPT = Markup('<option>Nenhuma turma disponível</option>')
+_NO_DISCIPLINA_OPT = Markup('<option>Nenhuma disciplina disponível</option>')
+_NO_PROFESSOR_OPT = Markup('<option>Nenhum professor disponível</option>')
+
+@functools.lru_cache(maxsize=16)
+def _opcoes_html(template, linhas):
+    """
+    Monta (e guarda em cache) o HTML de uma lista de <option>.
+    
+    Args:
+        template (str): Um dos templates _*_OPT acima
+        linhas (tuple): Tuplas com os valores de cada opção, na ordem dos %s.
+            Funcionam como impressão digital dos recursos: qualquer mudança
+            (criação, exclusão, renomeação) gera outra chave e o HTML é refeito.
+    
+    Todos os valores passam por escape (para números o resultado é o próprio
+    número em texto). Listas (e não geradores) no join. O resultado é Markup:
+    já está escapado e vai direto para os templates das seções.
+    """
+    _esc = escape
+    return Markup(''.join([template % tuple(map(_esc, linha)) for linha in linhas]))
+
+# Seções fixas do painel administrativo como templates Jinja (compilados uma
+# vez). Recebem só as listas de <option> (já escapadas por _opcoes_html, por
+# isso chegam como Markup e já com a opção de lista vazia resolvida) e, nas
+# ações destrutivas, a configuração (JSON) do /static/js/admin.js.
+_TEMPLATES_INTERNOS['admin/criacao.html'] = """
     <div class="admin-section">
         <h2 class="admin-section-title">Criar Recursos</h2>
         <div class="admin-grid">
@@ -1074,9 +1238,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
         </div>
     </div>
     """
-    
-    # === SEÇÃO 2: GESTÃO DE TURMAS ===
-    secao_gestao_turmas = f"""
+_ADMIN_CRIACAO_TPL = app.jinja_env.get_template('admin/criacao.html')
+
+_TEMPLATES_INTERNOS['admin/gestao_turmas.html'] = """
     <div class="admin-section">
         <h2 class="admin-section-title">Gestão de Turmas</h2>
         <div class="admin-grid">
@@ -1088,12 +1252,12 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <label for="turma_id">Turma:</label>
                     <select name="turma_id" id="turma_id" required>
                         <option value="">Selecione uma turma...</option>
-                        {turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}
+                        {{ turma_options }}
                     </select>
                     <label for="professor_id">Professor:</label>
                     <select name="professor_id" id="professor_id" required>
                         <option value="">Selecione um professor...</option>
-                        {professor_options if professor_options else '<option>Nenhum professor disponível</option>'}
+                        {{ professor_options }}
                     </select>
                     <div class="info-box" style="background: #fff3cd; border-left: 4px solid #ffc107;">
                         <strong>ATENÇÃO:</strong> Este formulário define o professor responsável geral da turma. Para ter professores diferentes para disciplinas diferentes na mesma turma, use o formulário "Associar Professor à Disciplina" abaixo.
@@ -1107,9 +1271,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                 <form method="POST">
                     <input type="hidden" name="action" value="assign_disciplinas">
                     <label for="turma_id_disciplina">Turma:</label>
-                    <select name="turma_id_disciplina" id="turma_id_disciplina">{turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}</select>
+                    <select name="turma_id_disciplina" id="turma_id_disciplina">{{ turma_options }}</select>
                     <label for="disciplinas">Disciplinas:</label>
-                    <select name="disciplinas" id="disciplinas" multiple size="6">{disciplina_options if disciplina_options else '<option>Nenhuma disciplina disponível</option>'}</select>
+                    <select name="disciplinas" id="disciplinas" multiple size="6">{{ disciplina_options }}</select>
                     <div class="info-box">Segure Ctrl (Cmd no Mac) e clique para selecionar múltiplas disciplinas</div>
                     <button type="submit" class="primary">Associar Disciplinas</button>
                 </form>
@@ -1131,7 +1295,7 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <label for="turma_id_prof_disc">Turma:</label>
                     <select name="turma_id_prof_disc" id="turma_id_prof_disc" required onchange="filtrarDisciplinasPorTurma(this.value, 'disciplina_id_prof_disc')">
                         <option value="">Selecione uma turma...</option>
-                        {turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}
+                        {{ turma_options }}
                     </select>
                     <label for="disciplina_id_prof_disc">Disciplina:</label>
                     <select name="disciplina_id_prof_disc" id="disciplina_id_prof_disc" required>
@@ -1140,7 +1304,7 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <label for="professor_id_prof_disc">Professor:</label>
                     <select name="professor_id_prof_disc" id="professor_id_prof_disc" required>
                         <option value="">Selecione um professor...</option>
-                        {professor_options if professor_options else '<option>Nenhum professor disponível</option>'}
+                        {{ professor_options }}
                     </select>
                     <div class="info-box" style="background: #e8f5e9; border-left: 4px solid #4caf50;">
                         <strong>PERMITIDO:</strong> Você pode atribuir professores diferentes para disciplinas diferentes na mesma turma. Por exemplo: Professor A para Matemática e Professor B para Português na mesma turma.
@@ -1151,9 +1315,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
         </div>
     </div>
     """
-    
-    # === SEÇÃO 3: MATRÍCULAS ===
-    secao_matriculas = f"""
+_ADMIN_GESTAO_TURMAS_TPL = app.jinja_env.get_template('admin/gestao_turmas.html')
+
+_TEMPLATES_INTERNOS['admin/matriculas.html'] = """
     <div class="admin-section">
         <h2 class="admin-section-title">Matrículas</h2>
         <div class="admin-grid">
@@ -1165,189 +1329,34 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <input type="number" name="aluno_id" id="aluno_id" required>
                     <div class="info-box">Consulte a tabela de alunos abaixo para encontrar o ID</div>
                     <label for="turma_id_matricula">Turma:</label>
-                    <select name="turma_id_matricula" id="turma_id_matricula">{turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}</select>
+                    <select name="turma_id_matricula" id="turma_id_matricula">{{ turma_options }}</select>
                     <label for="disciplina_id_matricula">Disciplina:</label>
-                    <select name="disciplina_id_matricula" id="disciplina_id_matricula">{disciplina_options if disciplina_options else '<option>Nenhuma disciplina disponível</option>'}</select>
+                    <select name="disciplina_id_matricula" id="disciplina_id_matricula">{{ disciplina_options }}</select>
                     <button type="submit" class="primary">Matricular Aluno</button>
                 </form>
             </div>
         </div>
     </div>
     """
+_ADMIN_MATRICULAS_TPL = app.jinja_env.get_template('admin/matriculas.html')
 
-    # === SEÇÃO 4: AÇÕES DESTRUTIVAS ===
-    # Preparar dados para JavaScript (disciplinas por turma e matrículas)
-    turmas_json = {str(t['turma_id']): {'nome': t['nome_turma'], 'ano': t['ano']} for t in recursos['turmas']}
-    
-    # Buscar disciplinas associadas a cada turma (usando dados disponíveis)
-    disciplinas_por_turma = {}
-    try:
-        # Tenta buscar disciplinas de cada turma via API
-        token = session.get(SESSION_KEY_TOKEN)
-        for turma in recursos['turmas']:
-            turma_id = str(turma['turma_id'])
-            disciplinas_por_turma[turma_id] = []
-            # Nota: Será preenchido dinamicamente via JavaScript se necessário
-    except:
-        pass
-    
-    # Preparar opções de alunos para busca de matrícula
-    alunos_options = ''
-    if 'alunos' in recursos:
-        alunos_options = ''.join(f'<option value="{a["aluno_id"]}">{escape(a.get("nome", ""))} {escape(a.get("sobrenome", ""))}</option>' for a in recursos.get('alunos', []))
-    
-    secao_acoes_destrutivas = f"""
+_TEMPLATES_INTERNOS['admin/acoes_destrutivas.html'] = """
     <div class="admin-section">
         <h2 class="admin-section-title" style="border-bottom-color: #d32f2f;">Ações Destrutivas</h2>
         
-        <script data-token="{token or ''}">
-        // Dados para filtros dinâmicos
-        const todasDisciplinas = {{{
-            ",".join([f'"{d["disciplina_id"]}": "{escape(d["nome_disciplina"])}"' for d in recursos['disciplinas']])
-        }}};
-        const apiBaseUrl = "{API_BASE_URL}";
-        
-        // Função para obter token da sessão
-        function getToken() {{
-            // Tenta pegar do atributo data-token do script
-            const scriptTag = document.querySelector('script[data-token]');
-            if (scriptTag) {{
-                return scriptTag.getAttribute('data-token') || '';
-            }}
-            // Fallback: tenta pegar do cookie
-            const match = document.cookie.match(/session_token=([^;]+)/);
-            if (match) return match[1];
-            return '';
-        }}
-        
-        // Função para filtrar disciplinas quando turma é selecionada
-        function filtrarDisciplinasPorTurma(turmaId, selectDisciplinaId) {{
-            const select = document.getElementById(selectDisciplinaId);
-            
-            // Limpa opções atuais
-            select.innerHTML = '<option value="">Carregando...</option>';
-            
-            // Se nenhuma turma selecionada, mostra todas
-            if (!turmaId || turmaId === '') {{
-                select.innerHTML = '<option value="">Selecione uma disciplina...</option>';
-                for (const [id, nome] of Object.entries(todasDisciplinas)) {{
-                    const option = document.createElement('option');
-                    option.value = id;
-                    option.textContent = nome;
-                    select.appendChild(option);
-                }}
-                return;
-            }}
-            
-            // Busca disciplinas desta turma via API
-            fetch(`${{apiBaseUrl}}/academico/turmas/${{turmaId}}/disciplinas`, {{
-                headers: {{'Authorization': 'Bearer ' + getToken()}}
-            }})
-            .then(res => {{
-                if (!res.ok) {{
-                    throw new Error(`HTTP error! status: ${{res.status}}`);
-                }}
-                return res.json();
-            }})
-            .then(data => {{
-                select.innerHTML = '<option value="">Selecione uma disciplina...</option>';
-                if (data.disciplinas && data.disciplinas.length > 0) {{
-                    data.disciplinas.forEach(disc => {{
-                        const option = document.createElement('option');
-                        option.value = disc.disciplina_id;
-                        option.textContent = disc.nome_disciplina || todasDisciplinas[disc.disciplina_id] || 'Disciplina';
-                        select.appendChild(option);
-                    }});
-                }} else {{
-                    select.innerHTML = '<option value="">Nenhuma disciplina encontrada para esta turma. Associe disciplinas à turma primeiro.</option>';
-                }}
-            }})
-            .catch(err => {{
-                console.error('Erro ao buscar disciplinas:', err);
-                select.innerHTML = '<option value="">Erro ao carregar disciplinas. Verifique se a turma possui disciplinas associadas.</option>';
-            }});
-        }}
-        
-        // Função para buscar matrícula
-        function buscarMatricula() {{
-            const alunoId = document.getElementById('busca_aluno_id').value;
-            const turmaId = document.getElementById('busca_turma_id').value;
-            const disciplinaId = document.getElementById('busca_disciplina_id').value;
-            const resultadoDiv = document.getElementById('resultado_matricula');
-            
-            if (!alunoId || !turmaId || !disciplinaId) {{
-                resultadoDiv.innerHTML = '<p style="color: #666;">Preencha todos os campos para buscar.</p>';
-                return;
-            }}
-            
-            resultadoDiv.innerHTML = '<p>Buscando...</p>';
-            
-            // Busca a matrícula específica (precisa buscar via alunos da turma/disciplina)
-            fetch(`${{apiBaseUrl}}/academico/turmas/${{turmaId}}/disciplinas/${{disciplinaId}}/alunos`, {{
-                headers: {{'Authorization': 'Bearer ' + getToken()}}
-            }})
-            .then(res => res.json())
-            .then(data => {{
-                if (data.alunos && data.alunos.length > 0) {{
-                    // Procura o aluno específico na lista
-                    const alunoEncontrado = data.alunos.find(a => a.aluno_id == alunoId);
-                        if (alunoEncontrado && alunoEncontrado.matricula_id) {{
-                        const matId = alunoEncontrado.matricula_id;
-                        const nomeAluno = (alunoEncontrado.nome || '') + ' ' + (alunoEncontrado.sobrenome || '');
-                        resultadoDiv.innerHTML = `
-                            <div style="background: #f0f0f0; padding: 15px; border-radius: 8px; margin-top: 10px;">
-                                <p><strong>Matrícula encontrada!</strong></p>
-                                <p><strong>ID da Matrícula:</strong> ${{matId}}</p>
-                                <p><strong>Aluno:</strong> ${{nomeAluno.trim()}}</p>
-                                <button type="button" onclick="confirmarExclusaoMatricula(${{matId}})" class="danger" style="margin-top: 10px; width: 100%;">
-                                    Confirmar Exclusão da Matrícula
-                                </button>
-                            </div>
-                        `;
-                    }} else {{
-                        resultadoDiv.innerHTML = '<p style="color: #d32f2f;"> Aluno não encontrado nesta turma/disciplina.</p>';
-                    }}
-                }} else {{
-                    resultadoDiv.innerHTML = '<p style="color: #d32f2f;"> Nenhuma matrícula encontrada com estes critérios.</p>';
-                }}
-            }})
-            .catch(err => {{
-                console.error('Erro:', err);
-                resultadoDiv.innerHTML = '<p style="color: #d32f2f;">Erro ao buscar matrícula. Tente novamente.</p>';
-            }});
-        }}
-        
-        // Função de confirmação antes de ações destrutivas
-        function confirmarAcao(mensagem, formId) {{
-            if (confirm(mensagem)) {{
-                document.getElementById(formId).submit();
-            }}
-        }}
-        
-        function confirmarExclusaoMatricula(matriculaId) {{
-            if (confirm('Tem certeza que deseja excluir esta matrícula? Esta ação é permanente e pode falhar se houver notas lançadas.')) {{
-                const form = document.createElement('form');
-                form.method = 'POST';
-                form.innerHTML = `
-                    <input type="hidden" name="action" value="delete_matricula">
-                    <input type="hidden" name="matricula_id" value="${{matriculaId}}">
-                `;
-                document.body.appendChild(form);
-                form.submit();
-            }}
-        }}
-        </script>
+        <script type="application/json" id="admin-config">{{ admin_config_json }}</script>
+        <script src="/static/js/admin.js?v=12" defer></script>
         
         <div class="admin-grid">
             <div class="admin-card danger">
                 <h3>Desassociar Disciplina de Turma</h3>
                 <p style="font-size: 0.9em; color: #666; margin-top: 0;">Remove a disciplina da grade da turma. A disciplina não é excluída do sistema.</p>
-                <form method="POST" id="form_desassociar" onsubmit="return confirm('Tem certeza que deseja desassociar esta disciplina da turma?')">
+                <form method="POST" id="form_desassociar" data-acao-json onsubmit="return confirm('Tem certeza que deseja desassociar esta disciplina da turma?')">
                     <input type="hidden" name="action" value="remove_disciplina_from_turma">
                     <label for="remove_turma_id">Turma:</label>
                     <select name="turma_id" id="remove_turma_id" required onchange="filtrarDisciplinasPorTurma(this.value, 'remove_disciplina_id')">
                         <option value="">Selecione uma turma...</option>
-                        {turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}
+                        {{ turma_options }}
                     </select>
                     <label for="remove_disciplina_id">Disciplina a Remover:</label>
                     <select name="disciplina_id" id="remove_disciplina_id" required>
@@ -1365,7 +1374,7 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <label for="delete_turma_id">Turma a Excluir:</label>
                     <select name="turma_id" id="delete_turma_id" required>
                         <option value="">Selecione uma turma...</option>
-                        {turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}
+                        {{ turma_options }}
                     </select>
                     <div class="info-box"> Esta ação não pode ser desfeita! A exclusão pode falhar se a turma possuir disciplinas, matrículas ou outros dados associados.</div>
                     <button type="submit" class="danger">Excluir Turma Permanentemente</button>
@@ -1375,12 +1384,12 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
             <div class="admin-card warning">
                 <h3>Limpar Notas de Disciplina</h3>
                 <p style="font-size: 0.9em; color: #666; margin-top: 0;">Exclui TODAS as notas (NP1, NP2, Exame, etc.) associadas à disciplina. Use antes de excluir a disciplina.</p>
-                <form method="POST" id="form_limpar_notas" onsubmit="return confirm('ATENÇÃO: Todas as notas desta disciplina serão excluídas permanentemente!\\n\\nTem certeza que deseja continuar?')">
+                <form method="POST" id="form_limpar_notas" data-acao-json onsubmit="return confirm('ATENÇÃO: Todas as notas desta disciplina serão excluídas permanentemente!\\n\\nTem certeza que deseja continuar?')">
                     <input type="hidden" name="action" value="delete_notas_da_disciplina">
                     <label for="delete_notas_disciplina_id">Disciplina:</label>
                     <select name="disciplina_id_para_limpar" id="delete_notas_disciplina_id" required>
                         <option value="">Selecione uma disciplina...</option>
-                        {disciplina_options if disciplina_options else '<option>Nenhuma disciplina disponível</option>'}
+                        {{ disciplina_options }}
                     </select>
                     <div class="info-box"> Esta ação não pode ser desfeita!</div>
                     <button type="submit" class="warning">Limpar Todas as Notas</button>
@@ -1391,28 +1400,37 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                 <h3>Remover Matrícula</h3>
                 <p style="font-size: 0.9em; color: #666; margin-top: 0;">Remove um aluno de uma turma/disciplina. Pode falhar se houver notas lançadas.</p>
                 <div style="margin-bottom: 15px;">
-                    <label for="busca_aluno_id">Aluno:</label>
-                    <select id="busca_aluno_id" style="width: 100%; margin-bottom: 10px;">
-                        <option value="">Selecione um aluno...</option>
-                        {alunos_options if alunos_options else '<option>Nenhum aluno disponível</option>'}
-                    </select>
+                    <label for="busca_aluno_nome">Aluno:</label>
+                    <input type="search" id="busca_aluno_nome" list="alunos_datalist" autocomplete="off" placeholder="Digite ao menos 2 letras do nome..." style="width: 100%; margin-bottom: 10px;">
+                    <datalist id="alunos_datalist"></datalist>
+                    <input type="hidden" id="busca_aluno_id" value="">
                     <label for="busca_turma_id">Turma:</label>
                     <select id="busca_turma_id" style="width: 100%; margin-bottom: 10px;">
                         <option value="">Selecione uma turma...</option>
-                        {turma_options if turma_options else '<option>Nenhuma turma disponível</option>'}
+                        {{ turma_options }}
                     </select>
                     <label for="busca_disciplina_id">Disciplina:</label>
                     <select id="busca_disciplina_id" style="width: 100%; margin-bottom: 10px;">
                         <option value="">Selecione uma disciplina...</option>
-                        {disciplina_options if disciplina_options else '<option>Nenhuma disciplina disponível</option>'}
+                        {{ disciplina_options }}
                     </select>
                     <button type="button" onclick="buscarMatricula()" class="primary" style="width: 100%; margin-top: 10px;">
                          Buscar Matrícula
                     </button>
                     <div id="resultado_matricula"></div>
+                    <template id="tpl-matricula-encontrada">
+                        <div style="background: #f0f0f0; padding: 15px; border-radius: 8px; margin-top: 10px;">
+                            <p><strong>Matrícula encontrada!</strong></p>
+                            <p><strong>ID da Matrícula:</strong> <span data-field="matid"></span></p>
+                            <p><strong>Aluno:</strong> <span data-field="nome"></span></p>
+                            <button type="button" data-matricula-id="" class="danger" style="margin-top: 10px; width: 100%;">
+                                Confirmar Exclusão da Matrícula
+                            </button>
+                        </div>
+                    </template>
                 </div>
                 <div class="info-box">
-                     Dica: Selecione aluno, turma e disciplina para encontrar a matrícula automaticamente.
+                     Dica: Digite o nome do aluno e escolha-o na lista; depois selecione turma e disciplina para encontrar a matrícula.
                 </div>
             </div>
             
@@ -1424,7 +1442,7 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                     <label for="assistente_disciplina_id">Selecione a Disciplina:</label>
                     <select name="disciplina_id" id="assistente_disciplina_id" onchange="verificarStatusExclusao(this.value)" style="width: 100%;">
                         <option value="">Selecione uma disciplina...</option>
-                        {disciplina_options if disciplina_options else '<option>Nenhuma disciplina disponível</option>'}
+                        {{ disciplina_options }}
                     </select>
                 </div>
                 
@@ -1437,9 +1455,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                                 <span class="step-status" id="status1">Pendente</span>
                             </div>
                             <div class="step-details" id="details1">
-                                <p>Verificando notas...</p>
+                                <span class="spinner" hidden></span><p class="msg">Verificando notas...</p>
                             </div>
-                            <button type="button" class="step-btn" id="btn1" onclick="executarEtapa(1)" disabled>Executar</button>
+                            <button type="button" class="step-btn" id="btn1" data-step="1" disabled>Executar</button>
                         </div>
                         
                         <div class="checklist-item" id="step2">
@@ -1449,9 +1467,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                                 <span class="step-status" id="status2">Aguardando etapa 1</span>
                             </div>
                             <div class="step-details" id="details2">
-                                <p>Aguardando...</p>
+                                <span class="spinner" hidden></span><p class="msg">Aguardando...</p>
                             </div>
-                            <button type="button" class="step-btn" id="btn2" onclick="executarEtapa(2)" disabled>Verificar</button>
+                            <button type="button" class="step-btn" id="btn2" data-step="2" disabled>Verificar</button>
                         </div>
                         
                         <div class="checklist-item" id="step3">
@@ -1461,9 +1479,9 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                                 <span class="step-status" id="status3">Aguardando etapas anteriores</span>
                             </div>
                             <div class="step-details" id="details3">
-                                <p>Aguardando...</p>
+                                <span class="spinner" hidden></span><p class="msg">Aguardando...</p>
                             </div>
-                            <button type="button" class="step-btn" id="btn3" onclick="executarEtapa(3)" disabled>Executar</button>
+                            <button type="button" class="step-btn" id="btn3" data-step="3" disabled>Executar</button>
                         </div>
                         
                         <div class="checklist-item final" id="step4">
@@ -1473,481 +1491,34 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                                 <span class="step-status" id="status4"> Aguardando todas as etapas</span>
                             </div>
                             <div class="step-details" id="details4">
-                                <p>Aguardando conclusão das etapas anteriores...</p>
+                                <span class="spinner" hidden></span><p class="msg">Aguardando conclusão das etapas anteriores...</p>
                             </div>
-                            <form method="POST" id="form_excluir_final" onsubmit="return confirm(' ÚLTIMA CONFIRMAÇÃO!\\n\\nTem ABSOLUTA certeza que deseja excluir esta disciplina permanentemente?\\n\\nEsta ação é IRREVERSÍVEL!')">
+                            <form method="POST" id="form_excluir_final" data-acao-json onsubmit="return confirm(' ÚLTIMA CONFIRMAÇÃO!\\n\\nTem ABSOLUTA certeza que deseja excluir esta disciplina permanentemente?\\n\\nEsta ação é IRREVERSÍVEL!')">
                     <input type="hidden" name="action" value="delete_disciplina">
                                 <input type="hidden" name="disciplina_id" id="final_disciplina_id" value="">
                                 <button type="submit" class="step-btn danger" id="btn4" disabled> EXCLUIR PERMANENTEMENTE</button>
                 </form>
                         </div>
+                        
+                        <div class="checklist-item" id="step_cascata">
+                            <div class="step-details" id="details_cascata">
+                                <span class="spinner" hidden></span><p class="msg">Ou execute todas as etapas de uma vez, em uma única transação (nada é alterado se alguma etapa falhar).</p>
+                            </div>
+                            <button type="button" class="step-btn danger enabled" id="btn_cascata" data-acao="cascata">Executar todas as etapas</button>
+                        </div>
                     </div>
                 </div>
                 
-                <style>
-                .exclusao-checklist {{
-                    margin-top: 20px;
-                }}
-                .checklist-item {{
-                    background: #f8f9fa;
-                    border-left: 4px solid #6c757d;
-                    padding: 20px;
-                    margin-bottom: 15px;
-                    border-radius: 8px;
-                    transition: all 0.3s;
-                }}
-                .checklist-item.completed {{
-                    background: #d4edda;
-                    border-left-color: #28a745;
-                }}
-                .checklist-item.active {{
-                    background: #fff3cd;
-                    border-left-color: #ffc107;
-                }}
-                .checklist-item.blocked {{
-                    opacity: 0.6;
-                    background: #e9ecef;
-                }}
-                .checklist-item.final {{
-                    background: #ffebee;
-                    border-left-color: #d32f2f;
-                }}
-                .checklist-item.final.completed {{
-                    background: #ffcdd2;
-                }}
-                .step-header {{
-                    display: flex;
-                    align-items: center;
-                    gap: 15px;
-                    margin-bottom: 10px;
-                }}
-                .step-number {{
-                    width: 35px;
-                    height: 35px;
-                    border-radius: 50%;
-                    background: #6c757d;
-                    color: white;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-weight: bold;
-                    font-size: 1.1rem;
-                }}
-                .checklist-item.completed .step-number {{
-                    background: #28a745;
-                }}
-                .checklist-item.active .step-number {{
-                    background: #ffc107;
-                    color: #000;
-                }}
-                .step-title {{
-                    flex: 1;
-                    font-weight: 600;
-                    font-size: 1.1rem;
-                }}
-                .step-status {{
-                    padding: 5px 12px;
-                    border-radius: 15px;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                    background: #e9ecef;
-                    color: #6c757d;
-                }}
-                .checklist-item.completed .step-status {{
-                    background: #d4edda;
-                    color: #155724;
-                }}
-                .checklist-item.active .step-status {{
-                    background: #fff3cd;
-                    color: #856404;
-                }}
-                .step-details {{
-                    margin: 10px 0 15px 50px;
-                    padding: 10px;
-                    background: white;
-                    border-radius: 6px;
-                    font-size: 0.9rem;
-                    color: #555;
-                }}
-                .step-btn {{
-                    margin-left: 50px;
-                    padding: 10px 20px;
-                    border: none;
-                    border-radius: 6px;
-                    cursor: pointer;
-                    font-weight: 600;
-                    background: #6c757d;
-                    color: white;
-                    transition: all 0.3s;
-                }}
-                .step-btn:hover:not(:disabled) {{
-                    transform: translateY(-2px);
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-                }}
-                .step-btn:disabled {{
-                    opacity: 0.5;
-                    cursor: not-allowed;
-                }}
-                .step-btn.enabled {{
-                    background: #28a745;
-                }}
-                .step-btn.warning {{
-                    background: #ffc107;
-                    color: #000;
-                }}
-                .step-btn.danger.enabled {{
-                    background: #d32f2f;
-                    color: white;
-                }}
-                </style>
-                
-                <script>
-                let disciplinaSelecionada = null;
-                let statusEtapas = {{1: false, 2: false, 3: false, 4: false}};
-                
-                function verificarStatusExclusao(disciplinaId) {{
-                    if (!disciplinaId) {{
-                        document.getElementById('status_exclusao').style.display = 'none';
-                        return;
-                    }}
-                    
-                    disciplinaSelecionada = disciplinaId;
-                    document.getElementById('final_disciplina_id').value = disciplinaId;
-                    document.getElementById('status_exclusao').style.display = 'block';
-                    
-                    // Reset estados
-                    statusEtapas = {{1: false, 2: false, 3: false, 4: false}};
-                    resetarEtapas();
-                    
-                    // Verifica status da disciplina
-                    verificarEtapa1(disciplinaId);
-                }}
-                
-                function resetarEtapas() {{
-                    for (let i = 1; i <= 4; i++) {{
-                        document.getElementById(`step${{i}}`).classList.remove('completed', 'active', 'blocked');
-                        document.getElementById(`status${{i}}`).textContent = i === 1 ? ' Verificando...' : ' Aguardando';
-                        document.getElementById(`btn${{i}}`).disabled = true;
-                    }}
-                }}
-                
-                function verificarEtapa1(disciplinaId) {{
-                    // Tenta fazer um DELETE para verificar se há notas (404 = sem notas, 200 = há notas)
-                    // Mas melhor: tenta buscar notas através de uma query indireta
-                    // Como não há rota GET direta, vamos tentar uma abordagem diferente:
-                    // Buscar todas as turmas e verificar se há notas em alguma delas
-                    
-                    fetch(`${{apiBaseUrl}}/academico/turmas`, {{
-                        headers: {{'Authorization': 'Bearer ' + getToken()}}
-                    }})
-                    .then(res => res.json())
-                    .then(data => {{
-                        const turmas = data.turmas || [];
-                        let verificacoes = 0;
-                        let temNotas = false;
-                        
-                        if (turmas.length === 0) {{
-                            document.getElementById('details1').innerHTML = '<p> Nenhuma turma encontrada. Nenhuma nota.</p>';
-                            marcarEtapaComoConcluida(1, 'Sem notas');
-                            verificarEtapa2(disciplinaId);
-                            return;
-                        }}
-                        
-                        // Verifica se há notas em alguma turma/disciplina
-                        turmas.forEach(turma => {{
-                            // Tenta buscar alunos (se conseguir, pode ter notas)
-                            fetch(`${{apiBaseUrl}}/academico/turmas/${{turma.turma_id}}/disciplinas/${{disciplinaId}}/alunos`, {{
-                                headers: {{'Authorization': 'Bearer ' + getToken()}}
-                            }})
-                            .then(res => {{
-                                verificacoes++;
-                                if (res.status === 200) {{
-                                    return res.json().then(alunosData => {{
-                                        const alunos = alunosData.alunos || [];
-                                        // Se algum aluno tiver notas (nota_np1, nota_np2, etc.), tem notas
-                                        alunos.forEach(aluno => {{
-                                            if (aluno.nota_np1 || aluno.nota_np2 || aluno.nota_exame) {{
-                                                temNotas = true;
-                                            }}
-                                        }});
-                                        
-                                        if (verificacoes === turmas.length) {{
-                                            if (temNotas) {{
-                                                document.getElementById('details1').innerHTML = '<p><strong>Notas encontradas.</strong> Precisa limpar antes de excluir.</p>';
-                                                habilitarEtapa(1);
-                                            }} else {{
-                                                document.getElementById('details1').innerHTML = '<p> Nenhuma nota encontrada.</p>';
-                                                marcarEtapaComoConcluida(1, 'Sem notas');
-                                                verificarEtapa2(disciplinaId);
-                                            }}
-                                        }}
-                                    }});
-                                }} else {{
-                                    // Turma não tem essa disciplina ou não há alunos
-                                    if (verificacoes === turmas.length && !temNotas) {{
-                                        document.getElementById('details1').innerHTML = '<p> Nenhuma nota encontrada.</p>';
-                                        marcarEtapaComoConcluida(1, 'Sem notas');
-                                        verificarEtapa2(disciplinaId);
-                                    }}
-                                }}
-                            }})
-                            .catch(() => {{
-                                verificacoes++;
-                                if (verificacoes === turmas.length && !temNotas) {{
-                                    document.getElementById('details1').innerHTML = '<p> Nenhuma nota encontrada.</p>';
-                                    marcarEtapaComoConcluida(1, 'Sem notas');
-                                    verificarEtapa2(disciplinaId);
-                                }}
-                            }});
-                        }});
-                    }})
-                    .catch(err => {{
-                        console.error('Erro:', err);
-                        // Em caso de erro, permite tentar limpar notas manualmente
-                        document.getElementById('details1').innerHTML = '<p>Clique em "Executar" para limpar as notas (se houver).</p>';
-                        habilitarEtapa(1);
-                    }});
-                }}
-                
-                function verificarEtapa2(disciplinaId) {{
-                    // Busca matrículas verificando em todas as turmas
-                    fetch(`${{apiBaseUrl}}/academico/disciplinas/${{disciplinaId}}`, {{
-                        headers: {{'Authorization': 'Bearer ' + getToken()}}
-                    }})
-                    .then(res => res.json())
-                    .then(data => {{
-                        // Tenta verificar se há matrículas através de uma busca
-                        document.getElementById('details2').innerHTML = '<p>Clique em "Verificar" para buscar matrículas.</p>';
-                        habilitarEtapa(2);
-                    }})
-                    .catch(err => {{
-                        document.getElementById('details2').innerHTML = '<p>Clique em "Verificar" para buscar matrículas.</p>';
-                        habilitarEtapa(2);
-                    }});
-                }}
-                
-                function executarEtapa(numero) {{
-                    if (!disciplinaSelecionada) return;
-                    
-                    const disciplinaId = disciplinaSelecionada;
-                    
-                    if (numero === 1) {{
-                        // Limpar notas
-                        if (!confirm('Tem certeza que deseja excluir TODAS as notas desta disciplina? Esta ação não pode ser desfeita!')) {{
-                            return;
-                        }}
-                        
-                        document.getElementById(`step${{numero}}`).classList.add('active');
-                        document.getElementById(`status${{numero}}`).textContent = ' Executando...';
-                        
-                        fetch(`${{apiBaseUrl}}/academico/disciplinas/${{disciplinaId}}/notas`, {{
-                            method: 'DELETE',
-                            headers: {{'Authorization': 'Bearer ' + getToken()}}
-                        }})
-                        .then(res => {{
-                            if (res.status === 200) {{
-                                return res.json().then(data => {{
-                                    marcarEtapaComoConcluida(1, 'Notas excluídas com sucesso');
-                                    habilitarEtapa(2);
-                                    verificarEtapa2(disciplinaId);
-                                    return data;
-                                }});
-                            }} else {{
-                                return res.json().then(data => {{
-                                    document.getElementById('details1').innerHTML = `<p style="color: #d32f2f;">Erro: ${{data.message || 'Erro ao excluir notas'}}</p>`;
-                                    throw new Error(data.message || 'Erro ao excluir notas');
-                                }});
-                            }}
-                        }})
-                        .catch(err => {{
-                            document.getElementById('details1').innerHTML = '<p style="color: #d32f2f;">Erro ao executar.</p>';
-                        }});
-                    }} else if (numero === 2) {{
-                        // Verificar matrículas
-                        document.getElementById(`step${{numero}}`).classList.add('active');
-                        document.getElementById(`status${{numero}}`).textContent = '🔄 Verificando...';
-                        document.getElementById('details2').innerHTML = '<p>Buscando matrículas...</p>';
-                        
-                        // Como não há rota direta, verificamos tentando buscar alunos
-                        // Se conseguirmos listar turmas, verificamos se há matrículas
-                        fetch(`${{apiBaseUrl}}/academico/turmas`, {{
-                            headers: {{'Authorization': 'Bearer ' + getToken()}}
-                        }})
-                        .then(res => res.json())
-                        .then(data => {{
-                            const turmas = data.turmas || [];
-                            let totalMatriculas = 0;
-                            let verificacoes = 0;
-                            
-                            if (turmas.length === 0) {{
-                                document.getElementById('details2').innerHTML = '<p> Nenhuma turma encontrada. Nenhuma matrícula.</p>';
-                                marcarEtapaComoConcluida(2, 'Sem matrículas');
-                                habilitarEtapa(3);
-                                return;
-                            }}
-                            
-                            turmas.forEach(turma => {{
-                                fetch(`${{apiBaseUrl}}/academico/turmas/${{turma.turma_id}}/disciplinas/${{disciplinaId}}/alunos`, {{
-                                    headers: {{'Authorization': 'Bearer ' + getToken()}}
-                                }})
-                                .then(res => {{
-                                    if (res.status === 200) {{
-                                        return res.json();
-                                    }}
-                                    return {{alunos: []}};
-                                }})
-                                .then(data => {{
-                                    verificacoes++;
-                                    const alunos = data.alunos || [];
-                                    totalMatriculas += alunos.length;
-                                    
-                                    if (verificacoes === turmas.length) {{
-                                        if (totalMatriculas === 0) {{
-                                            document.getElementById('details2').innerHTML = '<p> Nenhuma matrícula encontrada.</p>';
-                                            marcarEtapaComoConcluida(2, 'Sem matrículas');
-                                            habilitarEtapa(3);
-                                        }} else {{
-                                            document.getElementById('details2').innerHTML = `<p style="color: #856404;"><strong>${{totalMatriculas}}</strong> matrícula(s) encontrada(s).<br>Você precisa remover todas as matrículas manualmente antes de continuar.</p>`;
-                                            document.getElementById('status2').textContent = ' Requer ação manual';
-                                        }}
-                                    }}
-                                }})
-                                .catch(() => {{
-                                    verificacoes++;
-                                    if (verificacoes === turmas.length && totalMatriculas === 0) {{
-                                        document.getElementById('details2').innerHTML = '<p> Nenhuma matrícula encontrada.</p>';
-                                        marcarEtapaComoConcluida(2, 'Sem matrículas');
-                                        habilitarEtapa(3);
-                                    }}
-                                }});
-                            }});
-                        }})
-                        .catch(err => {{
-                            document.getElementById('details2').innerHTML = '<p style="color: #d32f2f;">Erro ao verificar. Tente novamente.</p>';
-                        }});
-                    }} else if (numero === 3) {{
-                        // Desassociar de turmas
-                        if (!confirm('Tem certeza que deseja desassociar esta disciplina de TODAS as turmas?')) {{
-                            return;
-                        }}
-                        
-                        document.getElementById(`step${{numero}}`).classList.add('active');
-                        document.getElementById(`status${{numero}}`).textContent = ' Executando...';
-                        
-                        // Busca todas as turmas e desassocia
-                        fetch(`${{apiBaseUrl}}/academico/turmas`, {{
-                            headers: {{'Authorization': 'Bearer ' + getToken()}}
-                        }})
-                        .then(res => res.json())
-                        .then(data => {{
-                            const turmas = data.turmas || [];
-                            if (turmas.length === 0) {{
-                                document.getElementById('details3').innerHTML = '<p> Nenhuma turma associada.</p>';
-                                marcarEtapaComoConcluida(3, 'Nenhuma associação');
-                                habilitarEtapa(4);
-                                return;
-                            }}
-                            
-                            let desassociacoes = 0;
-                            let total = turmas.length;
-                            
-                            turmas.forEach(turma => {{
-                                fetch(`${{apiBaseUrl}}/academico/turmas/remover-disciplina`, {{
-                                    method: 'POST',
-                                    headers: {{
-                                        'Authorization': 'Bearer ' + getToken(),
-                                        'Content-Type': 'application/json'
-                                    }},
-                                    body: JSON.stringify({{
-                                        turma_id: parseInt(turma.turma_id),
-                                        disciplina_id: parseInt(disciplinaId)
-                                    }})
-                                }})
-                                .then(res => {{
-                                    desassociacoes++;
-                                    if (desassociacoes === total) {{
-                                        document.getElementById('details3').innerHTML = `<p> Desassociação concluída.</p>`;
-                                        marcarEtapaComoConcluida(3, 'Concluído');
-                                        habilitarEtapa(4);
-                                    }}
-                                }})
-                                .catch(() => {{
-                                    desassociacoes++;
-                                    if (desassociacoes === total) {{
-                                        document.getElementById('details3').innerHTML = `<p> Processo concluído.</p>`;
-                                        marcarEtapaComoConcluida(3, 'Concluído');
-                                        habilitarEtapa(4);
-                                    }}
-                                }});
-                            }});
-                        }})
-                        .catch(err => {{
-                            document.getElementById('details3').innerHTML = '<p style="color: #d32f2f;">Erro ao executar.</p>';
-                        }});
-                    }}
-                }}
-                
-                function marcarEtapaComoConcluida(numero, mensagem) {{
-                    statusEtapas[numero] = true;
-                    const step = document.getElementById(`step${{numero}}`);
-                    step.classList.remove('active', 'blocked');
-                    step.classList.add('completed');
-                    document.getElementById(`status${{numero}}`).textContent = ` ${{mensagem}}`;
-                    document.getElementById(`btn${{numero}}`).disabled = true;
-                    
-                    // Se não for a última etapa, habilita a próxima
-                    if (numero < 4) {{
-                        habilitarEtapa(numero + 1);
-                    }} else {{
-                        // Se for a última etapa, verifica se todas estão concluídas
-                        verificarSePodeExcluir();
-                    }}
-                }}
-                
-                function verificarSePodeExcluir() {{
-                    if (statusEtapas[1] && statusEtapas[2] && statusEtapas[3]) {{
-                        const btn4 = document.getElementById('btn4');
-                        btn4.disabled = false;
-                        btn4.classList.add('enabled');
-                        document.getElementById('status4').textContent = ' Pronto para excluir';
-                        document.getElementById('details4').innerHTML = '<p style="color: #d32f2f;"><strong>Todas as etapas concluídas!</strong><br>Você pode excluir a disciplina permanentemente.</p>';
-                    }}
-                }}
                 
-                function habilitarEtapa(numero) {{
-                    if (numero > 1 && !statusEtapas[numero - 1]) {{
-                        return; // Só habilita se a etapa anterior estiver concluída
-                    }}
-                    
-                    const step = document.getElementById(`step${{numero}}`);
-                    step.classList.remove('blocked');
-                    step.classList.add('active');
-                    document.getElementById(`btn${{numero}}`).disabled = false;
-                    document.getElementById(`btn${{numero}}`).classList.add('enabled');
-                    
-                    if (numero === 2) {{
-                        document.getElementById(`btn${{numero}}`).classList.add('warning');
-                    }}
-                    
-                    // Verifica se pode habilitar etapa 4
-                    if (numero === 3) {{
-                        verificarSePodeExcluir();
-                    }}
-                }}
-                </script>
+                <script src="/static/js/admin_etapas.js?v=5" defer></script>
             </div>
         </div>
     </div>
     """
-    
-    # === SEÇÃO 5: VISÃO GERAL DO SISTEMA ===
-    # Busca estrutura completa: turmas -> disciplinas -> alunos
-    estrutura_completa = buscar_estrutura_completa(token)
-    secao_visao_geral = construir_visao_geral_html(estrutura_completa)
-    
-    # === SEÇÃO 6: LISTAS DE REFERÊNCIA ===
-    # Tabela de Professores
-    tabela_professores_html = """
+_ADMIN_ACOES_DESTRUTIVAS_TPL = app.jinja_env.get_template('admin/acoes_destrutivas.html')
+
+# Listas de referência (seção 6): o autoescape cobre e-mails e nomes
+_TEMPLATES_INTERNOS['admin/tabela_professores.html'] = """
     <div class="admin-table-section">
         <h2>Professores Cadastrados</h2>
         <table>
@@ -1958,21 +1529,21 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                 </tr>
             </thead>
             <tbody>
-    """
-    if recursos.get('professores'):
-        for prof in recursos['professores']:
-            tabela_professores_html += f"""
+            {%- for prof in professores %}
                 <tr>
-                    <td>{prof.get('id_usuario')}</td>
-                    <td>{escape(prof.get('email', 'N/A'))}</td>
+                    <td>{{ prof.get('id_usuario') }}</td>
+                    <td>{{ prof.get('email', 'N/A') }}</td>
                 </tr>
-            """
-    else:
-        tabela_professores_html += '<tr><td colspan="2" style="text-align: center; color: #999; padding: 20px;">Nenhum professor encontrado.</td></tr>'
-    tabela_professores_html += '</tbody></table></div>'
+            {%- else %}
+                <tr><td colspan="2" style="text-align: center; color: #999; padding: 20px;">Nenhum professor encontrado.</td></tr>
+            {%- endfor %}
+            </tbody>
+        </table>
+    </div>
+    """
+_ADMIN_TABELA_PROFESSORES_TPL = app.jinja_env.get_template('admin/tabela_professores.html')
 
-    # Tabela de Alunos
-    tabela_alunos_html = """
+_TEMPLATES_INTERNOS['admin/tabela_alunos.html'] = """
     <div class="admin-table-section">
         <h2>Alunos Cadastrados</h2>
         <table>
@@ -1984,40 +1555,179 @@ def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=
                 </tr>
             </thead>
             <tbody>
-    """
-    if recursos.get('alunos'):
-        for aluno in recursos['alunos']:
-            nome_completo = f"{escape(aluno.get('nome', ''))} {escape(aluno.get('sobrenome', ''))}".strip()
-            tabela_alunos_html += f"""
+            {%- for aluno in alunos %}
                 <tr>
-                    <td>{aluno.get('aluno_id')}</td>
-                    <td>{nome_completo}</td>
-                    <td>{escape(aluno.get('email', 'N/A'))}</td>
+                    <td>{{ aluno.get('aluno_id') }}</td>
+                    <td>{{ (aluno.get('nome', '') ~ ' ' ~ aluno.get('sobrenome', ''))|trim }}</td>
+                    <td>{{ aluno.get('email', 'N/A') }}</td>
                 </tr>
-            """
-    else:
-        tabela_alunos_html += '<tr><td colspan="3" style="text-align: center; color: #999; padding: 20px;">Nenhum aluno encontrado.</td></tr>'
-    tabela_alunos_html += '</tbody></table></div>'
-
+            {%- else %}
+                <tr><td colspan="3" style="text-align: center; color: #999; padding: 20px;">Nenhum aluno encontrado.</td></tr>
+            {%- endfor %}
+            </tbody>
+        </table>
+    </div>
+    """
+_ADMIN_TABELA_ALUNOS_TPL = app.jinja_env.get_template('admin/tabela_alunos.html')
 
-    return f"""
-    {admin_css}
-    <h1>Painel do Administrador</h1>
-    {feedback_html}
-    {secao_visao_geral}
-    {secao_criacao}
-    {secao_gestao_turmas}
-    {secao_matriculas}
-    {secao_acoes_destrutivas}
-    {tabela_professores_html}
-    {tabela_alunos_html}
+def obter_estrutura_admin(token, recursos):
     """
+    Estrutura completa (turmas -> disciplinas -> alunos) do painel admin, em
+    cache por _ADMIN_CACHE.
+    
+    Turmas e professores já vieram em recursos: não são buscados de novo.
+    """
+    def gerar_estrutura():
+        estrutura, completa = buscar_estrutura_completa(
+            token, turmas=recursos['turmas'], professores=recursos.get('professores', [])
+        )
+        # Montada sobre recursos incompletos (que não ficaram em cache), a
+        # estrutura também não fica
+        return estrutura, completa and _ADMIN_CACHE.contem(token, 'recursos')
+    return _ADMIN_CACHE.obter(token, 'estrutura', gerar_estrutura)
+
+# Versão do código do painel (templates, links versionados de CSS/JS): entra
+# no ETag do /painel/admin, para que uma nova versão de main.py nunca
+# responda 304 a uma página montada pela anterior
+with open(__file__, 'rb') as _arquivo_fonte:
+    _VERSAO_PAINEL_ADMIN = hashlib.blake2b(_arquivo_fonte.read(), digest_size=8).hexdigest()
+
+def _etag_painel_admin(token, recursos, estrutura, feedback_msg, feedback_cls):
+    """
+    ETag do /painel/admin calculado a partir dos dados, antes do HTML existir.
+    
+    A página é função do token (embutido na configuração do admin.js), dos
+    recursos, da estrutura, da mensagem de feedback e da versão do código;
+    assim a resposta pode ir em streaming e ainda assim levar o ETag.
+    """
+    dados = json.dumps(
+        [_VERSAO_PAINEL_ADMIN, token, recursos, estrutura, feedback_msg, feedback_cls],
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.blake2b(dados.encode('utf-8'), digest_size=12).hexdigest()
+
+def render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token=None, estrutura_completa=None):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[render_admin_content] Iniciando renderização: professores=%d alunos=%d",
+            len(recursos.get('professores', [])), len(recursos.get('alunos', [])),
+        )
+    
+    
+    # HTML de feedback (permite <br> tags para quebras de linha)
+    if feedback_msg:
+        # Se a mensagem contém <br>, permite renderizar como HTML; caso contrário, escapa
+        if '<br>' in feedback_msg:
+            # Separa por <br>, escapa cada parte, e junta com <br>
+            partes = feedback_msg.split('<br>')
+            safe_msg = Markup('<br>'.join(map(escape, partes)))
+        else:
+            # Mensagem sem <br>, escapa normalmente
+            safe_msg = escape(feedback_msg)
+        
+        feedback_html = f'<div class="{feedback_cls}" style="padding: 12px; margin-bottom: 20px; border-radius: 4px; background: {"#d4edda" if feedback_cls == "success" else "#f8d7da"}; color: {"#155724" if feedback_cls == "success" else "#721c24"};">{safe_msg}</div>'
+    else:
+        feedback_html = ''
 
-# --------------------------------------------------------------------------------------
-# ROTAS PRINCIPAIS: LOGIN, LOGOUT E ROTEAMENTO
+    # Cria as opções para selects (turmas e disciplinas)
+    # A "impressão digital" de cada lista (tupla com os campos exibidos) é a
+    # chave do cache: enquanto os recursos não mudam, o HTML é reaproveitado
+    turma_options = _opcoes_html(_TURMA_OPT, tuple(
+        (t["turma_id"], t["nome_turma"], t["ano"]) for t in recursos['turmas']
+    ))
+    disciplina_options = _opcoes_html(_DISCIPLINA_OPT, tuple(
+        (d["disciplina_id"], d["nome_disciplina"]) for d in recursos['disciplinas']
+    ))
+    
+    # Cria lista de professores para select melhorado
+    professor_options = _opcoes_html(_PROFESSOR_OPT, tuple(
+        (p.get("id_usuario"), p.get("email", "N/A"), p.get("id_usuario"))
+        for p in recursos.get('professores', [])
+    ))
+    
+    # Resolve uma única vez a opção "Nenhum(a) ... disponível" das listas vazias;
+    # as seções recebem o resultado pronto (Markup: já está escapado)
+    turma_opts = turma_options or _NO_TURMA_OPT
+    disc_opts = disciplina_options or _NO_DISCIPLINA_OPT
+    prof_opts = professor_options or _NO_PROFESSOR_OPT
+
+    # === SEÇÃO 1: CRIAÇÃO DE RECURSOS ===
+    secao_criacao = _ADMIN_CRIACAO_TPL.render()
+    
+    # === SEÇÃO 2: GESTÃO DE TURMAS ===
+    secao_gestao_turmas = _ADMIN_GESTAO_TURMAS_TPL.render(
+        turma_options=turma_opts,
+        disciplina_options=disc_opts,
+        professor_options=prof_opts,
+    )
+    
+    # === SEÇÃO 3: MATRÍCULAS ===
+    secao_matriculas = _ADMIN_MATRICULAS_TPL.render(
+        turma_options=turma_opts,
+        disciplina_options=disc_opts,
+    )
+
+    # === SEÇÃO 4: AÇÕES DESTRUTIVAS ===
+    # Estrutura completa: turmas -> disciplinas -> alunos (usada também pela
+    # visão geral, seção 5). painel_admin já a recebe pronta, porque precisa
+    # dela antes para calcular o ETag
+    if estrutura_completa is None:
+        estrutura_completa = obter_estrutura_admin(token, recursos)
+    
+    # Configuração do /static/js/admin.js, entregue como ilha JSON na página:
+    # - todasDisciplinas: mapa id -> nome das disciplinas
+    # - disciplinasPorTurma: ids das disciplinas de cada turma, já conhecidos
+    #   pela estrutura (o JavaScript filtra os selects localmente, sem um fetch
+    #   por troca de turma)
+    # Serializada em C pelo json.dumps; '</' vira '<\/' para que um nome nunca
+    # feche o <script> antes da hora.
+    admin_config_json = json.dumps({
+        'token': token or '',
+        'apiBaseUrl': API_BASE_URL,
+        'todasDisciplinas': {str(d['disciplina_id']): d['nome_disciplina'] for d in recursos['disciplinas']},
+        'disciplinasPorTurma': {
+            str(turma_id): list(dados['disciplinas']) for turma_id, dados in estrutura_completa.items()
+        },
+    }, ensure_ascii=False).replace('</', '<\\/')
+
+    
+    secao_acoes_destrutivas = _ADMIN_ACOES_DESTRUTIVAS_TPL.render(
+        admin_config_json=Markup(admin_config_json),
+        turma_options=turma_opts,
+        disciplina_options=disc_opts,
+    )
+    
+    # === SEÇÃO 5: VISÃO GERAL DO SISTEMA ===
+    secao_visao_geral = construir_visao_geral_html(estrutura_completa)
+    
+    # === SEÇÃO 6: LISTAS DE REFERÊNCIA ===
+    tabela_professores_html = _ADMIN_TABELA_PROFESSORES_TPL.render(
+        professores=recursos.get('professores') or [],
+    )
+    tabela_alunos_html = _ADMIN_TABELA_ALUNOS_TPL.render(
+        alunos=recursos.get('alunos') or [],
+    )
+
+    # Página montada com um único join: cada seção (já pronta) é copiada uma
+    # só vez para o resultado, sem passar por uma f-string intermediária
+    return ''.join((
+        _ADMIN_CSS,
+        '<h1>Painel do Administrador</h1>',
+        '<div id="admin-feedback">', feedback_html, '</div>',
+        secao_visao_geral,
+        secao_criacao,
+        secao_gestao_turmas,
+        secao_matriculas,
+        secao_acoes_destrutivas,
+        tabela_professores_html,
+        tabela_alunos_html,
+    ))
+
+# --------------------------------------------------------------------------------------
+# ROTAS PRINCIPAIS: LOGIN, LOGOUT E ROTEAMENTO
 # --------------------------------------------------------------------------------------
 
-@app.route('/registrar', methods=['GET', 'POST'])
+@auth_bp.route('/registrar', methods=['GET', 'POST'])
 def registrar():
     if request.method == 'POST':
         # 1. Coleta TODOS os dados do formulário
@@ -2034,12 +1744,12 @@ def registrar():
         
         try:
             # 2. Chama a API Node.js (rota /register agora aceita mais dados)
-            response = requests.post(register_url, json=data)
+            response = _API.post(register_url, json=data)
             response_data = response.json()
 
             if response.status_code == 201:
                 # SUCESSO: Redireciona para o login ou mostra mensagem
-                return redirect(url_for('login', msg="Registro realizado! Faça login."))
+                return redirect(url_for('auth.login', msg="Registro realizado! Faça login."))
             else:
                 # FALHA: Mostra erro da API
                 erro_msg = response_data.get("message", "Erro ao registrar.")
@@ -2053,7 +1763,7 @@ def registrar():
     # Método GET: Apenas mostra o formulário
     return render_register_form()
 
-@app.route('/login', methods=['GET', 'POST'])
+@auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """
     Rota de autenticação (login) de usuários.
@@ -2099,7 +1809,7 @@ def login():
     """
     # Verifica se já existe uma sessão ativa
     if SESSION_KEY_TYPE in session:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('auth.dashboard'))
 
     if request.method == 'POST':
         email = request.form.get('usuario')
@@ -2108,7 +1818,7 @@ def login():
         
         try:
             # 1. Chama a API Node.js para autenticação
-            response = requests.post(login_url, json={"email": email, "senha": senha})
+            response = _API.post(login_url, json={"email": email, "senha": senha})
             response_data = response.json()
 
             if response.status_code == 200:
@@ -2116,7 +1826,7 @@ def login():
                 session[SESSION_KEY_TOKEN] = response_data.get("token")
                 session[SESSION_KEY_TYPE] = response_data.get("usuario").get("tipo_usuario")
                 
-                return redirect(url_for('dashboard')) # Redireciona para o portão
+                return redirect(url_for('auth.dashboard')) # Redireciona para o portão
             
             else:
                 # 3. FALHA: Exibe o erro da API
@@ -2130,7 +1840,7 @@ def login():
     return render_login_form()
 
 
-@app.route('/logout')
+@auth_bp.route('/logout')
 def logout():
     """
     Rota para encerrar sessão do usuário (logout).
@@ -2148,7 +1858,7 @@ def logout():
     """
     session.pop(SESSION_KEY_TOKEN, None)
     session.pop(SESSION_KEY_TYPE, None)
-    return redirect(url_for('login'))
+    return redirect(url_for('auth.login'))
 
 
 
@@ -2157,7 +1867,15 @@ def logout():
 # Interface Admin
 # -----------------------------------------------------
 
-@app.route('/painel/admin', methods=['GET', 'POST'])
+# Mensagem exibida quando a montagem do painel em streaming falha depois de
+# o topo da página já ter sido enviado (mesmo estilo do feedback de erro)
+_ERRO_PAINEL_ADMIN_HTML = (
+    '<div class="error" style="padding: 12px; margin-bottom: 20px; border-radius: 4px; '
+    'background: #f8d7da; color: #721c24;">'
+    'Erro ao carregar o painel do administrador. Tente recarregar a página.</div>'
+)
+
+@admin_bp.route('/painel/admin', methods=['GET', 'POST'])
 @require_login
 def painel_admin():
     user_type = session.get(SESSION_KEY_TYPE)
@@ -2165,7 +1883,7 @@ def painel_admin():
     
     # Proteção: Apenas Admin pode acessar
     if user_type != 'admin' or not token:
-        return redirect(url_for('logout'))
+        return redirect(url_for('auth.logout'))
 
     # Variáveis de feedback (se houver um POST)
     feedback_msg = None
@@ -2175,14 +1893,21 @@ def painel_admin():
     # LÓGICA POST (Processamento dos Formulários)
     # ----------------------------------------------------
     if request.method == 'POST':
-        action = request.form.get('action')
+        # Ações enviadas via fetch (corpo JSON, ver /static/js/admin.js) recebem
+        # {"msg", "cls"} em JSON, sem recarregar a página; os formulários
+        # comuns continuam sendo redirecionados para o GET
+        via_fetch = request.is_json
+        if via_fetch:
+            dados = request.get_json(silent=True)
+            form_data = MultiDict(dados if isinstance(dados, dict) else {})
+        else:
+            form_data = request.form
+        action = form_data.get('action')
         
         try:
-            result = process_admin_action(action, request.form, token)
+            result = process_admin_action(action, form_data, token)
             feedback_msg = result['msg']
             feedback_cls = result['cls']
-            # Redireciona para o GET com a mensagem de feedback
-            return redirect(url_for('painel_admin', msg=feedback_msg, cls=feedback_cls))
             
         except requests.exceptions.RequestException:
             feedback_msg = "ERRO DE CONEXÃO com a API Node.js."
@@ -2190,36 +1915,68 @@ def painel_admin():
         except Exception as e:
             feedback_msg = f"Erro inesperado: {e}"
             feedback_cls = "error"
-            
-        # Se houver um erro de exceção, recarrega a página com a mensagem
-        return redirect(url_for('painel_admin', msg=feedback_msg, cls=feedback_cls))
+        
+        # A ação pode ter alterado os dados (mesmo se terminou em erro):
+        # a próxima exibição do painel busca tudo de novo na API
+        _ADMIN_CACHE.invalidar(token)
+        
+        if via_fetch:
+            return jsonify(msg=feedback_msg, cls=feedback_cls)
+        # Redireciona para o GET com a mensagem de feedback
+        return redirect(url_for('admin.painel_admin', msg=feedback_msg, cls=feedback_cls))
 
 
     # ----------------------------------------------------
     # LÓGICA GET (Exibir Formulários e Dados)
     # ----------------------------------------------------
     
-    # Busca recursos (Turmas e Disciplinas) para preencher os <select>
-    recursos = fetch_admin_resources(token)
-    
     # Obtém mensagem do redirecionamento
     feedback_msg = request.args.get('msg')
     feedback_cls = request.args.get('cls')
     
-    conteudo_admin_html = render_admin_content(user_type, recursos, feedback_msg, feedback_cls, token)
+    # Com mensagem, a página é o resultado de uma ação (inclusive as feitas
+    # direto na API pelo navegador, como a exclusão em cascata): dados novos
+    if feedback_msg:
+        _ADMIN_CACHE.invalidar(token)
     
     # Adiciona botão de sair no topo
-    btn_sair = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('logout')}" class="btn-sair">
-             Sair
-        </a>
-    </div>
-    '''
-    
-    conteudo_completo = f'{btn_sair}{conteudo_admin_html}'
-    
-    return render_base(conteudo_completo, "Painel do Administrador")
+    btn_sair = _barra_navegacao(_BOTAO_SAIR)
+    
+    # Dados do painel (em cache por _ADMIN_CACHE) buscados antes da resposta:
+    # o ETag (fraco) é calculado a partir deles, sem precisar do HTML. Se o
+    # navegador já tem esta versão (If-None-Match), recebe 304 sem corpo e a
+    # página nem é montada. Fraco porque comprimir_html pode entregar os
+    # mesmos dados em gzip; 'private, no-cache' mantém a página fora de
+    # caches compartilhados e obriga a revalidação.
+    recursos = _ADMIN_CACHE.obter(token, 'recursos', lambda: fetch_admin_resources(token))
+    estrutura_completa = obter_estrutura_admin(token, recursos)
+    etag = _etag_painel_admin(token, recursos, estrutura_completa, feedback_msg, feedback_cls)
+    
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        # O HTML vai em streaming: o topo do layout (head com as folhas de
+        # estilo) e a barra de navegação saem antes da montagem do painel
+        def gerar_pagina():
+            yield _BASE_TOPO.format(page_title=escape("Painel do Administrador"))
+            yield btn_sair
+            # O status 200 já foi enviado: um erro daqui em diante não vira
+            # página de erro, então é registrado e exibido no próprio painel,
+            # e o layout é sempre fechado
+            try:
+                yield render_admin_content(
+                    user_type, recursos, feedback_msg, feedback_cls, token,
+                    estrutura_completa=estrutura_completa,
+                )
+            except Exception:
+                logger.exception("[painel_admin] Erro ao montar o painel em streaming")
+                yield _ERRO_PAINEL_ADMIN_HTML
+            yield _BASE_RODAPE
+        
+        response = Response(stream_with_context(gerar_pagina()), mimetype='text/html')
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 # ============================================================================
 # FUNÇÕES AUXILIARES DO ADMINISTRADOR
 # ============================================================================
@@ -2240,8 +1997,8 @@ def listar_recursos_para_admin(token):
     """
     # Por simplicidade, faremos um GET de todas as turmas e disciplinas
     try:
-        turmas_res = requests.get(f"{API_BASE_URL}/academico/turmas", headers={"Authorization": f"Bearer {token}"}).json()
-        disciplinas_res = requests.get(f"{API_BASE_URL}/academico/disciplinas", headers={"Authorization": f"Bearer {token}"}).json()
+        turmas_res = _API.get(f"{API_BASE_URL}/academico/turmas", headers=_auth_headers(token)).json()
+        disciplinas_res = _API.get(f"{API_BASE_URL}/academico/disciplinas", headers=_auth_headers(token)).json()
         
         return {
             'turmas': turmas_res.get('turmas', []),
@@ -2291,19 +2048,19 @@ def process_admin_action(action, form_data, token):
                 
             url = f"{API_BASE_URL}/auth/register"
             payload = {"email": email, "senha": senha, "tipo_usuario": "professor"}
-            method = requests.post
+            method = _API.post
             success_msg = f"Professor {email} criado com sucesso!"
         
         elif action == 'create_turma':
             url = f"{API_BASE_URL}/academico/turmas"
             payload = {"nome_turma": form_data.get('nome_turma'), "ano": int(form_data.get('ano'))}
-            method = requests.post
+            method = _API.post
             success_msg = "Turma criada com sucesso!"
 
         elif action == 'assign_professor':
             url = f"{API_BASE_URL}/academico/turmas/atribuir-professor"
             payload = {"turma_id": int(form_data.get('turma_id')), "professor_id": int(form_data.get('professor_id'))}
-            method = requests.put
+            method = _API.put
             success_msg = f"Professor {form_data.get('professor_id')} atribuído à turma com sucesso!"
         
         elif action == 'assign_professor_disciplina':
@@ -2319,11 +2076,11 @@ def process_admin_action(action, form_data, token):
             url = f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas/{disciplina_id}/professor"
             payload = {"professor_id": professor_id}
             # Tenta PUT primeiro, se falhar tenta POST
-            method = requests.put
+            method = _API.put
             
             # Tenta fazer a requisição (primeiro com PUT, depois com POST como fallback)
             try:
-                response = requests.put(url, json=payload, headers={"Authorization": f"Bearer {token}"})
+                response = _API.put(url, json=payload, headers=_auth_headers(token))
                 
                 # Log para debug
                 print(f"[Flask POST Debug - Assign Professor Disciplina]")
@@ -2335,7 +2092,7 @@ def process_admin_action(action, form_data, token):
                 # Se PUT retornar 404, tenta POST
                 if response.status_code == 404:
                     print("[Flask POST Debug] PUT retornou 404, tentando POST...")
-                    response = requests.post(url, json=payload, headers={"Authorization": f"Bearer {token}"})
+                    response = _API.post(url, json=payload, headers=_auth_headers(token))
                     print(f"[Flask POST Debug] POST Status: {response.status_code}")
                     print(f"[Flask POST Debug] POST Response: {response.text[:500]}")
                 
@@ -2417,7 +2174,7 @@ def process_admin_action(action, form_data, token):
             # 4. Montar payload e definir chamada
             url = f"{API_BASE_URL}/academico/turmas/associar-disciplinas" # Rota correta: associar-disciplinas
             payload = {"turma_id": turma_id_disciplina, "disciplina_ids": disciplina_ids}
-            method = requests.post
+            method = _API.post
             # success_msg não é mais necessário aqui, pegaremos da API
 
             # DEBUG LOGS (Manter por enquanto)
@@ -2429,7 +2186,7 @@ def process_admin_action(action, form_data, token):
             
             # --- CÓDIGO FALTANTE: EXECUTAR A REQUISIÇÃO E PROCESSAR RESPOSTA ---
             try:
-                response = method(url, json=payload, headers={"Authorization": f"Bearer {token}"})
+                response = method(url, json=payload, headers=_auth_headers(token))
                 
                 # LOG ANTES DO JSON PARSE
                 print(f"[Flask POST Debug] Status Recebido: {response.status_code}")
@@ -2481,7 +2238,7 @@ def process_admin_action(action, form_data, token):
                 "turma_id": int(form_data.get('turma_id_matricula')), 
                 "disciplina_id": int(form_data.get('disciplina_id_matricula'))
             }
-            method = requests.post
+            method = _API.post
             success_msg = f"Aluno {form_data.get('aluno_id')} matriculado com sucesso!"
 
         elif action == 'create_disciplina':
@@ -2490,7 +2247,7 @@ def process_admin_action(action, form_data, token):
                 "nome_disciplina": form_data.get('nome_disciplina'),
                 "descricao": form_data.get('descricao') 
             }
-            method = requests.post
+            method = _API.post
             success_msg = f"Disciplina '{form_data.get('nome_disciplina')}' criada com sucesso!"
 
         elif action == 'remove_disciplina_from_turma':
@@ -2503,7 +2260,7 @@ def process_admin_action(action, form_data, token):
             except ValueError:
                 return {"msg": "Erro: ID da Turma ou Disciplina inválido (remove).", "cls": "error"}
             
-            method = requests.post # Usando POST como definido na API (para formulário HTML)
+            method = _API.post # Usando POST como definido na API (para formulário HTML)
             success_msg = "Disciplina desassociada da turma com sucesso!"
 
     # BLOCO FALTANTE 2: Excluir Disciplina (Global)
@@ -2516,7 +2273,7 @@ def process_admin_action(action, form_data, token):
             # A rota da API é DELETE /api/academico/disciplinas/:id
             url = f"{API_BASE_URL}/academico/disciplinas/{disciplina_id}"
             payload = None # DELETE não precisa de payload
-            method = requests.delete # Usando o método HTTP DELETE
+            method = _API.delete # Usando o método HTTP DELETE
             success_msg = "Disciplina excluída permanentemente com sucesso!"
         
         elif action == 'delete_matricula':
@@ -2528,7 +2285,7 @@ def process_admin_action(action, form_data, token):
             # A rota da API é DELETE /api/academico/matriculas/:id
             url = f"{API_BASE_URL}/academico/matriculas/{matricula_id}"
             payload = None
-            method = requests.delete # Método HTTP DELETE
+            method = _API.delete # Método HTTP DELETE
             success_msg = f"Matrícula {matricula_id} excluída com sucesso!"
 
         elif action == 'delete_notas_da_disciplina':
@@ -2540,7 +2297,7 @@ def process_admin_action(action, form_data, token):
             # A rota da API é DELETE /api/academico/disciplinas/:id/notas
             url = f"{API_BASE_URL}/academico/disciplinas/{disciplina_id}/notas"
             payload = None
-            method = requests.delete # Método HTTP DELETE
+            method = _API.delete # Método HTTP DELETE
             success_msg = f"Notas da disciplina {disciplina_id} excluídas com sucesso!"
 
         elif action == 'delete_turma':
@@ -2552,7 +2309,7 @@ def process_admin_action(action, form_data, token):
             # A rota da API é DELETE /api/academico/turmas/:id
             url = f"{API_BASE_URL}/academico/turmas/{turma_id}"
             payload = None
-            method = requests.delete # Método HTTP DELETE
+            method = _API.delete # Método HTTP DELETE
             success_msg = f"Turma {turma_id} excluída com sucesso!"
         
         else:
@@ -2562,7 +2319,7 @@ def process_admin_action(action, form_data, token):
             # Se não houver payload (como no DELETE), envia None
             json_payload = payload if payload else None
             
-            response = method(url, json=json_payload, headers={"Authorization": f"Bearer {token}"})
+            response = method(url, json=json_payload, headers=_auth_headers(token))
             
             response_data = {}
             try:
@@ -2588,35 +2345,106 @@ def process_admin_action(action, form_data, token):
         return {"msg": f"Erro inesperado no processamento: {e}", "cls": "error"}
 
 # --- AUXILIAR: BUSCAR ESTRUTURA COMPLETA DO SISTEMA ---
-def buscar_estrutura_completa(token):
-    """Busca a estrutura completa: turmas, disciplinas por turma, alunos por turma/disciplina."""
-    headers = {"Authorization": f"Bearer {token}"}
+def buscar_estrutura_completa(token, turmas=None, professores=None):
+    """
+    Busca a estrutura completa: turmas, disciplinas por turma, alunos por turma/disciplina.
+    
+    turmas e professores podem vir prontos de fetch_admin_resources (o painel
+    admin já os buscou na mesma requisição); só são buscados na API quando
+    não informados (None).
+    
+    Retorna (estrutura, completo): completo é False se alguma chamada à API
+    falhou, e nesse caso o _ADMIN_CACHE não guarda a estrutura.
+    """
+    headers = _auth_headers(token)
     estrutura = {}
+    # Falhas registradas também pelas threads do _ADMIN_POOL (list.append é
+    # seguro entre threads); qualquer item torna o resultado incompleto
+    falhas = []
     
     try:
         # Busca todas as turmas
-        turmas_res = requests.get(f"{API_BASE_URL}/academico/turmas", headers=headers, timeout=5)
-        if turmas_res.status_code == 200:
-            turmas = turmas_res.json().get('turmas', [])
-        else:
-            print(f"[buscar_estrutura_completa] Erro ao buscar turmas: {turmas_res.status_code}")
-            return estrutura
+        if turmas is None:
+            turmas_res = _API.get(f"{API_BASE_URL}/academico/turmas", headers=headers, timeout=5)
+            if turmas_res.status_code == 200:
+                turmas = turmas_res.json().get('turmas', [])
+            else:
+                logger.warning("[buscar_estrutura_completa] Erro ao buscar turmas: %s", turmas_res.status_code)
+                return estrutura, False
             
         if not turmas:
-            print("[buscar_estrutura_completa] Nenhuma turma encontrada")
-            return estrutura
+            logger.debug("[buscar_estrutura_completa] Nenhuma turma encontrada")
+            return estrutura, True
             
         # Busca todos os professores uma vez (para otimizar)
         professores_dict = {}
-        try:
-            prof_res = requests.get(f"{API_BASE_URL}/academico/professores", headers=headers, timeout=5)
-            if prof_res.status_code == 200:
-                professores = prof_res.json().get('professores', [])
-                professores_dict = {p.get('id_usuario'): p for p in professores}
-        except Exception as e:
-            print(f"[buscar_estrutura_completa] Erro ao buscar professores: {e}")
+        if professores is None:
+            try:
+                prof_res = _API.get(f"{API_BASE_URL}/academico/professores", headers=headers, timeout=5)
+                if prof_res.status_code == 200:
+                    professores = prof_res.json().get('professores', [])
+                else:
+                    falhas.append('professores')
+            except Exception as e:
+                falhas.append('professores')
+                logger.warning("[buscar_estrutura_completa] Erro ao buscar professores: %s", e)
+        if professores:
+            professores_dict = {p.get('id_usuario'): p for p in professores}
             
-        for turma in turmas:
+        def disciplinas_da_turma(turma_id):
+            # Usa a rota que retorna apenas as disciplinas realmente associadas à turma
+            try:
+                disc_turma_res = _API.get(
+                    f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas",
+                    headers=headers,
+                    timeout=5
+                )
+                if disc_turma_res.status_code == 200:
+                    return disc_turma_res.json().get('disciplinas', [])
+                falhas.append(turma_id)
+                logger.warning("[buscar_estrutura_completa] Erro ao buscar disciplinas da turma %s: %s", turma_id, disc_turma_res.status_code)
+            except requests.exceptions.RequestException as e:
+                falhas.append(turma_id)
+                logger.warning("[buscar_estrutura_completa] Erro ao buscar disciplinas da turma %s: %s", turma_id, e)
+            except Exception as e:
+                falhas.append(turma_id)
+                logger.warning("[buscar_estrutura_completa] Erro inesperado ao buscar disciplinas da turma %s: %s", turma_id, e)
+            return []
+        
+        def alunos_da_disciplina(par):
+            turma_id, disciplina_id = par
+            try:
+                alunos_res = _API.get(
+                    f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas/{disciplina_id}/alunos",
+                    headers=headers,
+                    timeout=3
+                )
+                if alunos_res.status_code == 200:
+                    return alunos_res.json().get('alunos', [])
+                falhas.append(par)
+            except Exception as e:
+                falhas.append(par)
+                logger.warning(
+                    "[buscar_estrutura_completa] Erro ao buscar alunos para turma %s, disciplina %s: %s",
+                    turma_id, disciplina_id, e,
+                )
+            return []
+        
+        # Etapa 1: disciplinas de todas as turmas, em paralelo
+        turma_ids = [turma['turma_id'] for turma in turmas]
+        disciplinas_por_turma = list(_ADMIN_POOL.map(disciplinas_da_turma, turma_ids))
+        
+        # Etapa 2: alunos de todos os pares turma/disciplina, em paralelo
+        pares = [
+            (turma_id, disc_assoc['disciplina_id'])
+            for turma_id, disciplinas_associadas in zip(turma_ids, disciplinas_por_turma)
+            for disc_assoc in disciplinas_associadas
+            if disc_assoc.get('disciplina_id')
+        ]
+        alunos_por_par = dict(zip(pares, _ADMIN_POOL.map(alunos_da_disciplina, pares)))
+        
+        # Monta a estrutura com os resultados, na ordem das turmas
+        for turma, disciplinas_associadas in zip(turmas, disciplinas_por_turma):
                 turma_id = turma['turma_id']
                 professor_id_turma = turma.get('professor_id')
                 professor_turma_info = professores_dict.get(professor_id_turma) if professor_id_turma else None
@@ -2628,64 +2456,31 @@ def buscar_estrutura_completa(token):
                     'alunos_por_turma': []
                 }
                 
-                # Busca disciplinas desta turma usando a rota específica
-                # Esta rota retorna APENAS as disciplinas realmente associadas à turma
                 disciplinas_encontradas = {}
                 
-                try:
-                    # Usa a rota que retorna apenas disciplinas associadas à turma
-                    disc_turma_res = requests.get(
-                        f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas",
-                        headers=headers,
-                        timeout=5
-                    )
+                # Para cada disciplina associada, usa os alunos já buscados e o professor
+                for disc_assoc in disciplinas_associadas:
+                    disciplina_id = disc_assoc.get('disciplina_id')
+                    if not disciplina_id:
+                        continue
                     
-                    if disc_turma_res.status_code == 200:
-                        disciplinas_associadas = disc_turma_res.json().get('disciplinas', [])
-                        
-                        # Para cada disciplina associada, busca alunos e professor
-                        for disc_assoc in disciplinas_associadas:
-                            disciplina_id = disc_assoc.get('disciplina_id')
-                            if not disciplina_id:
-                                continue
-                            
-                            # Busca professor específico da disciplina (se houver)
-                            professor_id_disc = disc_assoc.get('professor_id')
-                            professor_disc_info = None
-                            
-                            if professor_id_disc:
-                                professor_disc_info = professores_dict.get(professor_id_disc)
-                            
-                            # Se não houver professor específico, usa o professor da turma
-                            if not professor_disc_info:
-                                professor_disc_info = professor_turma_info
-                            
-                            # Busca alunos desta turma/disciplina
-                            alunos = []
-                            try:
-                                alunos_res = requests.get(
-                                    f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas/{disciplina_id}/alunos",
-                                    headers=headers,
-                                    timeout=3
-                                )
-                                
-                                if alunos_res.status_code == 200:
-                                    alunos = alunos_res.json().get('alunos', [])
-                            except Exception as e:
-                                print(f"[buscar_estrutura_completa] Erro ao buscar alunos para turma {turma_id}, disciplina {disciplina_id}: {e}")
-                            
-                            # Adiciona a disciplina encontrada
-                            disciplinas_encontradas[disciplina_id] = {
-                                'info': disc_assoc,
-                                'alunos': alunos,
-                                'professor': professor_disc_info
-                            }
-                    else:
-                        print(f"[buscar_estrutura_completa] Erro ao buscar disciplinas da turma {turma_id}: {disc_turma_res.status_code}")
-                except requests.exceptions.RequestException as e:
-                    print(f"[buscar_estrutura_completa] Erro ao buscar disciplinas da turma {turma_id}: {e}")
-                except Exception as e:
-                    print(f"[buscar_estrutura_completa] Erro inesperado ao buscar disciplinas da turma {turma_id}: {e}")
+                    # Busca professor específico da disciplina (se houver)
+                    professor_id_disc = disc_assoc.get('professor_id')
+                    professor_disc_info = None
+                    
+                    if professor_id_disc:
+                        professor_disc_info = professores_dict.get(professor_id_disc)
+                    
+                    # Se não houver professor específico, usa o professor da turma
+                    if not professor_disc_info:
+                        professor_disc_info = professor_turma_info
+                    
+                    # Adiciona a disciplina encontrada
+                    disciplinas_encontradas[disciplina_id] = {
+                        'info': disc_assoc,
+                        'alunos': alunos_por_par[(turma_id, disciplina_id)],
+                        'professor': professor_disc_info
+                    }
                 
                 # Armazena as disciplinas encontradas
                 estrutura[turma_id]['disciplinas'] = disciplinas_encontradas
@@ -2702,343 +2497,111 @@ def buscar_estrutura_completa(token):
                     pass
                     
     except Exception as e:
-        print(f"[buscar_estrutura_completa] Erro: {e}")
+        falhas.append(None)
+        logger.warning("[buscar_estrutura_completa] Erro: %s", e)
     
-    return estrutura
+    return estrutura, not falhas
 
-def construir_visao_geral_html(estrutura):
-    """Constrói HTML hierárquico para visualização da estrutura completa."""
-    
-    visao_css = """
-    <style>
-        .visao-geral-section {
-            background: #fff;
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 40px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-        }
-        .visao-geral-header {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 3px solid #1b55f8;
-        }
-        .visao-geral-header h2 {
-            margin: 0;
-            color: #1b55f8;
-            font-size: 1.8rem;
-        }
-        .turma-card-overview {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 12px;
-            margin-bottom: 25px;
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-        }
-        .turma-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-        }
-        .turma-header h3 {
-            margin: 0;
-            font-size: 1.5rem;
-            font-weight: 700;
-        }
-        .turma-stats {
-            display: flex;
-            gap: 20px;
-            margin-top: 15px;
-            flex-wrap: wrap;
-        }
-        .stat-badge {
-            background: rgba(255, 255, 255, 0.2);
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 0.9rem;
-            backdrop-filter: blur(10px);
-        }
-        .professor-badge {
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            background: rgba(255, 255, 255, 0.15);
-            padding: 8px 12px;
-            border-radius: 8px;
-            margin-top: 10px;
-            font-size: 0.9rem;
-        }
-        .professor-icon {
-            width: 20px;
-            height: 20px;
-            background: #ff9800;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: bold;
-            font-size: 0.75rem;
-        }
-        .professor-info {
-            margin-top: 10px;
-            padding: 10px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 8px;
-            font-size: 0.9rem;
-        }
-        .disciplinas-container {
-            margin-top: 20px;
-        }
-        .disciplina-card {
-            background: white;
-            color: #333;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 15px;
-            border-left: 4px solid #4CAF50;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        .disciplina-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-        }
-        .disciplina-header h4 {
-            margin: 0;
-            color: #4CAF50;
-            font-size: 1.2rem;
-        }
-        .alunos-list {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-            gap: 10px;
-            margin-top: 15px;
-        }
-        .aluno-badge {
-            background: #f0f0f0;
-            padding: 10px 15px;
-            border-radius: 8px;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 0.9rem;
-            transition: transform 0.2s;
-        }
-        .aluno-badge:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-        }
-        .aluno-icon {
-            width: 24px;
-            height: 24px;
-            background: #4CAF50;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: bold;
-            font-size: 0.8rem;
-        }
-        .alunos-turma-list {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(180px, 1fr));
-            gap: 10px;
-            margin-top: 15px;
-            padding: 15px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 8px;
-        }
-        .empty-state {
-            text-align: center;
-            padding: 40px;
-            color: #999;
-            font-style: italic;
-        }
-        .toggle-disciplinas {
-            background: rgba(255, 255, 255, 0.2);
-            border: none;
-            color: white;
-            padding: 8px 16px;
-            border-radius: 6px;
-            cursor: pointer;
-            font-weight: 600;
-            transition: background 0.3s;
-        }
-        .toggle-disciplinas:hover {
-            background: rgba(255, 255, 255, 0.3);
-        }
-        .collapsed {
-            display: none;
-        }
-    </style>
-    """
-    
-    html = f"""
-    {visao_css}
+# Visão geral do painel admin (template Jinja, compilado uma vez; estilos em
+# /static/css/admin.css). Recebe as turmas já resumidas por
+# construir_visao_geral_html; o autoescape cuida dos nomes e e-mails. Os
+# alunos chegam como tuplas (aluno_id, nome_completo, iniciais).
+_TEMPLATES_INTERNOS['admin/visao_geral.html'] = """
     <div class="visao-geral-section">
         <div class="visao-geral-header">
             <h2> Visão Geral do Sistema</h2>
-            <span style="color: #666; font-size: 0.9rem;">Total de Turmas: {len(estrutura)}</span>
+            <span style="color: #666; font-size: 0.9rem;">Total de Turmas: {{ turmas|length }}</span>
         </div>
-    """
-    
-    if not estrutura:
-        html += """
+    {%- if not turmas %}
         <div class="empty-state">
             <p>Nenhuma turma cadastrada no sistema.</p>
         </div>
-        </div>
-        """
-        return html
-    
-    for turma_id, turma_data in estrutura.items():
-        turma_info = turma_data['info']
-        disciplinas = turma_data['disciplinas']
-        alunos_turma = turma_data.get('alunos_por_turma', [])
-        
-        nome_turma = escape(turma_info.get('nome_turma', 'Sem nome'))
-        ano = turma_info.get('ano', 'N/A')
-        professor_turma = turma_data.get('professor_turma')
-        total_disciplinas = len(disciplinas)
-        total_alunos_turma = len(alunos_turma)
-        
-        # Conta professores únicos das disciplinas
-        professores_disciplinas = set()
-        for disc_data in disciplinas.values():
-            prof_disc = disc_data.get('professor')
-            if prof_disc and prof_disc.get('id_usuario'):
-                professores_disciplinas.add((prof_disc.get('id_usuario'), prof_disc.get('email', 'N/A')))
-        
-        html += f"""
+    </div>
+    {%- else %}
+    {%- for turma in turmas %}
         <div class="turma-card-overview">
             <div class="turma-header">
                 <div>
-                    <h3>{nome_turma}</h3>
-                    <p style="margin: 5px 0 0 0; opacity: 0.9;">Ano: {ano} • ID: {turma_id}</p>
+                    <h3>{{ turma.nome }}</h3>
+                    <p style="margin: 5px 0 0 0; opacity: 0.9;">Ano: {{ turma.ano }} • ID: {{ turma.id }}</p>
                 </div>
             </div>
-            
             <div class="turma-stats">
                 <div class="stat-badge">
-                    <strong>{total_disciplinas}</strong> Disciplina{'s' if total_disciplinas != 1 else ''}
+                    <strong>{{ turma.disciplinas|length }}</strong> Disciplina{{ 's' if turma.disciplinas|length != 1 }}
                 </div>
                 <div class="stat-badge">
-                    <strong>{total_alunos_turma}</strong> Aluno{'s' if total_alunos_turma != 1 else ''} na Turma
+                    <strong>{{ turma.alunos|length }}</strong> Aluno{{ 's' if turma.alunos|length != 1 }} na Turma
                 </div>
                 <div class="stat-badge">
-                    <strong>{len(professores_disciplinas) if professores_disciplinas else (1 if professor_turma else 0)}</strong> Professor{'es' if (len(professores_disciplinas) if professores_disciplinas else (1 if professor_turma else 0)) != 1 else ''}
+                    <strong>{{ turma.total_professores }}</strong> Professor{{ 'es' if turma.total_professores != 1 }}
                 </div>
             </div>
-            
-            {"<!-- Professor Responsável pela Turma -->" if professor_turma else ""}
-            {f'''
+            {%- if turma.professor %}
             <div class="professor-info">
                 <strong> Professor Responsável:</strong><br>
                 <div class="professor-badge">
                     <div class="professor-icon">P</div>
-                    <span>{escape(professor_turma.get("email", "N/A"))} (ID: {professor_turma.get("id_usuario", "N/A")})</span>
+                    <span>{{ turma.professor.get('email', 'N/A') }} (ID: {{ turma.professor.get('id_usuario', 'N/A') }})</span>
                 </div>
             </div>
-            ''' if professor_turma else '<div class="professor-info"><em>Nenhum professor atribuído à turma</em></div>'}
-            
-            <button class="toggle-disciplinas" onclick="toggleDisciplinas('disc_{turma_id}', this)">
-                {'▼ Ver Disciplinas e Alunos' if total_disciplinas > 0 else '─ Nenhuma disciplina'}
+            {%- else %}
+            <div class="professor-info"><em>Nenhum professor atribuído à turma</em></div>
+            {%- endif %}
+            <button class="toggle-disciplinas" onclick="toggleDisciplinas('disc_{{ turma.id }}', this)">
+                {{ '▼ Ver Disciplinas e Alunos' if turma.disciplinas else '─ Nenhuma disciplina' }}
             </button>
-            
-            <div id="disc_{turma_id}" class="disciplinas-container" style="{'display: none;' if total_disciplinas > 0 else 'display: block;'}">
-        """
-        
-        if total_disciplinas == 0:
-            html += '<div class="empty-state"><p>Nenhuma disciplina associada a esta turma.</p></div>'
-        else:
-            for disc_id, disc_data in disciplinas.items():
-                disc_info = disc_data['info']
-                alunos_disc = disc_data['alunos']
-                professor_disc = disc_data.get('professor')
-                nome_disc = escape(disc_info.get('nome_disciplina', 'Sem nome'))
-                total_alunos_disc = len(alunos_disc)
-                
-                html += f"""
+            <div id="disc_{{ turma.id }}" class="disciplinas-container" style="{{ 'display: none;' if turma.disciplinas else 'display: block;' }}">
+            {%- for disc in turma.disciplinas %}
                 <div class="disciplina-card">
                     <div class="disciplina-header">
-                        <h4> {nome_disc}</h4>
-                        <span style="color: #666; font-size: 0.9rem;">ID: {disc_id} • {total_alunos_disc} Aluno{'s' if total_alunos_disc != 1 else ''}</span>
+                        <h4> {{ disc.nome }}</h4>
+                        <span style="color: #666; font-size: 0.9rem;">ID: {{ disc.id }} • {{ disc.alunos|length }} Aluno{{ 's' if disc.alunos|length != 1 }}</span>
                     </div>
-                    
-                    {f'''
+                    {%- if disc.professor %}
                     <div style="margin-bottom: 15px; padding: 10px; background: #f8f9fa; border-radius: 6px;">
-                        <strong> Professor:</strong> {escape(professor_disc.get("email", "N/A")) if professor_disc else "Não atribuído"}
-                        {f' (ID: {professor_disc.get("id_usuario")})' if professor_disc and professor_disc.get("id_usuario") else ''}
+                        <strong> Professor:</strong> {{ disc.professor.get('email', 'N/A') }}
+                        {%- if disc.professor.get('id_usuario') %} (ID: {{ disc.professor.get('id_usuario') }}){% endif %}
                     </div>
-                    ''' if professor_disc else '<div style="margin-bottom: 15px; padding: 10px; background: #fff3cd; border-radius: 6px; color: #856404;"><em>Nenhum professor atribuído a esta disciplina</em></div>'}
-                    
+                    {%- else %}
+                    <div style="margin-bottom: 15px; padding: 10px; background: #fff3cd; border-radius: 6px; color: #856404;"><em>Nenhum professor atribuído a esta disciplina</em></div>
+                    {%- endif %}
                     <div class="alunos-list">
-                """
-                
-                if total_alunos_disc == 0:
-                    html += '<div class="empty-state"><p style="grid-column: 1/-1;">Nenhum aluno matriculado nesta disciplina.</p></div>'
-                else:
-                    for aluno in alunos_disc:
-                        aluno_id = aluno.get('aluno_id', 'N/A')
-                        nome = escape(aluno.get('nome', ''))
-                        sobrenome = escape(aluno.get('sobrenome', ''))
-                        nome_completo = f"{nome} {sobrenome}".strip() or f"Aluno ID: {aluno_id}"
-                        iniciais = f"{nome[0] if nome else ''}{sobrenome[0] if sobrenome else ''}".upper() or "??"
-                        
-                        html += f"""
+                    {%- for aluno_id, nome_completo, iniciais in disc.alunos %}
                         <div class="aluno-badge">
-                            <div class="aluno-icon">{iniciais[:2]}</div>
+                            <div class="aluno-icon">{{ iniciais }}</div>
                             <div>
-                                <strong>{nome_completo}</strong>
-                                <div style="font-size: 0.8rem; color: #666;">ID: {aluno_id}</div>
+                                <strong>{{ nome_completo }}</strong>
+                                <div style="font-size: 0.8rem; color: #666;">ID: {{ aluno_id }}</div>
                             </div>
                         </div>
-                        """
-                
-                html += """
+                    {%- else %}
+                        <div class="empty-state"><p style="grid-column: 1/-1;">Nenhum aluno matriculado nesta disciplina.</p></div>
+                    {%- endfor %}
                     </div>
                 </div>
-                """
-        
-        # Mostra lista de todos os alunos da turma (se houver)
-        if total_alunos_turma > 0:
-            html += """
+            {%- else %}
+                <div class="empty-state"><p>Nenhuma disciplina associada a esta turma.</p></div>
+            {%- endfor %}
+            {%- if turma.alunos %}
             <div style="margin-top: 20px; padding-top: 20px; border-top: 2px solid rgba(255,255,255,0.3);">
                 <h4 style="margin-bottom: 15px; color: white;"> Todos os Alunos da Turma</h4>
                 <div class="alunos-turma-list">
-            """
-            for aluno_tuple in alunos_turma:
-                aluno_id, nome, sobrenome = aluno_tuple
-                nome_completo = f"{escape(nome)} {escape(sobrenome)}".strip() or f"Aluno ID: {aluno_id}"
-                iniciais = f"{nome[0] if nome else ''}{sobrenome[0] if sobrenome else ''}".upper() or "??"
-                html += f"""
+                {%- for aluno_id, nome_completo, iniciais in turma.alunos %}
                 <div class="aluno-badge" style="background: rgba(255,255,255,0.15); color: white;">
-                    <div class="aluno-icon" style="background: rgba(255,255,255,0.3);">{iniciais[:2]}</div>
+                    <div class="aluno-icon" style="background: rgba(255,255,255,0.3);">{{ iniciais }}</div>
                     <div>
-                        <strong>{nome_completo}</strong>
-                        <div style="font-size: 0.8rem; opacity: 0.8;">ID: {aluno_id}</div>
+                        <strong>{{ nome_completo }}</strong>
+                        <div style="font-size: 0.8rem; opacity: 0.8;">ID: {{ aluno_id }}</div>
                     </div>
                 </div>
-                """
-            html += """
+                {%- endfor %}
                 </div>
             </div>
-            """
-        
-        html += """
+            {%- endif %}
             </div>
         </div>
-        """
-    
-    html += """
+    {%- endfor %}
         <script>
         function toggleDisciplinas(id, button) {
             const element = document.getElementById(id);
@@ -3052,9 +2615,60 @@ def construir_visao_geral_html(estrutura):
         }
         </script>
     </div>
+    {%- endif %}
+    """
+_ADMIN_VISAO_GERAL_TPL = app.jinja_env.get_template('admin/visao_geral.html')
+
+def _aluno_resumo(aluno_id, nome, sobrenome):
+    """(aluno_id, nome completo, iniciais) de um aluno para a visão geral."""
+    nome = nome or ''
+    sobrenome = sobrenome or ''
+    nome_completo = f"{nome} {sobrenome}".strip() or f"Aluno ID: {aluno_id}"
+    iniciais = f"{nome[:1]}{sobrenome[:1]}".upper() or "??"
+    return (aluno_id, nome_completo, iniciais)
+
+def construir_visao_geral_html(estrutura):
     """
+    Constrói HTML hierárquico para visualização da estrutura completa.
     
-    return html
+    Resume cada turma (professor, disciplinas, alunos) em dicionários simples
+    e renderiza tudo de uma vez com o template compilado admin/visao_geral.html.
+    """
+    turmas = []
+    for turma_id, turma_data in estrutura.items():
+        turma_info = turma_data['info']
+        professor_turma = turma_data.get('professor_turma')
+        
+        disciplinas = []
+        # Conta professores únicos das disciplinas
+        professores_disciplinas = set()
+        for disc_id, disc_data in turma_data['disciplinas'].items():
+            prof_disc = disc_data.get('professor')
+            if prof_disc and prof_disc.get('id_usuario'):
+                professores_disciplinas.add((prof_disc.get('id_usuario'), prof_disc.get('email', 'N/A')))
+            disciplinas.append({
+                'id': disc_id,
+                'nome': disc_data['info'].get('nome_disciplina', 'Sem nome'),
+                'professor': prof_disc,
+                'alunos': [
+                    _aluno_resumo(aluno.get('aluno_id', 'N/A'), aluno.get('nome'), aluno.get('sobrenome'))
+                    for aluno in disc_data['alunos']
+                ],
+            })
+        
+        turmas.append({
+            'id': turma_id,
+            'nome': turma_info.get('nome_turma', 'Sem nome'),
+            'ano': turma_info.get('ano', 'N/A'),
+            'professor': professor_turma,
+            'total_professores': len(professores_disciplinas) or (1 if professor_turma else 0),
+            'disciplinas': disciplinas,
+            'alunos': [
+                _aluno_resumo(*aluno_tuple) for aluno_tuple in turma_data.get('alunos_por_turma', [])
+            ],
+        })
+    
+    return _ADMIN_VISAO_GERAL_TPL.render(turmas=turmas)
 
 # --- AUXILIAR: BUSCAR RECURSOS PARA SELECTS ---
 def fetch_admin_resources(token):
@@ -3072,61 +2686,54 @@ def fetch_admin_resources(token):
         token (str): Token JWT para autenticação na API
     
     Returns:
-        dict: Dicionário com as seguintes chaves:
-            - 'turmas': Lista de turmas
-            - 'disciplinas': Lista de disciplinas
-            - 'professores': Lista de professores
-            - 'alunos': Lista de alunos
+        tuple: (recursos, completo)
+            - recursos (dict): Dicionário com as seguintes chaves:
+                - 'turmas': Lista de turmas
+                - 'disciplinas': Lista de disciplinas
+                - 'professores': Lista de professores
+                - 'alunos': Lista de alunos
+            - completo (bool): False se alguma requisição falhou (o
+              _ADMIN_CACHE não guarda o resultado)
     
     Nota:
         Se alguma requisição falhar, a lista correspondente será vazia,
         mas a função não interrompe a execução.
     """
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = _auth_headers(token)
     
     resources = {'turmas': [], 'disciplinas': [], 'professores': [], 'alunos': []} # Default
 
-    try:
-        # Busca Turmas
-        turmas_res = requests.get(f"{API_BASE_URL}/academico/turmas", headers=headers)
-        if turmas_res.status_code == 200:
-            resources['turmas'] = turmas_res.json().get('turmas', [])
-
-        # Busca Disciplinas
-        disciplinas_res = requests.get(f"{API_BASE_URL}/academico/disciplinas", headers=headers)
-        if disciplinas_res.status_code == 200:
-            resources['disciplinas'] = disciplinas_res.json().get('disciplinas', [])
-            
-    # Busca Professores
-        professores_res = requests.get(f"{API_BASE_URL}/academico/professores", headers=headers)
-        if professores_res.status_code == 200:
-            resources['professores'] = professores_res.json().get('professores', [])
-
-            
-
-    # Busca Alunos
-        alunos_res = requests.get(f"{API_BASE_URL}/academico/alunos", headers=headers)
-        if alunos_res.status_code == 200:
-            resources['alunos'] = alunos_res.json().get('alunos', [])
-        
-
-    except requests.exceptions.RequestException as e:
-        print(f"[FETCH RESOURCES ERROR]: {e}") 
+    # As quatro listas são independentes: busca todas em paralelo
+    # (GET /academico/turmas, /disciplinas, /professores e /alunos)
+    futuros = {
+        chave: _ADMIN_POOL.submit(_API.get, f"{API_BASE_URL}/academico/{chave}", headers=headers)
+        for chave in resources
+    }
+    completo = True
+    for chave, futuro in futuros.items():
+        try:
+            res = futuro.result()
+            if res.status_code == 200:
+                resources[chave] = res.json().get(chave, [])
+            else:
+                completo = False
+                logger.warning("[fetch_admin_resources] Erro ao buscar %s: %s", chave, res.status_code)
+        except requests.exceptions.RequestException as e:
+            completo = False
+            logger.warning("[fetch_admin_resources] Erro ao buscar %s: %s", chave, e)
 
-    # LOG FINAL DA FUNÇÃO
-    print(f"--- [fetch_admin_resources] Retornando Recursos ---\n")
-    return resources
+    return resources, completo
 # ROTAS DE INTERFACE POR PERFIL
 # --------------------------------------------------------------------------------------
 
-@app.route('/painel/aluno')
+@aluno_bp.route('/painel/aluno')
 @require_login
 def painel_aluno():
     """Página inicial (Dashboard) após o login do aluno."""
     
     # 1. Proteção: Garante que é realmente um aluno logado
     if session.get(SESSION_KEY_TYPE) != 'aluno':
-        return redirect(url_for('dashboard')) 
+        return redirect(url_for('auth.dashboard')) 
 
     token = session.get(SESSION_KEY_TOKEN)
     boletim_data = []
@@ -3134,9 +2741,9 @@ def painel_aluno():
 
     try:
         # 2. Busca os dados do boletim na API (a mesma chamada da rota /boletim)
-        response = requests.get(
+        response = _API.get(
             f"{API_BASE_URL}/academico/boletim", 
-            headers={"Authorization": f"Bearer {token}"}
+            headers=_auth_headers(token)
         )
         response_data = response.json()
 
@@ -3168,7 +2775,7 @@ def painel_aluno():
             faltas += int(item.get('total_faltas', 0))
     
     if notas_validas:
-        media_geral_decimal = sum(notas_validas) / Decimal(len(notas_validas))
+        media_geral_decimal = sum(notas_validas) / len(notas_validas)
         media_geral = formatar_nota(media_geral_decimal, bold=True) # Reusa a função de formatação
 
     # 4. Constrói o HTML do Dashboard do Aluno (Melhorado e Moderno)
@@ -3375,8 +2982,8 @@ def painel_aluno():
     """
     
     # Ações rápidas
-    boletim_url = url_for('boletim')
-    ia_url = url_for('chat_ia')
+    boletim_url = url_for('aluno.boletim')
+    ia_url = url_for('aluno.chat_ia')
     quick_actions_html = f"""
     <div class="quick-actions">
         <h3>Ações Rápidas</h3>
@@ -3416,19 +3023,28 @@ def painel_aluno():
         '''
     
     # 5. Adiciona botão de sair no topo
-    btn_sair = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('logout')}" class="btn-sair">
-             Sair
-        </a>
-    </div>
-    '''
+    btn_sair = _barra_navegacao(_BOTAO_SAIR)
     
     conteudo_completo = f'{btn_sair}{conteudo_aluno_html}'
     
     # 6. Renderiza usando a base
     return render_base(conteudo_completo, "Painel do Aluno")
 
+# Quantizadores pré-construídos para arredondamento de notas
+# Evita reconstruir Decimal('0.0') / Decimal('0.01') a cada nota formatada.
+# O arredondamento é passado explicitamente: o contexto decimal
+# (getcontext) é por thread e não valeria para os workers do Flask.
+_Q1 = Decimal('0.0')
+_Q2 = Decimal('0.01')
+
+def _round1(valor):
+    """Arredonda um Decimal para 1 casa decimal (ROUND_HALF_UP)."""
+    return valor.quantize(_Q1, rounding=ROUND_HALF_UP)
+
+def _round2(valor):
+    """Arredonda um Decimal para 2 casas decimais (ROUND_HALF_UP)."""
+    return valor.quantize(_Q2, rounding=ROUND_HALF_UP)
+
 def formatar_nota(nota_str, bold=False):
     """
     Converte a string da nota (ou None) para Decimal, formata para 1 casa decimal,
@@ -3440,9 +3056,9 @@ def formatar_nota(nota_str, bold=False):
         
     try:
         # 1. Converte a string (ou float) para Decimal para precisão
-        nota_decimal = Decimal(str(nota_str)) 
+        nota_decimal = nota_str if isinstance(nota_str, Decimal) else Decimal(str(nota_str))
         # 2. Arredonda para 1 casa decimal
-        nota_formatada = nota_decimal.quantize(Decimal('0.0'), rounding=ROUND_HALF_UP)
+        nota_formatada = _round1(nota_decimal)
         # 3. Converte para string
         resultado_str = str(nota_formatada) 
 
@@ -3458,7 +3074,7 @@ def formatar_nota(nota_str, bold=False):
 
 
 
-@app.route('/boletim')
+@aluno_bp.route('/boletim')
 @require_login
 def boletim():
     """
@@ -3498,9 +3114,9 @@ def boletim():
 
     try:
         # 1. Chama a API Node.js para buscar o boletim do aluno logado
-        response = requests.get(
+        response = _API.get(
             f"{API_BASE_URL}/academico/boletim", 
-            headers={"Authorization": f"Bearer {token}"}
+            headers=_auth_headers(token)
         )
         response_data = response.json()
 
@@ -3521,13 +3137,17 @@ def boletim():
         feedback_cls = "error"
 
     # 3. Constrói o HTML da Tabela do Boletim
-    tabela_html = f'<h1>Meu Boletim</h1>'
-    tabela_html += f'<p class="{feedback_cls}" style="margin-bottom: 20px;">{escape(feedback)}</p>'
+    # Partes acumuladas em lista e unidas uma vez no final (sem recopiar o
+    # HTML já montado a cada linha, como faria tabela_html += ...)
+    tabela_partes = [
+        '<h1>Meu Boletim</h1>',
+        f'<p class="{feedback_cls}" style="margin-bottom: 20px;">{escape(feedback)}</p>',
+    ]
     
     if not boletim_data:
-        tabela_html += '<p style="color: grey;">Nenhuma nota encontrada para você.</p>'
+        tabela_partes.append('<p style="color: grey;">Nenhuma nota encontrada para você.</p>')
     else:
-        tabela_html += '''
+        tabela_partes.append('''
         <table class="boletim" style="width:100%; border-collapse: collapse;">
             <thead>
                 <tr style="background-color: #f0f0f0;">
@@ -3539,7 +3159,7 @@ def boletim():
                 </tr>
             </thead>
             <tbody>
-        '''
+        ''')
         for item in boletim_data:
             # Pega os dados REAIS da API
             disciplina = escape(item.get('nome_disciplina', 'Disciplina Desconhecida'))
@@ -3548,7 +3168,7 @@ def boletim():
             media_final = formatar_nota(item.get('media_final'), bold=True)
             faltas = item.get('total_faltas', 0)
             
-            tabela_html += f"""
+            tabela_partes.append(f"""
             <tr style="border-bottom: 1px solid #eee;">
                 <td style="padding: 10px; border: 1px solid #ddd;">{disciplina}</td>
                 <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">{nota_np1}</td>
@@ -3556,20 +3176,12 @@ def boletim():
                 <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">{media_final}</td>
                 <td style="padding: 10px; border: 1px solid #ddd; text-align: center;">{faltas}</td> 
             </tr>
-            """
-        tabela_html += '</tbody></table>'
+            """)
+        tabela_partes.append('</tbody></table>')
+    tabela_html = ''.join(tabela_partes)
     
     # Botões de navegação
-    botoes_nav = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('painel_aluno')}" class="btn-voltar">
-            ← Voltar para o Dashboard
-        </a>
-        <a href="{url_for('logout')}" class="btn-sair">
-            🚪 Sair
-        </a>
-    </div>
-    '''
+    botoes_nav = _barra_navegacao(_BOTAO_VOLTAR_ALUNO, _BOTAO_SAIR)
     
     conteudo_completo = f'{botoes_nav}{tabela_html}'
     
@@ -3581,6 +3193,23 @@ def boletim():
 # FUNÇÃO AUXILIAR: FORMATAR MARKDOWN PARA HTML
 # ----------------------------------------------------------------------
 
+# Instância única do conversor Markdown
+# markdown.markdown() monta todo o pipeline de extensões a cada chamada;
+# aqui ele é montado uma vez e reaproveitado (com reset() entre conversões).
+# Extensão 'extra' adiciona suporte para tabelas, fenced code blocks, etc.
+_MD = markdown.Markdown(
+    extensions=['extra'],  # Suporta tabelas, fenced code, abbr, attr_list, etc.
+    output_format='html5'
+)
+_MD_LOCK = threading.Lock()  # A instância guarda estado: uma conversão por vez
+
+@functools.lru_cache(maxsize=512)
+def render_md(texto):
+    """Converte markdown para HTML com a instância compartilhada (resultado em cache)."""
+    with _MD_LOCK:
+        _MD.reset()
+        return _MD.convert(texto)
+
 def formatar_markdown_para_html(texto):
     """
     Converte markdown para HTML usando a biblioteca markdown.
@@ -3590,13 +3219,8 @@ def formatar_markdown_para_html(texto):
         return ""
     
     try:
-        # Converte markdown para HTML
-        # Extensão 'extra' adiciona suporte para tabelas, fenced code blocks, etc.
-        html = markdown.markdown(
-            texto,
-            extensions=['extra'],  # Suporta tabelas, fenced code, abbr, attr_list, etc.
-            output_format='html5'
-        )
+        # Converte markdown para HTML (textos repetidos vêm do cache)
+        html = render_md(texto)
         
         # A biblioteca markdown já escapa o conteúdo automaticamente para segurança
         # Retorna o HTML gerado
@@ -3610,7 +3234,18 @@ def formatar_markdown_para_html(texto):
 # ROTA DE CHAT COM IA (GEMINI) PARA ALUNOS
 # ============================================================================
 
-@app.route('/aluno/ia', methods=['GET', 'POST'])
+@functools.lru_cache(maxsize=128)
+def _gerar_resposta_ia(prompt_completo):
+    """
+    Envia o prompt ao modelo Gemini compartilhado e retorna o texto da resposta.
+    
+    Prompts idênticos (mesma pergunta com o mesmo contexto de boletim) são
+    respondidos a partir do cache, sem nova chamada à API. Erros não são
+    cacheados: a exceção se propaga e a próxima tentativa chama a API.
+    """
+    return _GEMINI_MODEL.generate_content(prompt_completo).text
+
+@aluno_bp.route('/aluno/ia', methods=['GET', 'POST'])
 @require_login
 def chat_ia():
     """
@@ -3685,9 +3320,9 @@ def chat_ia():
                 boletim_contexto = ""
                 
                 try:
-                    response = requests.get(
+                    response = _API.get(
                         f"{API_BASE_URL}/academico/boletim",
-                        headers={"Authorization": f"Bearer {token}"},
+                        headers=_auth_headers(token),
                         timeout=5
                     )
                     if response.status_code == 200:
@@ -3704,19 +3339,6 @@ def chat_ia():
                 except:
                     pass  # Se não conseguir buscar boletim, continua sem contexto
                 
-                # Configura o modelo Gemini com fallback para compatibilidade
-                # Tenta usar o modelo mais recente disponível primeiro
-                # Se falhar, tenta modelos alternativos em ordem de preferência
-                try:
-                    model = genai.GenerativeModel('models/gemini-2.5-flash')
-                except:
-                    # Fallback 1: Tenta gemini-1.5-pro (mais poderoso)
-                    try:
-                        model = genai.GenerativeModel('gemini-1.5-pro')
-                    except:
-                        # Fallback 2: Usa gemini-1.5-flash (mais rápido e compatível)
-                        model = genai.GenerativeModel('gemini-1.5-flash')
-                
                 # Monta o prompt completo com contexto acadêmico do aluno
                 # O contexto inclui notas, médias e faltas para personalizar a resposta
                 prompt_completo = f"""Você é um assistente acadêmico inteligente e prestativo para alunos. 
@@ -3730,10 +3352,9 @@ Pergunta do aluno: {mensagem_usuario}
 
 Resposta:"""
                 
-                # Gera resposta da IA usando o modelo configurado
+                # Gera resposta da IA usando o modelo compartilhado
                 # O modelo processa o prompt e retorna uma resposta contextualizada
-                response_ia = model.generate_content(prompt_completo)
-                resposta_ia = response_ia.text  # Extrai o texto da resposta
+                resposta_ia = _gerar_resposta_ia(prompt_completo)
                 
             except Exception as e:
                 erro = f"Erro ao processar sua mensagem: {str(e)}"
@@ -3958,16 +3579,7 @@ Resposta:"""
         """
     
     # Botões de navegação
-    botoes_nav = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('painel_aluno')}" class="btn-voltar">
-            ← Voltar para o Dashboard
-        </a>
-        <a href="{url_for('logout')}" class="btn-sair">
-             Sair
-        </a>
-    </div>
-    '''
+    botoes_nav = _barra_navegacao(_BOTAO_VOLTAR_ALUNO, _BOTAO_SAIR)
     
     chat_html = f"""
     {botoes_nav}
@@ -4013,7 +3625,7 @@ Resposta:"""
 # ROTA PRINCIPAL DO PROFESSOR
 # ----------------------------------------------------------------------
 
-@app.route('/painel/professor', methods=['GET', 'POST'])
+@professor_bp.route('/painel/professor', methods=['GET', 'POST'])
 @require_login
 def painel_professor():
     """
@@ -4041,7 +3653,7 @@ def painel_professor():
     
     # Proteção (redundante com @require_login, mas boa prática)
     if user_type not in ['professor', 'admin'] or not token:
-        return redirect(url_for('logout'))
+        return redirect(url_for('auth.logout'))
 
     turmas = []
     message = request.args.get('msg') # Mensagem vinda de um redirect (GET)
@@ -4052,9 +3664,9 @@ def painel_professor():
     # ----------------------------------------------------
     try:
         # Chama a API Node.js (rota correta: /professor/turmas)
-        response_turmas = requests.get(
+        response_turmas = _API.get(
             f"{API_BASE_URL}/academico/professor/turmas", 
-            headers={"Authorization": f"Bearer {token}"}
+            headers=_auth_headers(token)
         )
         response_data_turmas = response_turmas.json()
         
@@ -4079,19 +3691,13 @@ def painel_professor():
     conteudo_professor_html = render_professor_content(user_type, turmas, message, message_class)
     
     # Adiciona botão de sair no topo
-    btn_sair = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('logout')}" class="btn-sair">
-             Sair
-        </a>
-    </div>
-    '''
+    btn_sair = _barra_navegacao(_BOTAO_SAIR)
     
     conteudo_completo = f'{btn_sair}{conteudo_professor_html}'
     
     return render_base(conteudo_completo, "Painel do Professor")
 
-@app.route('/gerenciar/turma/<int:turma_id>/<int:disciplina_id>')
+@professor_bp.route('/gerenciar/turma/<int:turma_id>/<int:disciplina_id>')
 @require_login
 def gerenciar_turma(turma_id, disciplina_id):
     """Interface de gestão de notas e faltas para uma turma/disciplina específica."""
@@ -4100,15 +3706,15 @@ def gerenciar_turma(turma_id, disciplina_id):
     
     # Proteção adicional no frontend
     if user_type not in ['professor', 'admin'] or not token:
-        return redirect(url_for('logout'))
+        return redirect(url_for('auth.logout'))
 
     alunos = []
     
     try:
         # 1. Chama a nova rota da API Node.js
-        response = requests.get(
+        response = _API.get(
             f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas/{disciplina_id}/alunos", 
-            headers={"Authorization": f"Bearer {token}"}
+            headers=_auth_headers(token)
         )
         response_data = response.json()
 
@@ -4127,19 +3733,13 @@ def gerenciar_turma(turma_id, disciplina_id):
     tabela_alunos_html = build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback)
     
     # Adiciona botão de sair no topo
-    btn_sair = f'''
-    <div class="nav-buttons-container">
-        <a href="{url_for('logout')}" class="btn-sair">
-             Sair
-        </a>
-    </div>
-    '''
+    btn_sair = _barra_navegacao(_BOTAO_SAIR)
     
     conteudo_completo = f'{btn_sair}{tabela_alunos_html}'
     
     return render_base(conteudo_completo, f"Gerenciar Turma {turma_id}")
 
-@app.route('/lancar_nota_form', methods=['POST'])
+@professor_bp.route('/lancar_nota_form', methods=['POST'])
 @require_login
 def lancar_nota_form():
     """Processa o formulário de lançamento de nota e chama a API Node.js."""
@@ -4150,7 +3750,7 @@ def lancar_nota_form():
     # Proteção: Apenas Professor ou Admin pode lançar nota
     if user_type not in ['professor', 'admin'] or not token:
         # Idealmente, redireciona para login com mensagem de erro
-        return redirect(url_for('logout')) 
+        return redirect(url_for('auth.logout')) 
 
     # 1. Obter dados do formulário
     aluno_id = request.form.get('aluno_id')
@@ -4160,463 +3760,126 @@ def lancar_nota_form():
     turma_id = request.form.get('turma_id')
 
     feedback_msg = "Dados inválidos."
-    feedback_cls = "error"
-
-    # 2. Validar e tentar chamar a API
-    if aluno_id and disciplina_id and valor_nota and turma_id:
-        try:
-            payload = {
-                "aluno_id": int(aluno_id),
-                "disciplina_id": int(disciplina_id),
-                "valor_nota": float(valor_nota),
-                "tipo_avaliacao": tipo_avaliacao #  Envia o tipo para a API
-            }
-            
-            # Chama a API Node.js /academico/notas
-            response = requests.post(
-                f"{API_BASE_URL}/academico/notas",
-                json=payload,
-                headers={"Authorization": f"Bearer {token}"}
-            )
-
-            if response.status_code == 201:
-                feedback_msg = f"Nota ({tipo_avaliacao}) lançada/atualizada!"
-                feedback_cls = "success"
-            else:
-                # Tenta pegar a mensagem de erro da API (ex: nota duplicada, aluno não matriculado)
-                try:
-                    feedback_msg = response.json().get("message", f"Erro na API ({response.status_code})")
-                except Exception:
-                     feedback_msg = f"Erro desconhecido na API ({response.status_code})"
-                feedback_cls = "error"
-        
-        except ValueError:
-            feedback_msg = "Erro: IDs ou Nota devem ser números válidos."
-            feedback_cls = "error"
-        except requests.exceptions.RequestException:
-            feedback_msg = "ERRO DE CONEXÃO com a API Node.js."
-            feedback_cls = "error"
-    
-    # 3. Redireciona DE VOLTA para a tela de gerenciamento com a mensagem
-    return redirect(url_for('gerenciar_turma', 
-                            turma_id=turma_id, 
-                            disciplina_id=disciplina_id, 
-                            msg=feedback_msg, 
-                            cls=feedback_cls))
-
-@app.route('/marcar_presenca_form', methods=['POST'])
-@require_login
-def marcar_presenca_form():
-    """Processa o formulário de marcar presença e chama a API Node.js."""
-    user_type = session.get(SESSION_KEY_TYPE)
-    token = session.get(SESSION_KEY_TOKEN)
-    
-    if user_type not in ['professor', 'admin'] or not token:
-        return redirect(url_for('logout'))
-
-    # 1. Obter dados do formulário
-    matricula_id = request.form.get('matricula_id')
-    status = request.form.get('status')
-    turma_id = request.form.get('turma_id')
-    disciplina_id = request.form.get('disciplina_id')
-    
-    feedback_msg = "Dados inválidos para marcar presença."
-    feedback_cls = "error"
-
-    # 2. Validar e chamar a API /academico/presenca
-    if matricula_id and status and turma_id and disciplina_id:
-        try:
-            payload = {"matricula_id": int(matricula_id), "status": status}
-            
-            response = requests.post(
-                f"{API_BASE_URL}/academico/presenca",
-                json=payload,
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            response_data = response.json() # Tenta ler a resposta
-
-            if response.status_code == 201:
-                feedback_msg = f"Presença ({status}) marcada!"
-                feedback_cls = "success"
-            elif response.status_code == 409: # Conflito (já marcado hoje)
-                 feedback_msg = response_data.get("message", "Já marcado hoje.")
-                 feedback_cls = "warning" 
-            else:
-                feedback_msg = response_data.get("message", "Erro na API.")
-                feedback_cls = "error"
-                
-        except ValueError:
-             feedback_msg = "Erro: ID de Matrícula inválido."
-             feedback_cls = "error"
-        except requests.exceptions.RequestException:
-            feedback_msg = "ERRO DE CONEXÃO com a API Node.js."
-            feedback_cls = "error"
-            
-    # 3. Redireciona de volta para a tela de gerenciamento com feedback
-    return redirect(url_for('gerenciar_turma', 
-                            turma_id=turma_id, 
-                            disciplina_id=disciplina_id, 
-                            msg=feedback_msg, 
-                            cls=feedback_cls))
-
-
-# Função auxiliar (adicionar ao main.py)
-
-# 02_sistema_python/main.py
-
-def build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback):
-    """Constrói a tabela de alunos com formulários de ação (Nota/Presença)."""
-    from flask import url_for # Garante que url_for funciona
-    
-    # Buscar informações da turma e disciplina para exibir no header
-    # Por enquanto, vamos usar apenas os IDs, mas poderia buscar os nomes da API
-    gestao_css = """
-    <style>
-        .gestao-header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 16px;
-            margin-bottom: 30px;
-            box-shadow: 0 8px 20px rgba(102, 126, 234, 0.3);
-        }
-        .gestao-header h1 {
-            margin: 0 0 15px 0;
-            font-size: 2rem;
-            font-weight: 700;
-        }
-        .gestao-info {
-            display: flex;
-            gap: 30px;
-            margin-top: 15px;
-            flex-wrap: wrap;
-        }
-        .info-badge {
-            background: rgba(255, 255, 255, 0.15);
-            padding: 10px 20px;
-            border-radius: 8px;
-            backdrop-filter: blur(10px);
-        }
-        .info-badge strong {
-            display: block;
-            font-size: 1.2rem;
-            margin-bottom: 5px;
-        }
-        .info-badge span {
-            font-size: 0.9rem;
-            opacity: 0.9;
-        }
-        .action-buttons-top {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 25px;
-            flex-wrap: wrap;
-        }
-        .btn-nav {
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            padding: 12px 20px;
-            border-radius: 10px;
-            text-decoration: none;
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-        }
-        .btn-nav.secondary {
-            background: #6c757d;
-            color: white;
-        }
-        .btn-nav.secondary:hover {
-            background: #5a6268;
-            transform: translateY(-2px);
-            box-shadow: 0 6px 15px rgba(0,0,0,0.15);
-        }
-        .btn-nav.primary {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        .btn-nav.primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 15px rgba(102, 126, 234, 0.4);
-        }
-        .feedback-message {
-            padding: 15px 20px;
-            border-radius: 10px;
-            margin-bottom: 25px;
-            background: #d4edda;
-            color: #155724;
-            border-left: 4px solid #28a745;
-        }
-        .feedback-message.error {
-            background: #f8d7da;
-            color: #721c24;
-            border-left-color: #dc3545;
-        }
-        .gestao-table-container {
-            background: #fff;
-            border-radius: 16px;
-            padding: 25px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-            overflow-x: auto;
-        }
-        .gestao-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 10px;
-        }
-        .gestao-table thead {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        .gestao-table th {
-            padding: 15px 12px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 0.9rem;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .gestao-table th.text-center {
-            text-align: center;
-        }
-        .gestao-table tbody tr {
-            border-bottom: 1px solid #e0e0e0;
-            transition: background-color 0.2s;
-        }
-        .gestao-table tbody tr:hover {
-            background-color: #f8f9fa;
-        }
-        .gestao-table tbody tr:nth-child(even) {
-            background-color: #fafafa;
-        }
-        .gestao-table tbody tr:nth-child(even):hover {
-            background-color: #f0f0f0;
-        }
-        .gestao-table td {
-            padding: 15px 12px;
-            color: #333;
-            font-size: 0.95rem;
-        }
-        .gestao-table td.text-center {
-            text-align: center;
-        }
-        .nota-badge {
-            display: inline-block;
-            padding: 6px 12px;
-            border-radius: 6px;
-            font-weight: 600;
-            font-size: 0.9rem;
-        }
-        .nota-badge.presente {
-            background: #d4edda;
-            color: #155724;
-        }
-        .nota-badge.ausente {
-            background: #fff3cd;
-            color: #856404;
-        }
-        .nota-badge.empty {
-            background: #f8d7da;
-            color: #721c24;
-        }
-        .media-badge {
-            display: inline-block;
-            padding: 8px 14px;
-            border-radius: 8px;
-            font-weight: 700;
-            font-size: 1rem;
-        }
-        .media-badge.aprovado {
-            background: #d4edda;
-            color: #155724;
-        }
-        .media-badge.recuperacao {
-            background: #fff3cd;
-            color: #856404;
-        }
-        .media-badge.reprovado {
-            background: #f8d7da;
-            color: #721c24;
-        }
-        .form-nota {
-            display: flex;
-            gap: 8px;
-            align-items: center;
-            flex-wrap: wrap;
-        }
-        .form-nota input[type="number"] {
-            width: 80px;
-            padding: 8px;
-            border: 2px solid #ddd;
-            border-radius: 6px;
-            font-size: 0.95rem;
-            transition: border-color 0.3s;
-        }
-        .form-nota input[type="number"]:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        .form-nota select {
-            padding: 8px 12px;
-            border: 2px solid #ddd;
-            border-radius: 6px;
-            font-size: 0.95rem;
-            background: white;
-            cursor: pointer;
-            transition: border-color 0.3s;
-        }
-        .form-nota select:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        .btn-lancar {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            padding: 8px 16px;
-            border-radius: 6px;
-            font-weight: 600;
-            font-size: 0.9rem;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 2px 6px rgba(102, 126, 234, 0.3);
-        }
-        .btn-lancar:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 4px 10px rgba(102, 126, 234, 0.4);
-        }
-        .btn-presenca {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            width: 40px;
-            height: 40px;
-            border: none;
-            border-radius: 8px;
-            font-weight: 700;
-            font-size: 0.9rem;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-        }
-        .btn-presenca.presente {
-            background: #28a745;
-            color: white;
-        }
-        .btn-presenca.presente:hover {
-            background: #218838;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 10px rgba(40, 167, 69, 0.4);
-        }
-        .btn-presenca.ausente {
-            background: #dc3545;
-            color: white;
-        }
-        .btn-presenca.ausente:hover {
-            background: #c82333;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 10px rgba(220, 53, 69, 0.4);
-        }
-        .presenca-actions {
-            display: flex;
-            gap: 8px;
-            justify-content: center;
-            align-items: center;
-        }
-        .empty-state {
-            text-align: center;
-            padding: 60px 20px;
-            background: #f8f9fa;
-            border-radius: 16px;
-            color: #666;
-            margin-top: 20px;
-        }
-        .empty-state h3 {
-            margin: 0 0 10px 0;
-            color: #333;
-        }
-        @media (max-width: 768px) {
-            .gestao-table-container {
-                padding: 15px;
-            }
-            .gestao-table {
-                font-size: 0.85rem;
-            }
-            .gestao-table th,
-            .gestao-table td {
-                padding: 10px 8px;
-            }
-            .form-nota {
-                flex-direction: column;
-                align-items: stretch;
-            }
-            .form-nota input,
-            .form-nota select,
-            .btn-lancar {
-                width: 100%;
+    feedback_cls = "error"
+
+    # 2. Validar e tentar chamar a API
+    if aluno_id and disciplina_id and valor_nota and turma_id:
+        try:
+            payload = {
+                "aluno_id": int(aluno_id),
+                "disciplina_id": int(disciplina_id),
+                "valor_nota": float(valor_nota),
+                "tipo_avaliacao": tipo_avaliacao #  Envia o tipo para a API
             }
-        }
-    </style>
-    """
-    
-    # Header com informações
-    header_html = f"""
-    <div class="gestao-header">
-        <h1>Gestão de Turma/Disciplina</h1>
-        <div class="gestao-info">
-            <div class="info-badge">
-                <strong>Turma</strong>
-                <span>ID: {turma_id}</span>
-            </div>
-            <div class="info-badge">
-                <strong>Disciplina</strong>
-                <span>ID: {disciplina_id}</span>
-            </div>
-            <div class="info-badge">
-                <strong>Total de Alunos</strong>
-                <span>{len(alunos) if alunos else 0}</span>
-            </div>
-        </div>
-    </div>
-    """
+            
+            # Chama a API Node.js /academico/notas
+            response = _API.post(
+                f"{API_BASE_URL}/academico/notas",
+                json=payload,
+                headers=_auth_headers(token)
+            )
+
+            if response.status_code == 201:
+                feedback_msg = f"Nota ({tipo_avaliacao}) lançada/atualizada!"
+                feedback_cls = "success"
+            else:
+                # Tenta pegar a mensagem de erro da API (ex: nota duplicada, aluno não matriculado)
+                try:
+                    feedback_msg = response.json().get("message", f"Erro na API ({response.status_code})")
+                except Exception:
+                     feedback_msg = f"Erro desconhecido na API ({response.status_code})"
+                feedback_cls = "error"
+        
+        except ValueError:
+            feedback_msg = "Erro: IDs ou Nota devem ser números válidos."
+            feedback_cls = "error"
+        except requests.exceptions.RequestException:
+            feedback_msg = "ERRO DE CONEXÃO com a API Node.js."
+            feedback_cls = "error"
     
-    # Feedback message
-    feedback_html = ''
-    if feedback:
-        feedback_cls = 'error' if 'ERRO' in feedback.upper() or 'erro' in feedback.lower() else ''
-        feedback_html = f'<div class="feedback-message {feedback_cls}">{escape(feedback)}</div>'
+    # 3. Redireciona DE VOLTA para a tela de gerenciamento com a mensagem
+    return redirect(url_for('professor.gerenciar_turma', 
+                            turma_id=turma_id, 
+                            disciplina_id=disciplina_id, 
+                            msg=feedback_msg, 
+                            cls=feedback_cls))
+
+@professor_bp.route('/marcar_presenca_form', methods=['POST'])
+@require_login
+def marcar_presenca_form():
+    """Processa o formulário de marcar presença e chama a API Node.js."""
+    user_type = session.get(SESSION_KEY_TYPE)
+    token = session.get(SESSION_KEY_TOKEN)
     
-    # Botões de navegação
-    nav_buttons = f"""
-    <div class="action-buttons-top">
-        <a href="{url_for('painel_professor')}" class="btn-nav secondary">
-            &laquo; Voltar para Minhas Turmas
-        </a>
-        <a href="{url_for('relatorio_desempenho', turma_id=turma_id, disciplina_id=disciplina_id)}" class="btn-nav primary">
-            Ver Relatório de Desempenho (C)
-        </a>
-    </div>
-    """
+    if user_type not in ['professor', 'admin'] or not token:
+        return redirect(url_for('auth.logout'))
+
+    # 1. Obter dados do formulário
+    matricula_id = request.form.get('matricula_id')
+    status = request.form.get('status')
+    turma_id = request.form.get('turma_id')
+    disciplina_id = request.form.get('disciplina_id')
     
-    # Tabela de alunos
-    if not alunos:
-        empty_state_html = """
+    feedback_msg = "Dados inválidos para marcar presença."
+    feedback_cls = "error"
+
+    # 2. Validar e chamar a API /academico/presenca
+    if matricula_id and status and turma_id and disciplina_id:
+        try:
+            payload = {"matricula_id": int(matricula_id), "status": status}
+            
+            response = _API.post(
+                f"{API_BASE_URL}/academico/presenca",
+                json=payload,
+                headers=_auth_headers(token)
+            )
+            response_data = response.json() # Tenta ler a resposta
+
+            if response.status_code == 201:
+                feedback_msg = f"Presença ({status}) marcada!"
+                feedback_cls = "success"
+            elif response.status_code == 409: # Conflito (já marcado hoje)
+                 feedback_msg = response_data.get("message", "Já marcado hoje.")
+                 feedback_cls = "warning" 
+            else:
+                feedback_msg = response_data.get("message", "Erro na API.")
+                feedback_cls = "error"
+                
+        except ValueError:
+             feedback_msg = "Erro: ID de Matrícula inválido."
+             feedback_cls = "error"
+        except requests.exceptions.RequestException:
+            feedback_msg = "ERRO DE CONEXÃO com a API Node.js."
+            feedback_cls = "error"
+            
+    # 3. Redireciona de volta para a tela de gerenciamento com feedback
+    return redirect(url_for('professor.gerenciar_turma', 
+                            turma_id=turma_id, 
+                            disciplina_id=disciplina_id, 
+                            msg=feedback_msg, 
+                            cls=feedback_cls))
+
+
+# Função auxiliar (adicionar ao main.py)
+
+# 02_sistema_python/main.py
+
+# CSS (link para /static/css/gestao.css), estado vazio e cabeçalho da tabela
+# de gestão de turma (constantes do módulo: iguais em toda requisição)
+_GESTAO_CSS = '<link rel="stylesheet" href="/static/css/gestao.css?v=1">'
+
+_GESTAO_EMPTY_HTML = Markup("""
         <div class="empty-state">
             <h3>Nenhum aluno matriculado</h3>
             <p>Nenhum aluno foi encontrado para esta turma e disciplina.</p>
         </div>
-        """
-        return f"""
-        {gestao_css}
-        {header_html}
-        {feedback_html}
-        {nav_buttons}
-        {empty_state_html}
-        """
-    
-    # Construir tabela
-    table_html = """
+        """)
+
+# Tabela de alunos da gestão de turma (template Jinja, compilado uma vez).
+# Cada linha chega pronta de build_alunos_table_gestao como tupla
+# (aluno_id, nome_completo, badge_np1, badge_np2, badge_media, matricula_id),
+# onde cada badge é um par (classe CSS, texto); o autoescape cuida dos nomes.
+_TEMPLATES_INTERNOS['gestao_tabela.html'] = """
     <div class="gestao-table-container">
         <table class="gestao-table">
             <thead>
@@ -4631,72 +3894,18 @@ def build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback):
                 </tr>
             </thead>
             <tbody>
-    """
-    
-    for aluno in alunos:
-        aluno_id = aluno.get('aluno_id', 'N/A')
-        nome = escape(aluno.get('nome', ''))
-        sobrenome = escape(aluno.get('sobrenome', ''))
-        nome_completo = f"{nome} {sobrenome}".strip()
-        
-        nota_np1 = aluno.get('nota_np1')
-        nota_np2 = aluno.get('nota_np2')
-        nota_exame = aluno.get('nota_exame')
-        media_final = aluno.get('media_final')
-        
-        matricula_id = aluno.get('matricula_id', '')
-        
-        # Formata notas com badges
-        def formatar_nota_badge(nota):
-            if nota is None:
-                return '<span class="nota-badge empty">N/D</span>'
-            try:
-                nota_float = float(nota)
-                return f'<span class="nota-badge presente">{nota_float:.1f}</span>'
-            except:
-                return f'<span class="nota-badge empty">{nota}</span>'
-        
-        # Formata média com badge colorido
-        # Lógica: Se média >= 7: aprovado direto
-        #         Se média >= 5 e existe exame: aprovado após exame
-        #         Se média >= 5 e não existe exame: recuperação (precisa fazer exame)
-        #         Se média < 5: reprovado
-        def formatar_media_badge(media, tem_exame=False):
-            if media is None:
-                return '<span class="media-badge empty">N/D</span>'
-            try:
-                media_float = float(media)
-                if media_float >= 7:
-                    classe = 'aprovado'
-                    texto = f'{media_float:.1f}'
-                elif media_float >= 5:
-                    if tem_exame:
-                        # Aprovado após exame (média >= 5 com exame)
-                        classe = 'aprovado'
-                        texto = f'{media_float:.1f}'
-                    else:
-                        # Precisa fazer exame (média entre 5 e 7, sem exame ainda)
-                        classe = 'recuperacao'
-                        texto = f'{media_float:.1f}'
-                else:
-                    classe = 'reprovado'
-                    texto = f'{media_float:.1f}'
-                return f'<span class="media-badge {classe}">{texto}</span>'
-            except:
-                return f'<span class="media-badge empty">{media}</span>'
-        
-        nota_np1_html = formatar_nota_badge(nota_np1)
-        nota_np2_html = formatar_nota_badge(nota_np2)
-        # Verifica se existe nota de exame
-        tem_exame = nota_exame is not None
-        media_html = formatar_media_badge(media_final, tem_exame=tem_exame)
-        
-        # Formulário de lançar nota
-        form_nota_html = f"""
-        <form action="{url_for('lancar_nota_form')}" method="POST" class="form-nota">
-            <input type="hidden" name="aluno_id" value="{aluno_id}">
-            <input type="hidden" name="disciplina_id" value="{disciplina_id}">
-            <input type="hidden" name="turma_id" value="{turma_id}">
+            {%- for aluno_id, nome_completo, np1, np2, media, matricula_id in linhas %}
+            <tr>
+                <td><strong>{{ aluno_id }}</strong></td>
+                <td><strong>{{ nome_completo }}</strong></td>
+                <td class="text-center"><span class="nota-badge {{ np1[0] }}">{{ np1[1] }}</span></td>
+                <td class="text-center"><span class="nota-badge {{ np2[0] }}">{{ np2[1] }}</span></td>
+                <td class="text-center"><span class="media-badge {{ media[0] }}">{{ media[1] }}</span></td>
+                <td>
+        <form action="{{ lancar_nota_url }}" method="POST" class="form-nota">
+            <input type="hidden" name="aluno_id" value="{{ aluno_id }}">
+            <input type="hidden" name="disciplina_id" value="{{ disciplina_id }}">
+            <input type="hidden" name="turma_id" value="{{ turma_id }}">
             <input type="number" 
                    step="0.1" 
                    min="0" 
@@ -4711,57 +3920,157 @@ def build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback):
             </select>
             <button type="submit" class="btn-lancar">Lançar</button>
         </form>
-        """
-        
-        # Botões de presença
-        presenca_html = f"""
+                </td>
+                <td class="text-center">
         <div class="presenca-actions">
-            <form action="{url_for('marcar_presenca_form')}" method="POST" style="margin: 0;">
-                <input type="hidden" name="matricula_id" value="{matricula_id}">
+            <form action="{{ presenca_url }}" method="POST" style="margin: 0;">
+                <input type="hidden" name="matricula_id" value="{{ matricula_id }}">
                 <input type="hidden" name="status" value="presente">
-                <input type="hidden" name="turma_id" value="{turma_id}">
-                <input type="hidden" name="disciplina_id" value="{disciplina_id}">
+                <input type="hidden" name="turma_id" value="{{ turma_id }}">
+                <input type="hidden" name="disciplina_id" value="{{ disciplina_id }}">
                 <button type="submit" class="btn-presenca presente" title="Marcar Presença">P</button>
             </form>
-            <form action="{url_for('marcar_presenca_form')}" method="POST" style="margin: 0;">
-                <input type="hidden" name="matricula_id" value="{matricula_id}">
+            <form action="{{ presenca_url }}" method="POST" style="margin: 0;">
+                <input type="hidden" name="matricula_id" value="{{ matricula_id }}">
                 <input type="hidden" name="status" value="ausente">
-                <input type="hidden" name="turma_id" value="{turma_id}">
-                <input type="hidden" name="disciplina_id" value="{disciplina_id}">
+                <input type="hidden" name="turma_id" value="{{ turma_id }}">
+                <input type="hidden" name="disciplina_id" value="{{ disciplina_id }}">
                 <button type="submit" class="btn-presenca ausente" title="Marcar Falta">F</button>
             </form>
         </div>
-        """
-        
-        table_html += f"""
-            <tr>
-                <td><strong>{aluno_id}</strong></td>
-                <td><strong>{nome_completo}</strong></td>
-                <td class="text-center">{nota_np1_html}</td>
-                <td class="text-center">{nota_np2_html}</td>
-                <td class="text-center">{media_html}</td>
-                <td>{form_nota_html}</td>
-                <td class="text-center">{presenca_html}</td>
+                </td>
             </tr>
-        """
-    
-    table_html += """
+            {%- endfor %}
             </tbody>
         </table>
     </div>
     """
+_GESTAO_TABELA_TPL = app.jinja_env.get_template('gestao_tabela.html')
+
+def _badge_nota(nota):
+    """Classe CSS e texto do badge de uma nota (NP1/NP2)."""
+    if nota is None:
+        return ('empty', 'N/D')
+    try:
+        return ('presente', f'{float(nota):.1f}')
+    except (TypeError, ValueError):
+        return ('empty', nota)
+
+def _badge_media(media, tem_exame=False):
+    """
+    Classe CSS e texto do badge da média final.
+    
+    Lógica: Se média >= 7: aprovado direto
+            Se média >= 5 e existe exame: aprovado após exame
+            Se média >= 5 e não existe exame: recuperação (precisa fazer exame)
+            Se média < 5: reprovado
+    """
+    if media is None:
+        return ('empty', 'N/D')
+    try:
+        media_float = float(media)
+    except (TypeError, ValueError):
+        return ('empty', media)
+    if media_float >= 7 or (media_float >= 5 and tem_exame):
+        classe = 'aprovado'
+    elif media_float >= 5:
+        classe = 'recuperacao'
+    else:
+        classe = 'reprovado'
+    return (classe, f'{media_float:.1f}')
+
+
+def build_alunos_table_gestao(turma_id, disciplina_id, alunos, feedback):
+    """Constrói a tabela de alunos com formulários de ação (Nota/Presença)."""
+    from flask import url_for # Garante que url_for funciona
+    
+    # Buscar informações da turma e disciplina para exibir no header
+    # Por enquanto, vamos usar apenas os IDs, mas poderia buscar os nomes da API
+    
+    # Header com informações
+    header_html = f"""
+    <div class="gestao-header">
+        <h1>Gestão de Turma/Disciplina</h1>
+        <div class="gestao-info">
+            <div class="info-badge">
+                <strong>Turma</strong>
+                <span>ID: {turma_id}</span>
+            </div>
+            <div class="info-badge">
+                <strong>Disciplina</strong>
+                <span>ID: {disciplina_id}</span>
+            </div>
+            <div class="info-badge">
+                <strong>Total de Alunos</strong>
+                <span>{len(alunos) if alunos else 0}</span>
+            </div>
+        </div>
+    </div>
+    """
+    
+    # Feedback message
+    feedback_html = ''
+    if feedback:
+        feedback_cls = 'error' if 'ERRO' in feedback.upper() or 'erro' in feedback.lower() else ''
+        feedback_html = f'<div class="feedback-message {feedback_cls}">{escape(feedback)}</div>'
+    
+    # Botões de navegação
+    nav_buttons = f"""
+    <div class="action-buttons-top">
+        <a href="{_url('professor.painel_professor')}" class="btn-nav secondary">
+            &laquo; Voltar para Minhas Turmas
+        </a>
+        <a href="{url_for('professor.relatorio_desempenho', turma_id=turma_id, disciplina_id=disciplina_id)}" class="btn-nav primary">
+            Ver Relatório de Desempenho (C)
+        </a>
+    </div>
+    """
+    
+    # Tabela de alunos
+    if not alunos:
+        empty_state_html = _GESTAO_EMPTY_HTML
+        return f"""
+        {_GESTAO_CSS}
+        {header_html}
+        {feedback_html}
+        {nav_buttons}
+        {empty_state_html}
+        """
+    
+    # Construir tabela: os dados de cada aluno são extraídos em tuplas e o
+    # HTML das linhas é gerado pelo template compilado (_GESTAO_TABELA_TPL)
+    linhas = [
+        (
+            aluno.get('aluno_id', 'N/A'),
+            f"{aluno.get('nome', '')} {aluno.get('sobrenome', '')}".strip(),
+            _badge_nota(aluno.get('nota_np1')),
+            _badge_nota(aluno.get('nota_np2')),
+            # A situação da média depende de existir nota de exame
+            _badge_media(aluno.get('media_final'), tem_exame=aluno.get('nota_exame') is not None),
+            aluno.get('matricula_id', ''),
+        )
+        for aluno in alunos
+    ]
+    table_html = _GESTAO_TABELA_TPL.render(
+        linhas=linhas,
+        turma_id=turma_id,
+        disciplina_id=disciplina_id,
+        lancar_nota_url=_url('professor.lancar_nota_form'),
+        presenca_url=_url('professor.marcar_presenca_form'),
+    )
     
     return f"""
-    {gestao_css}
+    {_GESTAO_CSS}
     {header_html}
     {feedback_html}
     {nav_buttons}
     {table_html}
     """
 
-@app.route('/relatorio/desempenho/<int:turma_id>/<int:disciplina_id>')
+@professor_bp.route('/relatorio/desempenho/<int:turma_id>/<int:disciplina_id>')
 @require_login # Garante que está logado
 def relatorio_desempenho(turma_id, disciplina_id):
+    lib_c, DesempenhoAluno = _load_algorithms()
     if lib_c is None: # Verifica se a DLL carregou
         return render_base("<h1>Erro</h1><p>Módulo de algoritmos C não foi carregado.</p>", "Erro")
         
@@ -4770,16 +4079,16 @@ def relatorio_desempenho(turma_id, disciplina_id):
     # 1. Busca os dados dos alunos na API Node.js
     alunos_data = []
     try:
-        response = requests.get(
+        response = _API.get(
             f"{API_BASE_URL}/academico/turmas/{turma_id}/disciplinas/{disciplina_id}/alunos", 
-            headers={"Authorization": f"Bearer {token}"}
+            headers=_auth_headers(token)
         )
         if response.status_code == 200:
             alunos_data = response.json().get('alunos', [])
         else:
             raise Exception(f"Erro da API: {response.json().get('message')}")
     except Exception as e:
-        return render_base(f"<h1>Erro ao buscar dados</h1><p>{e}</p>", "Erro")
+        return render_base(f"<h1>Erro ao buscar dados</h1><p>{escape(e)}</p>", "Erro")
 
     # ... (Prepara os dados para o C, filtrando alunos com média) ...
     desempenhos = []
@@ -4790,12 +4099,8 @@ def relatorio_desempenho(turma_id, disciplina_id):
             try:
                 media_float = float(media_aluno_str)
                 medias_validas.append(Decimal(media_aluno_str)) 
-                desempenhos.append(
-                    DesempenhoAluno(
-                        id_aluno=int(aluno['aluno_id']), 
-                        media_final=media_float
-                    )
-                )
+                # Par (id_aluno, media_final) no mesmo formato da struct C
+                desempenhos.append((int(aluno['aluno_id']), media_float))
             except (ValueError, TypeError):
                 continue
 
@@ -4835,7 +4140,7 @@ def relatorio_desempenho(turma_id, disciplina_id):
             <h3>Nenhum aluno com média lançada</h3>
             <p>Não há dados suficientes para gerar o ranking de desempenho.</p>
             <p style="margin-top: 15px;">
-                <a href="{url_for('gerenciar_turma', turma_id=turma_id, disciplina_id=disciplina_id)}" 
+                <a href="{url_for('professor.gerenciar_turma', turma_id=turma_id, disciplina_id=disciplina_id)}" 
                    style="display: inline-block; padding: 10px 20px; background: #667eea; color: white; text-decoration: none; border-radius: 8px; margin-top: 15px;">
                    &laquo; Voltar para Gestão
                 </a>
@@ -4847,15 +4152,25 @@ def relatorio_desempenho(turma_id, disciplina_id):
     # Calcula a média da turma (como fizemos antes)
     media_da_turma = Decimal('0.0')
     if medias_validas:
-        media_da_turma = sum(medias_validas) / Decimal(len(medias_validas))
-    media_da_turma_str = f"{float(media_da_turma):.2f}"
+        media_da_turma = sum(medias_validas) / len(medias_validas)
+    media_da_turma_str = str(_round2(media_da_turma))
 
     # 2. Chama a função C para ordenar
     count = len(desempenhos)
-    ArrayType = DesempenhoAluno * count
-    array_c = ArrayType(*desempenhos)
-    
-    lib_c.ordenar_por_desempenho(array_c, count) #  CHAMADA CRÍTICA AO C
+    if np is not None:
+        # Com NumPy: o array estruturado (mesmo layout da struct C) é preenchido
+        # em bloco, sem criar um objeto DesempenhoAluno por aluno
+        array_np = np.array(desempenhos, dtype=_DESEMPENHO_DTYPE)
+        lib_c.ordenar_por_desempenho(
+            array_np.ctypes.data_as(ctypes.POINTER(DesempenhoAluno)), count
+        ) #  CHAMADA CRÍTICA AO C
+        # Visão ctypes sobre o mesmo buffer (sem cópia) para o restante da função
+        array_c = (DesempenhoAluno * count).from_buffer(array_np)
+    else:
+        ArrayType = DesempenhoAluno * count
+        array_c = ArrayType(*desempenhos)
+        
+        lib_c.ordenar_por_desempenho(array_c, count) #  CHAMADA CRÍTICA AO C
     
     # Buscar nomes dos alunos para exibir no ranking
     alunos_dict = {aluno.get('aluno_id'): aluno for aluno in alunos_data}
@@ -5138,7 +4453,7 @@ def relatorio_desempenho(turma_id, disciplina_id):
     """
     
     # Tabela de ranking
-    ranking_html = """
+    ranking_partes = ["""
     <div class="ranking-section">
         <h2>Ranking de Desempenho</h2>
         <table class="ranking-table">
@@ -5151,7 +4466,7 @@ def relatorio_desempenho(turma_id, disciplina_id):
                 </tr>
             </thead>
             <tbody>
-    """
+    """]
     
     # Função para determinar badge de ranking
     def get_ranking_badge(position):
@@ -5190,25 +4505,27 @@ def relatorio_desempenho(turma_id, disciplina_id):
         ranking_badge = get_ranking_badge(position)
         media_badge = formatar_media_badge(aluno.media_final)
         
-        ranking_html += f"""
+        ranking_partes.append(f"""
             <tr>
                 <td>{ranking_badge}</td>
                 <td><strong>{aluno_id}</strong></td>
                 <td>{escape(nome_aluno)}</td>
                 <td class="text-center">{media_badge}</td>
             </tr>
-        """
+        """)
     
-    ranking_html += """
+    ranking_partes.append("""
             </tbody>
         </table>
     </div>
-    """
+    """)
+    # Linhas acumuladas em lista e unidas uma vez (sem recopiar a tabela a cada +=)
+    ranking_html = ''.join(ranking_partes)
     
     # Botão voltar
     voltar_html = f"""
     <div style="margin-top: 20px;">
-        <a href="{url_for('gerenciar_turma', turma_id=turma_id, disciplina_id=disciplina_id)}" class="btn-voltar">
+        <a href="{url_for('professor.gerenciar_turma', turma_id=turma_id, disciplina_id=disciplina_id)}" class="btn-voltar">
             &laquo; Voltar para Gestão
         </a>
     </div>
@@ -5226,7 +4543,7 @@ def relatorio_desempenho(turma_id, disciplina_id):
 
 # Adicione uma rota dummy para o FORM POST (lancar_nota_form) para que os links funcionem.
 
-@app.route('/dashboard')
+@auth_bp.route('/dashboard')
 @require_login
 def dashboard():
     """
@@ -5248,16 +4565,16 @@ def dashboard():
     
     # Redireciona para o painel específico
     if user_type == 'aluno':
-        return redirect(url_for('painel_aluno'))
+        return redirect(url_for('aluno.painel_aluno'))
     elif user_type == 'professor': 
-        return redirect(url_for('painel_professor'))
+        return redirect(url_for('professor.painel_professor'))
     elif user_type == 'admin':    
-        return redirect(url_for('painel_admin')) 
+        return redirect(url_for('admin.painel_admin')) 
     else:
-        return redirect(url_for('logout'))
+        return redirect(url_for('auth.logout'))
 
 
-@app.route('/')
+@auth_bp.route('/')
 def index():
     """
     Rota raiz do sistema.
@@ -5272,8 +4589,119 @@ def index():
         redirect: Redirecionamento para dashboard ou login
     """
     if SESSION_KEY_TYPE in session:
-        return redirect(url_for('dashboard'))
-    return redirect(url_for('login'))
+        return redirect(url_for('auth.dashboard'))
+    return redirect(url_for('auth.login'))
+
+
+# ============================================================================
+# REGISTRO DOS BLUEPRINTS
+# ============================================================================
+# 
+# Feito depois de todas as rotas estarem declaradas nos blueprints.
+
+app.register_blueprint(auth_bp)
+app.register_blueprint(admin_bp)
+app.register_blueprint(aluno_bp)
+app.register_blueprint(professor_bp)
+
+
+# ============================================================================
+# CACHE DE RESPOSTAS (MIDDLEWARE WSGI)
+# ============================================================================
+
+class LRUCacheMiddleware:
+    """
+    Middleware WSGI que guarda em memória as respostas GET de rotas estáticas.
+    
+    Para os caminhos configurados, a resposta completa (status, cabeçalhos e
+    corpo) é armazenada num OrderedDict com política LRU. As próximas
+    requisições iguais são respondidas direto do cache, sem passar pelo
+    roteamento, contexto de requisição ou views do Flask. Se o navegador
+    enviar If-None-Match com o ETag guardado, responde 304 sem corpo.
+    
+    Só entram no cache respostas 200 sem Set-Cookie. Requisições com o
+    cookie de sessão ignoram o cache: usuários logados são redirecionados
+    por /login e precisam passar pela view.
+    
+    Args:
+        wsgi_app: Aplicação WSGI original (app.wsgi_app)
+        cacheable_paths (iterable): Caminhos (PATH_INFO) que podem ser cacheados
+        session_cookie (str): Nome do cookie de sessão do Flask
+        maxsize (int): Número máximo de respostas mantidas em memória
+    """
+    def __init__(self, wsgi_app, cacheable_paths, session_cookie, maxsize=256):
+        self.app = wsgi_app
+        self.paths = frozenset(cacheable_paths)
+        self.session_cookie = session_cookie + '='
+        self.maxsize = maxsize
+        self.cache = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if (environ.get('REQUEST_METHOD') != 'GET'
+                or environ.get('PATH_INFO') not in self.paths
+                or self.session_cookie in environ.get('HTTP_COOKIE', '')):
+            return self.app(environ, start_response)
+
+        # As variantes por codificação (Brotli, gzip, identidade) são guardadas
+        # separadamente: a chave leva as codificações que o cliente aceita, e
+        # quem não aceita br/gzip nunca recebe um corpo comprimido em cache
+        aceitas = environ.get('HTTP_ACCEPT_ENCODING', '')
+        key = (
+            environ['PATH_INFO'],
+            environ.get('QUERY_STRING', ''),
+            'br' in aceitas,
+            'gzip' in aceitas,
+        )
+        with self.lock:
+            entrada = self.cache.get(key)
+            if entrada is not None:
+                self.cache.move_to_end(key)
+
+        if entrada is not None:
+            status, headers, body, etag = entrada
+            if etag and etag == environ.get('HTTP_IF_NONE_MATCH'):
+                start_response('304 Not Modified', [
+                    (nome, valor) for nome, valor in headers
+                    if nome.lower() in ('etag', 'cache-control', 'vary')
+                ])
+                return []
+            start_response(status, headers)
+            return [body]
+
+        # Cache miss: executa a aplicação e captura a resposta
+        capturado = {}
+        def _start_response(status, headers, exc_info=None):
+            capturado['status'] = status
+            capturado['headers'] = headers
+            return start_response(status, headers, exc_info)
+
+        resultado = self.app(environ, _start_response)
+        try:
+            body = b''.join(resultado)
+        finally:
+            if hasattr(resultado, 'close'):
+                resultado.close()
+
+        status = capturado.get('status', '')
+        headers = capturado.get('headers', [])
+        if status.startswith('200') and not any(nome.lower() == 'set-cookie' for nome, _ in headers):
+            etag = next((valor for nome, valor in headers if nome.lower() == 'etag'), None)
+            with self.lock:
+                self.cache[key] = (status, headers, body, etag)
+                self.cache.move_to_end(key)
+                if len(self.cache) > self.maxsize:
+                    self.cache.popitem(last=False)
+        return [body]
+
+
+# Login e cadastro (sem erro) são as únicas páginas que não dependem de
+# sessão ou de dados da API
+app.wsgi_app = LRUCacheMiddleware(
+    app.wsgi_app,
+    ['/login', '/registrar'],
+    session_cookie=app.config['SESSION_COOKIE_NAME'],
+)
 
 
 if __name__ == '__main__':
@@ -5287,6 +4715,7 @@ if __name__ == '__main__':
     2. Configure as variáveis de ambiente no arquivo .env:
        - API_URL: URL da API Node.js
        - FLASK_SECRET_KEY: Chave secreta para sessions
+       - FLASK_DEBUG: 1 para ativar o modo debug (padrão: 0)
     
     3. Certifique-se de que a API Node.js está rodando na porta 3000
     
@@ -5296,8 +4725,8 @@ if __name__ == '__main__':
     O servidor iniciará na porta 5000 e estará acessível em:
     http://127.0.0.1:5000
     
-    Em desenvolvimento, o modo debug está ativado para facilitar
-    a identificação e correção de problemas.
+    Em desenvolvimento, defina FLASK_DEBUG=1 para ativar o modo debug
+    (recarregamento automático de código e templates).
     """
     print("Iniciando servidor Flask (porta 5000)...")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=FLASK_DEBUG, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,355 @@
+/* 02_sistema_python/static/js/admin.js
+   Funções do painel administrativo (filtro de disciplinas por turma, busca
+   incremental de alunos, busca e exclusão de matrícula, ações destrutivas
+   enviadas via fetch, cache das consultas do assistente de exclusão). Os dados dinâmicos da página chegam pela ilha JSON
+   <script type="application/json" id="admin-config"> gerada por
+   render_admin_content em main.py; carregado com defer, depois dela. */
+
+// Dados para filtros dinâmicos
+const adminConfig = JSON.parse(document.getElementById('admin-config').textContent);
+const todasDisciplinas = adminConfig.todasDisciplinas;
+const disciplinasPorTurma = adminConfig.disciplinasPorTurma;
+const apiBaseUrl = adminConfig.apiBaseUrl;
+
+// Função para obter token da sessão (lido uma única vez e guardado em
+// tokenSessao: o token não muda enquanto a página está aberta)
+let tokenSessao = null;
+
+function getToken() {
+    if (tokenSessao !== null) {
+        return tokenSessao;
+    }
+    // Token enviado pelo servidor na configuração da página
+    if (adminConfig.token) {
+        tokenSessao = adminConfig.token;
+    } else {
+        // Fallback: tenta pegar do cookie
+        const match = document.cookie.match(/session_token=([^;]+)/);
+        tokenSessao = match ? match[1] : '';
+    }
+    return tokenSessao;
+}
+
+// Cabeçalhos das chamadas à API, montados uma vez e reaproveitados por todos
+// os fetch (inclusive nos laços por turma); o fetch copia os Headers recebidos
+const authHeaders = new Headers({'Authorization': 'Bearer ' + getToken()});
+const jsonAuthHeaders = new Headers({
+    'Authorization': 'Bearer ' + getToken(),
+    'Content-Type': 'application/json'
+});
+
+// Cache das consultas (GET) do assistente de exclusão de disciplina: a mesma
+// URL consultada há menos de CACHE_TTL_MS reaproveita a resposta já
+// interpretada, sem rede nem JSON.parse. Respostas com erro ou canceladas
+// (AbortController) não ficam no cache.
+const CACHE_TTL_MS = 30000;
+const apiCache = new Map();
+
+function cachedFetchJson(url, signal) {
+    const entrada = apiCache.get(url);
+    if (entrada && Date.now() - entrada.ts < CACHE_TTL_MS) {
+        return entrada.promise;
+    }
+
+    const nova = {ts: Date.now(), pronta: false, promise: null};
+    const descartar = () => {
+        if (apiCache.get(url) === nova) {
+            apiCache.delete(url);
+        }
+    };
+    // cache 'default': o cache HTTP do navegador também participa. /status e
+    // /turmas da disciplina não enviam Cache-Control: o navegador revalida
+    // pelo ETag (If-None-Match) e a API responde 304 quando nada mudou
+    nova.promise = fetch(url, {
+        headers: authHeaders,
+        cache: 'default',
+        signal
+    })
+    .then(res => {
+        if (!res.ok) {
+            throw new Error(`HTTP error! status: ${res.status}`);
+        }
+        return res.json();
+    });
+    nova.promise.then(() => { nova.pronta = true; }, descartar);
+    if (signal) {
+        // Cancelada antes de responder: sai do cache na hora (e não só quando a
+        // rejeição chegar), para que uma nova seleção refaça a consulta
+        signal.addEventListener('abort', () => {
+            if (!nova.pronta) descartar();
+        });
+    }
+
+    apiCache.set(url, nova);
+    return nova.promise;
+}
+
+// Remove do cache as consultas que mudam quando a disciplina é alterada
+function invalidarCacheDisciplina(disciplinaId) {
+    apiCache.delete(`${apiBaseUrl}/academico/disciplinas/${disciplinaId}/status`);
+    apiCache.delete(`${apiBaseUrl}/academico/disciplinas/${disciplinaId}/turmas`);
+}
+
+// Função para filtrar disciplinas quando turma é selecionada
+function filtrarDisciplinasPorTurma(turmaId, selectDisciplinaId) {
+    const select = document.getElementById(selectDisciplinaId);
+
+    // Se nenhuma turma selecionada, mostra todas; senão, só as da
+    // turma (mapa disciplinasPorTurma, montado no servidor)
+    const ids = turmaId ? disciplinasPorTurma[turmaId] : Object.keys(todasDisciplinas);
+
+    if (!ids) {
+        // Turma fora do mapa: a API não respondeu ao montar a página
+        select.innerHTML = '<option value="">Erro ao carregar disciplinas. Verifique se a turma possui disciplinas associadas.</option>';
+        return;
+    }
+    if (turmaId && ids.length === 0) {
+        select.innerHTML = '<option value="">Nenhuma disciplina encontrada para esta turma. Associe disciplinas à turma primeiro.</option>';
+        return;
+    }
+
+    select.innerHTML = '<option value="">Selecione uma disciplina...</option>';
+    ids.forEach(id => {
+        const option = document.createElement('option');
+        option.value = id;
+        option.textContent = todasDisciplinas[id] || 'Disciplina';
+        select.appendChild(option);
+    });
+}
+
+// Busca incremental de alunos ("Remover Matrícula"): a página não traz mais a
+// lista completa de alunos; a cada digitação (após BUSCA_ALUNO_DELAY_MS sem
+// novas teclas e com ao menos BUSCA_ALUNO_MIN letras) consulta a API com
+// ?q=<prefixo>&limit=20 e preenche o <datalist>. O texto de cada opção é
+// mapeado para o aluno_id no campo oculto #busca_aluno_id.
+const BUSCA_ALUNO_DELAY_MS = 200;
+const BUSCA_ALUNO_MIN = 2;
+const campoAlunoNome = document.getElementById('busca_aluno_nome');
+const campoAlunoId = document.getElementById('busca_aluno_id');
+const alunosDatalist = document.getElementById('alunos_datalist');
+let alunosPorRotulo = new Map();
+let timerBuscaAluno = null;
+let controleBuscaAluno = null;
+
+function rotuloAluno(aluno) {
+    // O ID no rótulo diferencia alunos homônimos
+    return `${aluno.nome || ''} ${aluno.sobrenome || ''}`.trim() + ` (ID: ${aluno.aluno_id})`;
+}
+
+function preencherDatalistAlunos(alunos) {
+    alunosPorRotulo = new Map();
+    const fragmento = document.createDocumentFragment();
+    alunos.forEach(aluno => {
+        const rotulo = rotuloAluno(aluno);
+        alunosPorRotulo.set(rotulo, aluno.aluno_id);
+        const option = document.createElement('option');
+        option.value = rotulo;
+        fragmento.appendChild(option);
+    });
+    alunosDatalist.replaceChildren(fragmento);
+}
+
+campoAlunoNome.addEventListener('input', () => {
+    const texto = campoAlunoNome.value.trim();
+    // Opção escolhida na lista: só registra o ID, sem nova consulta
+    const alunoId = alunosPorRotulo.get(campoAlunoNome.value);
+    campoAlunoId.value = alunoId !== undefined ? alunoId : '';
+    clearTimeout(timerBuscaAluno);
+    if (alunoId !== undefined || texto.length < BUSCA_ALUNO_MIN) return;
+
+    timerBuscaAluno = setTimeout(() => {
+        // Cancela a consulta anterior que ainda não respondeu
+        if (controleBuscaAluno) controleBuscaAluno.abort();
+        controleBuscaAluno = new AbortController();
+        const params = new URLSearchParams({q: texto, limit: 20});
+        fetch(`${apiBaseUrl}/academico/alunos?${params}`, {
+            headers: authHeaders,
+            signal: controleBuscaAluno.signal
+        })
+        .then(res => {
+            if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`);
+            return res.json();
+        })
+        .then(data => preencherDatalistAlunos(data.alunos || []))
+        .catch(err => {
+            if (err.name !== 'AbortError') console.error('Erro ao buscar alunos:', err);
+        });
+    }, BUSCA_ALUNO_DELAY_MS);
+});
+
+// Função para buscar matrícula
+function buscarMatricula() {
+    const alunoId = document.getElementById('busca_aluno_id').value;
+    const turmaId = document.getElementById('busca_turma_id').value;
+    const disciplinaId = document.getElementById('busca_disciplina_id').value;
+    const resultadoDiv = document.getElementById('resultado_matricula');
+
+    if (!alunoId || !turmaId || !disciplinaId) {
+        resultadoDiv.innerHTML = '<p style="color: #666;">Escolha um aluno da lista e preencha todos os campos para buscar.</p>';
+        return;
+    }
+
+    resultadoDiv.innerHTML = '<p>Buscando...</p>';
+
+    // Busca a matrícula específica direto na API (uma linha, sem baixar a
+    // lista de alunos da turma/disciplina)
+    const params = new URLSearchParams({aluno_id: alunoId, turma_id: turmaId, disciplina_id: disciplinaId});
+    fetch(`${apiBaseUrl}/academico/matriculas?${params}`, {
+        headers: authHeaders
+    })
+    .then(res => {
+        if (res.status === 404) {
+            return null;
+        }
+        if (!res.ok) {
+            throw new Error(`HTTP error! status: ${res.status}`);
+        }
+        return res.json();
+    })
+    .then(data => {
+        if (data && data.matricula_id) {
+            const matId = data.matricula_id;
+            // Clona o <template> da página: sem reinterpretar HTML, e o nome do
+            // aluno (já montado pela API em nome_completo) entra como texto,
+            // nunca como marcação
+            const node = document.getElementById('tpl-matricula-encontrada').content.firstElementChild.cloneNode(true);
+            node.querySelector('[data-field="matid"]').textContent = matId;
+            node.querySelector('[data-field="nome"]').textContent = data.matricula.nome_completo || '';
+            node.querySelector('button').dataset.matriculaId = matId;
+            resultadoDiv.replaceChildren(node);
+        } else {
+            resultadoDiv.innerHTML = '<p style="color: #d32f2f;"> Nenhuma matrícula encontrada com estes critérios.</p>';
+        }
+    })
+    .catch(err => {
+        console.error('Erro:', err);
+        resultadoDiv.innerHTML = '<p style="color: #d32f2f;">Erro ao buscar matrícula. Tente novamente.</p>';
+    });
+}
+
+// Função de confirmação antes de ações destrutivas
+function confirmarAcao(mensagem, formId) {
+    if (confirm(mensagem)) {
+        document.getElementById(formId).submit();
+    }
+}
+
+// Ações destrutivas via fetch: o POST vai para o próprio /painel/admin com
+// corpo JSON ({action, ...campos}, o mesmo formato dos formulários) e a
+// resposta {msg, cls} é exibida em #admin-feedback. A página não recarrega:
+// só o que a ação alterou é atualizado (aposAcaoPainel).
+async function enviarAcao(action, payload) {
+    const res = await fetch(window.location.pathname, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({...payload, action})
+    });
+    if (!res.ok) {
+        throw new Error(`HTTP error! status: ${res.status}`);
+    }
+    return res.json();
+}
+
+// Mesma caixa de mensagem gerada pelo servidor em render_admin_content
+// (partes separadas por <br> viram quebras de linha; o texto nunca é HTML)
+function exibirFeedback(msg, cls) {
+    const caixa = document.createElement('div');
+    const sucesso = cls === 'success';
+    caixa.className = cls;
+    caixa.style.cssText = `padding: 12px; margin-bottom: 20px; border-radius: 4px; background: ${sucesso ? '#d4edda' : '#f8d7da'}; color: ${sucesso ? '#155724' : '#721c24'};`;
+    String(msg).split('<br>').forEach((parte, i) => {
+        if (i > 0) caixa.appendChild(document.createElement('br'));
+        caixa.appendChild(document.createTextNode(parte));
+    });
+    const destino = document.getElementById('admin-feedback');
+    destino.replaceChildren(caixa);
+    destino.scrollIntoView({behavior: 'smooth', block: 'start'});
+}
+
+// Refaz a verificação do assistente de exclusão se a disciplina afetada
+// for a que está selecionada nele
+function reverificarDisciplina(disciplinaId) {
+    invalidarCacheDisciplina(disciplinaId);
+    if (String(disciplinaSelecionada) === String(disciplinaId)) {
+        verificarStatusExclusao(disciplinaId);
+    }
+}
+
+// Atualiza a página depois de uma ação concluída com sucesso
+function aposAcaoPainel(dados) {
+    if (dados.action === 'remove_disciplina_from_turma') {
+        const lista = disciplinasPorTurma[dados.turma_id] || [];
+        disciplinasPorTurma[dados.turma_id] = lista.filter(id => String(id) !== String(dados.disciplina_id));
+        filtrarDisciplinasPorTurma(dados.turma_id, 'remove_disciplina_id');
+        reverificarDisciplina(dados.disciplina_id);
+    } else if (dados.action === 'delete_notas_da_disciplina') {
+        reverificarDisciplina(dados.disciplina_id_para_limpar);
+    } else if (dados.action === 'delete_matricula') {
+        document.getElementById('resultado_matricula').replaceChildren();
+        const disciplinaId = document.getElementById('busca_disciplina_id').value;
+        if (disciplinaId) reverificarDisciplina(disciplinaId);
+    } else if (dados.action === 'delete_disciplina') {
+        const id = String(dados.disciplina_id);
+        delete todasDisciplinas[id];
+        Object.keys(disciplinasPorTurma).forEach(turmaId => {
+            disciplinasPorTurma[turmaId] = disciplinasPorTurma[turmaId].filter(d => String(d) !== id);
+        });
+        document.querySelectorAll('select[name*="disciplina"], select[id*="disciplina"]').forEach(select => {
+            select.querySelectorAll(`option[value="${id}"]`).forEach(option => option.remove());
+        });
+        invalidarCacheDisciplina(id);
+        resetarEtapas();
+        document.getElementById('assistente_disciplina_id').value = '';
+        verificarStatusExclusao('');
+    }
+}
+
+// Envia a ação; o botão fica desabilitado até a resposta chegar
+function executarAcaoPainel(dados, botao) {
+    if (botao) botao.disabled = true;
+    return enviarAcao(dados.action, dados)
+    .then(resultado => {
+        if (botao) botao.disabled = false;
+        exibirFeedback(resultado.msg, resultado.cls);
+        if (resultado.cls === 'success') aposAcaoPainel(dados);
+    })
+    .catch(err => {
+        console.error('Erro:', err);
+        if (botao) botao.disabled = false;
+        exibirFeedback('Erro ao enviar a ação. Tente novamente.', 'error');
+    });
+}
+
+function confirmarExclusaoMatricula(matriculaId, botao) {
+    if (confirm('Tem certeza que deseja excluir esta matrícula? Esta ação é permanente e pode falhar se houver notas lançadas.')) {
+        executarAcaoPainel({action: 'delete_matricula', matricula_id: matriculaId}, botao);
+    }
+}
+
+// Botão "Confirmar Exclusão da Matrícula": vem do clone de
+// #tpl-matricula-encontrada a cada busca, tratado por um único listener
+// delegado em #resultado_matricula
+document.getElementById('resultado_matricula').addEventListener('click', event => {
+    const botao = event.target.closest('[data-matricula-id]');
+    if (botao && !botao.disabled) {
+        confirmarExclusaoMatricula(botao.dataset.matriculaId, botao);
+    }
+});
+
+// Desabilita o botão de envio dos formulários do painel assim que o envio é
+// confirmado, evitando POSTs duplicados por clique duplo. Os onsubmit com
+// confirm() rodam antes (no próprio formulário): se o usuário cancelar, o
+// evento chega aqui já com defaultPrevented e nada é desabilitado.
+// Formulários marcados com data-acao-json são enviados via fetch
+// (executarAcaoPainel) em vez de recarregar a página.
+document.addEventListener('submit', event => {
+    if (event.defaultPrevented) return;
+    const form = event.target;
+    const botao = form.querySelector('button[type="submit"]');
+    if ('acaoJson' in form.dataset) {
+        event.preventDefault();
+        executarAcaoPainel(Object.fromEntries(new FormData(form)), botao);
+        return;
+    }
+    if (botao) botao.disabled = true;
+});
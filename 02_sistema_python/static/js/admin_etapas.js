@@ -0,0 +1,423 @@
+/* 02_sistema_python/static/js/admin_etapas.js
+   Assistente de exclusão de disciplina do painel administrativo (checklist
+   das etapas 1-4 e exclusão em cascata). Usa apiBaseUrl, authHeaders,
+   jsonAuthHeaders, cachedFetchJson e invalidarCacheDisciplina de
+   /static/js/admin.js; carregado com defer, logo depois dele. */
+
+let disciplinaSelecionada = null;
+// Situação das etapas 1-4 em um único inteiro: o bit N ligado indica a
+// etapa N concluída (bit 0 não usado); zerado a cada nova seleção
+let etapasBits = 0;
+// Etapas 1-3, pré-requisitos da exclusão final (etapa 4)
+const ETAPAS_PRE_EXCLUSAO = 0b1110;
+
+function etapaConcluida(numero) {
+    return (etapasBits & (1 << numero)) !== 0;
+}
+// Elementos de cada etapa, buscados uma única vez (índices 1-4)
+const stepEls = [], statusEls = [], detailsEls = [], btnEls = [];
+const msgEls = [], spinnerEls = [];
+for (let i = 1; i <= 4; i++) {
+    stepEls[i] = document.getElementById('step' + i);
+    statusEls[i] = document.getElementById('status' + i);
+    detailsEls[i] = document.getElementById('details' + i);
+    btnEls[i] = document.getElementById('btn' + i);
+    msgEls[i] = detailsEls[i].querySelector('.msg');
+    spinnerEls[i] = detailsEls[i].querySelector('.spinner');
+}
+const detailsCascata = document.getElementById('details_cascata');
+const msgCascata = detailsCascata.querySelector('.msg');
+const spinnerCascata = detailsCascata.querySelector('.spinner');
+
+// Mensagem da etapa via textContent (sem passar pelo parser de HTML);
+// tipo: '' (normal), 'erro', 'aviso' ou 'perigo' - cores em admin.css
+function mensagemEtapa(numero, texto, tipo = '') {
+    msgEls[numero].textContent = texto;
+    msgEls[numero].className = tipo ? 'msg ' + tipo : 'msg';
+}
+
+// Mostra/esconde o indicador de carregamento da etapa
+function carregandoEtapa(numero, ativo) {
+    spinnerEls[numero].hidden = !ativo;
+}
+
+// Atualizações do checklist vindas das respostas da API são
+// enfileiradas e aplicadas juntas no próximo quadro
+// (requestAnimationFrame): um único cálculo de layout por quadro,
+// por mais respostas que cheguem nele
+const atualizacoesPendentes = [];
+function agendarAtualizacao(atualizar) {
+    if (atualizacoesPendentes.push(atualizar) === 1) {
+        requestAnimationFrame(aplicarAtualizacoes);
+    }
+}
+function aplicarAtualizacoes() {
+    for (const atualizar of atualizacoesPendentes.splice(0)) {
+        atualizar();
+    }
+}
+
+// Cancela as requisições da disciplina anterior ao trocar a seleção
+let controleVerificacao = null;
+// Requisições da etapa 3 (turmas da disciplina e desassociação): canceladas
+// ao executar a etapa de novo, ao trocar a disciplina ou ao sair da página
+let controleEtapa3 = null;
+
+function cancelarEtapa3() {
+    if (controleEtapa3) {
+        controleEtapa3.abort();
+        controleEtapa3 = null;
+    }
+}
+
+// pagehide (e não beforeunload): cobre recarregar/fechar/navegar sem
+// impedir que a página entre no cache de voltar/avançar do navegador
+window.addEventListener('pagehide', cancelarEtapa3);
+
+function verificarStatusExclusao(disciplinaId) {
+    if (controleVerificacao) {
+        controleVerificacao.abort();
+    }
+    cancelarEtapa3();
+    controleVerificacao = new AbortController();
+
+    if (!disciplinaId) {
+        document.getElementById('status_exclusao').style.display = 'none';
+        return;
+    }
+
+    disciplinaSelecionada = disciplinaId;
+    document.getElementById('final_disciplina_id').value = disciplinaId;
+    document.getElementById('status_exclusao').style.display = 'block';
+
+    // Reset estados
+    resetarEtapas();
+
+    // Verifica status da disciplina
+    verificarEtapa1(disciplinaId);
+}
+
+function resetarEtapas() {
+    for (let i = 1; i <= 4; i++) {
+        stepEls[i].classList.remove('completed', 'active', 'blocked');
+        statusEls[i].textContent = i === 1 ? ' Verificando...' : ' Aguardando';
+        btnEls[i].disabled = true;
+        carregandoEtapa(i, false);
+        mensagemEtapa(i, i === 1 ? 'Verificando notas...' : 'Aguardando...');
+    }
+    etapasBits = 0;
+}
+
+// Notas, matrículas e turmas da disciplina em uma única requisição
+// (cacheada por cachedFetchJson, de /static/js/admin.js)
+function buscarStatusDisciplina(disciplinaId) {
+    return cachedFetchJson(
+        `${apiBaseUrl}/academico/disciplinas/${disciplinaId}/status`,
+        controleVerificacao.signal
+    );
+}
+
+function verificarEtapa1(disciplinaId) {
+    carregandoEtapa(1, true);
+    buscarStatusDisciplina(disciplinaId)
+    .then(status => {
+        if (status.tem_notas) {
+            mensagemEtapa(1, 'Notas encontradas. Precisa limpar antes de excluir.');
+            habilitarEtapa(1);
+        } else {
+            mensagemEtapa(1, 'Nenhuma nota encontrada.');
+            marcarEtapaComoConcluida(1, 'Sem notas');
+            verificarEtapa2();
+        }
+    })
+    .catch(err => {
+        if (err.name === 'AbortError') return; // Outra disciplina foi selecionada
+        console.error('Erro:', err);
+        // Em caso de erro, permite tentar limpar notas manualmente
+        mensagemEtapa(1, 'Clique em "Executar" para limpar as notas (se houver).');
+        habilitarEtapa(1);
+    })
+    .finally(() => carregandoEtapa(1, false));
+}
+
+// Libera a etapa 2; a contagem de matrículas vem de /status ao clicar em
+// "Verificar" (sem requisição aqui)
+function verificarEtapa2() {
+    mensagemEtapa(2, 'Clique em "Verificar" para buscar matrículas.');
+    habilitarEtapa(2);
+}
+
+// Desabilita o botão da etapa enquanto a requisição está em andamento
+// (evita envios duplicados); ao terminar, restaura o texto e só
+// reabilita se a etapa não foi concluída
+function travarBotaoEtapa(numero, requisicao) {
+    const btn = btnEls[numero];
+    const textoOriginal = btn.textContent;
+    btn.disabled = true;
+    btn.textContent = '...';
+    carregandoEtapa(numero, true);
+    return requisicao.finally(() => {
+        carregandoEtapa(numero, false);
+        btn.textContent = textoOriginal;
+        if (!etapaConcluida(numero)) btn.disabled = false;
+    });
+}
+
+function executarEtapa(numero) {
+    if (!disciplinaSelecionada) return;
+
+    const disciplinaId = disciplinaSelecionada;
+
+    if (numero === 1) {
+        // Limpar notas
+        if (!confirm('Tem certeza que deseja excluir TODAS as notas desta disciplina? Esta ação não pode ser desfeita!')) {
+            return;
+        }
+
+        stepEls[numero].classList.add('active');
+        statusEls[numero].textContent = ' Executando...';
+
+        travarBotaoEtapa(1, fetch(`${apiBaseUrl}/academico/disciplinas/${disciplinaId}/notas`, {
+            method: 'DELETE',
+            headers: authHeaders
+        })
+        .then(res => {
+            if (res.status === 200) {
+                return res.json().then(data => {
+                    invalidarCacheDisciplina(disciplinaId); // O status em cache ainda indica notas
+                    marcarEtapaComoConcluida(1, 'Notas excluídas com sucesso');
+                    habilitarEtapa(2);
+                    verificarEtapa2();
+                    return data;
+                });
+            } else {
+                return res.json().then(data => {
+                    mensagemEtapa(1, `Erro: ${data.message || 'Erro ao excluir notas'}`, 'erro');
+                    throw new Error(data.message || 'Erro ao excluir notas');
+                });
+            }
+        })
+        .catch(err => {
+            mensagemEtapa(1, 'Erro ao executar.', 'erro');
+        }));
+    } else if (numero === 2) {
+        // Verificar matrículas
+        stepEls[numero].classList.add('active');
+        statusEls[numero].textContent = '🔄 Verificando...';
+        mensagemEtapa(2, 'Buscando matrículas...');
+
+        travarBotaoEtapa(2, buscarStatusDisciplina(disciplinaId)
+        .then(status => agendarAtualizacao(() => {
+            const totalMatriculas = status.total_matriculas;
+            if (totalMatriculas === 0) {
+                mensagemEtapa(2, 'Nenhuma matrícula encontrada.');
+                marcarEtapaComoConcluida(2, 'Sem matrículas');
+                habilitarEtapa(3);
+            } else {
+                mensagemEtapa(2, `${totalMatriculas} matrícula(s) encontrada(s).\nVocê precisa remover todas as matrículas manualmente antes de continuar.`, 'aviso');
+                statusEls[2].textContent = ' Requer ação manual';
+            }
+        }))
+        .catch(err => {
+            if (err.name === 'AbortError') return; // Outra disciplina foi selecionada
+            mensagemEtapa(2, 'Erro ao verificar. Tente novamente.', 'erro');
+        }));
+    } else if (numero === 3) {
+        // Desassociar de turmas
+        if (!confirm('Tem certeza que deseja desassociar esta disciplina de TODAS as turmas?')) {
+            return;
+        }
+
+        stepEls[numero].classList.add('active');
+        statusEls[numero].textContent = ' Executando...';
+
+        cancelarEtapa3();
+        controleEtapa3 = new AbortController();
+        const signal = controleEtapa3.signal;
+
+        // Busca só as turmas em que a disciplina está associada e
+        // desassocia; sem nenhuma, conclui a etapa sem outra requisição
+        travarBotaoEtapa(3, cachedFetchJson(`${apiBaseUrl}/academico/disciplinas/${disciplinaId}/turmas`, signal)
+        .then(data => {
+            const turmas = data.turmas || [];
+            if (turmas.length === 0) {
+                mensagemEtapa(3, 'Nenhuma turma associada.');
+                marcarEtapaComoConcluida(3, 'Nenhuma associação');
+                habilitarEtapa(4);
+                return;
+            }
+
+            // Desassocia de todas as turmas em uma única requisição
+            // (um DELETE no servidor); sem o endpoint em lote (404),
+            // volta a uma requisição por turma. turma_id já chega como
+            // número no JSON da API: nenhuma conversão por turma
+            return fetch(`${apiBaseUrl}/academico/turmas/remover-disciplina-bulk`, {
+                method: 'POST',
+                headers: jsonAuthHeaders,
+                signal,
+                body: JSON.stringify({
+                    disciplina_id: +disciplinaId,
+                    turma_ids: turmas.map(turma => turma.turma_id)
+                })
+            })
+            .then(res => {
+                if (res.status === 404) {
+                    return desassociarTurmaPorTurma(turmas, disciplinaId, signal);
+                }
+                return res.json().then(data => {
+                    if (!res.ok) {
+                        // Ex.: 409, matrículas ainda dependem da associação
+                        mensagemEtapa(3, `Erro: ${data.message || 'Erro ao desassociar'}`, 'erro');
+                        return null;
+                    }
+                    return {ok: data.turmas_removidas.length, total: data.total};
+                });
+            })
+            .then(resultado => {
+                if (!resultado || signal.aborted) return;
+                const {ok, total} = resultado;
+                invalidarCacheDisciplina(disciplinaId);
+                // Resultado de todas as turmas aplicado de uma vez
+                agendarAtualizacao(() => {
+                    mensagemEtapa(3, `Desassociação concluída (${ok}/${total}).`);
+                    marcarEtapaComoConcluida(3, 'Concluído');
+                    habilitarEtapa(4);
+                });
+            });
+        })
+        .catch(err => {
+            if (err.name === 'AbortError') return; // Cancelada: nada a exibir
+            mensagemEtapa(3, 'Erro ao executar.', 'erro');
+        }));
+    }
+}
+
+// Alternativa ao endpoint em lote: uma requisição por turma, em
+// paralelo; falha em uma turma não interrompe as demais. O signal da
+// etapa 3 cancela de uma vez as requisições ainda pendentes
+function desassociarTurmaPorTurma(turmas, disciplinaId, signal) {
+    const disciplinaNum = +disciplinaId; // Convertido uma vez, fora do laço
+    return Promise.allSettled(turmas.map(turma =>
+        fetch(`${apiBaseUrl}/academico/turmas/remover-disciplina`, {
+            method: 'POST',
+            headers: jsonAuthHeaders,
+            signal,
+            body: JSON.stringify({
+                turma_id: turma.turma_id,
+                disciplina_id: disciplinaNum
+            })
+        })
+    ))
+    .then(resultados => ({
+        ok: resultados.filter(r => r.status === 'fulfilled' && r.value.ok).length,
+        total: resultados.length
+    }));
+}
+
+// Executa as etapas 1-4 no servidor, em uma única transação
+// (POST /academico/disciplinas/{id}/delete-cascade); a resposta traz
+// o resultado de cada etapa, refletido no checklist
+function executarExclusaoCascata() {
+    if (!disciplinaSelecionada) return;
+    if (!confirm('Excluir as notas, desassociar de todas as turmas e excluir esta disciplina permanentemente?\n\nEsta ação é IRREVERSÍVEL!')) {
+        return;
+    }
+
+    const disciplinaId = disciplinaSelecionada;
+    const btn = document.getElementById('btn_cascata');
+    const textoOriginal = btn.textContent;
+    btn.disabled = true;
+    btn.textContent = '...';
+    spinnerCascata.hidden = false;
+
+    fetch(`${apiBaseUrl}/academico/disciplinas/${disciplinaId}/delete-cascade`, {
+        method: 'POST',
+        headers: jsonAuthHeaders,
+        body: JSON.stringify({})
+    })
+    .then(res => res.json().then(data => {
+        invalidarCacheDisciplina(disciplinaId);
+        if (res.ok) {
+            window.location.href = window.location.pathname
+                + '?msg=' + encodeURIComponent(data.message) + '&cls=success';
+            return;
+        }
+        // Transação desfeita: mostra em qual etapa parou
+        const falha = (data.steps || []).find(etapa => !etapa.ok);
+        if (falha && falha.n === 2) {
+            mensagemEtapa(2, `${falha.total_matriculas} matrícula(s) encontrada(s).\nVocê precisa remover todas as matrículas manualmente antes de continuar.`, 'aviso');
+            statusEls[2].textContent = ' Requer ação manual';
+        }
+        msgCascata.textContent = `Erro: ${data.message || 'Erro ao excluir disciplina'}`;
+        msgCascata.className = 'msg erro';
+    }))
+    .catch(err => {
+        msgCascata.textContent = 'Erro ao executar.';
+        msgCascata.className = 'msg erro';
+    })
+    .finally(() => {
+        spinnerCascata.hidden = true;
+        btn.textContent = textoOriginal;
+        btn.disabled = false;
+    });
+}
+
+function marcarEtapaComoConcluida(numero, mensagem) {
+    etapasBits |= 1 << numero;
+    const step = stepEls[numero];
+    step.classList.remove('active', 'blocked');
+    step.classList.add('completed');
+    statusEls[numero].textContent = ` ${mensagem}`;
+    btnEls[numero].disabled = true;
+
+    // Se não for a última etapa, habilita a próxima
+    if (numero < 4) {
+        habilitarEtapa(numero + 1);
+    } else {
+        // Se for a última etapa, verifica se todas estão concluídas
+        verificarSePodeExcluir();
+    }
+}
+
+function verificarSePodeExcluir() {
+    if ((etapasBits & ETAPAS_PRE_EXCLUSAO) === ETAPAS_PRE_EXCLUSAO) {
+        const btn4 = btnEls[4];
+        btn4.disabled = false;
+        btn4.classList.add('enabled');
+        statusEls[4].textContent = ' Pronto para excluir';
+        mensagemEtapa(4, 'Todas as etapas concluídas!\nVocê pode excluir a disciplina permanentemente.', 'perigo');
+    }
+}
+
+function habilitarEtapa(numero) {
+    if (numero > 1 && !etapaConcluida(numero - 1)) {
+        return; // Só habilita se a etapa anterior estiver concluída
+    }
+
+    const step = stepEls[numero];
+    step.classList.remove('blocked');
+    step.classList.add('active');
+    btnEls[numero].disabled = false;
+    btnEls[numero].classList.add('enabled');
+
+    if (numero === 2) {
+        btnEls[numero].classList.add('warning');
+    }
+
+    // Verifica se pode habilitar etapa 4
+    if (numero === 3) {
+        verificarSePodeExcluir();
+    }
+}
+
+// Um único listener (delegado) para os botões das etapas: o botão
+// informa a etapa em data-step, sem onclick inline
+document.querySelector('.exclusao-checklist').addEventListener('click', event => {
+    const botao = event.target.closest('[data-step], [data-acao="cascata"]');
+    if (!botao || botao.disabled) return;
+    if (botao.dataset.acao === 'cascata') {
+        executarExclusaoCascata();
+    } else {
+        executarEtapa(+botao.dataset.step);
+    }
+});